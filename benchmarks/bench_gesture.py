@@ -0,0 +1,48 @@
+"""Headless gesture-engine throughput and latency on a recorded or synthetic clip.
+
+Run with ``python benchmarks/bench_gesture.py [source] [--unpaced]`` where
+``source`` is ``synthetic`` (default), a video file or an image directory.
+Sources are paced at their frame rate unless ``--unpaced`` is given, in which
+case frames are offered as fast as they can be read.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules.frame_sources import open_source  # noqa: E402
+from modules.gesture_recognition import GestureRecognition  # noqa: E402
+
+
+def run(spec: str = "synthetic", realtime: bool = True, timeout: float = 600.0) -> dict:
+    engine = GestureRecognition(source=open_source(spec, realtime=realtime), headless=True)
+    if not engine.start():
+        raise SystemExit(f"could not open {spec}")
+    started = time.perf_counter()
+    engine.done.wait(timeout)
+    elapsed = time.perf_counter() - started
+    stats = engine.stats()
+    engine.release()
+
+    print(f"source:     {spec} ({'paced' if realtime else 'unpaced'}), {elapsed:.1f} s")
+    print(f"frames:     {stats['frames_processed']} processed / {stats['frames_captured']} captured, "
+          f"{stats['frames_dropped']} dropped")
+    print(f"throughput: {stats['fps']:.1f} FPS")
+    print(f"latency:    {stats['latency_ms']:.1f} ms capture-to-result, "
+          f"{stats['detection_latency_ms']:.1f} ms for the {stats['detections']} detections")
+    for stage, ms in stats["stage_ms"].items():
+        print(f"  {stage:<10} {ms:7.2f} ms")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", nargs="?", default="synthetic")
+    parser.add_argument("--unpaced", action="store_true")
+    args = parser.parse_args()
+    run(args.source, realtime=not args.unpaced)
@@ -0,0 +1,52 @@
+"""Latency of the hashed n-gram intent classifier, one at a time and batched.
+
+Run with ``python benchmarks/bench_intent_classifier.py [query_count]``.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules.intent_classifier import default_classifier  # noqa: E402
+
+TEMPLATES = [
+    "what is the {0} of {1}",
+    "how do i {0} my {1}",
+    "open {0}",
+    "turn {0} the {1} lights",
+    "hey jarvis {0}",
+    "thanks for the {0}",
+    "this {0} is {1}",
+]
+WORDS = ["weather", "kitchen", "music", "browser", "capital", "bike", "on", "off", "report", "garden", "fine"]
+
+
+def run(query_count: int = 10000) -> None:
+    rng = random.Random(7)
+    queries = [rng.choice(TEMPLATES).format(rng.choice(WORDS), rng.choice(WORDS)) for _ in range(query_count)]
+
+    started = time.perf_counter()
+    classifier = default_classifier()
+    train_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    single = [classifier.classify(query) for query in queries]
+    single_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    batch = classifier.classify_batch(queries)
+    batch_s = time.perf_counter() - started
+
+    assert [p.label for p in single] == [p.label for p in batch]
+    print(f"queries={query_count} train={train_ms:.1f} ms")
+    print(f"single: {single_s / query_count * 1e6:.1f} us/query")
+    print(f"batch:  {batch_s / query_count * 1e6:.1f} us/query")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
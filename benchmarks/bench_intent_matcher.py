@@ -0,0 +1,68 @@
+"""Throughput of the compiled intent matcher against a naive substring scan.
+
+Run with ``python benchmarks/bench_intent_matcher.py [trigger_count]``.
+"""
+
+from __future__ import annotations
+
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from intent_matcher import Intent, IntentMatcher, tokenize  # noqa: E402
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 8)))
+
+
+def build_intents(count: int, rng: random.Random) -> list[Intent]:
+    return [
+        Intent(f"intent_{index}", (" ".join(_word(rng) for _ in range(rng.randint(1, 3))),), priority=index)
+        for index in range(count)
+    ]
+
+
+def naive_match(intents: list[Intent], command: str) -> str | None:
+    tokens = f" {' '.join(tokenize(command))} "
+    for intent in intents:
+        if any(f" {trigger} " in tokens for trigger in intent.triggers):
+            return intent.name
+    return None
+
+
+def run(trigger_count: int = 5000, command_count: int = 2000) -> None:
+    rng = random.Random(7)
+    intents = build_intents(trigger_count, rng)
+
+    started = time.perf_counter()
+    matcher = IntentMatcher(intents)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    commands = []
+    for _ in range(command_count):
+        words = [_word(rng) for _ in range(8)]
+        if rng.random() < 0.5:
+            words.insert(rng.randrange(len(words)), rng.choice(intents).triggers[0])
+        commands.append(" ".join(words))
+
+    started = time.perf_counter()
+    compiled = [matcher.match(command) for command in commands]
+    compiled_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    naive = [naive_match(intents, command) for command in commands]
+    naive_s = time.perf_counter() - started
+
+    assert [m.intent if m else None for m in compiled] == naive
+    print(f"triggers={trigger_count} commands={command_count} build={build_ms:.1f} ms")
+    print(f"compiled: {command_count / compiled_s:,.0f} commands/s")
+    print(f"naive:    {command_count / naive_s:,.0f} commands/s")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
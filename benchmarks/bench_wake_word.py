@@ -0,0 +1,59 @@
+"""Cost of wake-word spotting per utterance compared with its duration.
+
+Run with ``python benchmarks/bench_wake_word.py [utterance_count]``. Every
+utterance the gate rejects is one speech-recognition request avoided.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules.audio_capture import SAMPLE_RATE, Utterance  # noqa: E402
+from modules.wake_word import WakeWordDetector, WakeWordGate  # noqa: E402
+
+JARVIS = [(220, 0.12), (660, 0.18), (330, 0.2)]
+
+
+def synth(syllables, rng: np.random.Generator, speed: float = 1.0) -> np.ndarray:
+    parts = [np.zeros(SAMPLE_RATE // 5)]
+    for pitch, seconds in syllables:
+        t = np.arange(int(seconds * speed * SAMPLE_RATE)) / SAMPLE_RATE
+        pitch *= 1 + rng.normal(0, 0.02)
+        parts.append(np.sin(np.pi * t / t[-1]) * sum(np.sin(2 * np.pi * pitch * k * t) / k for k in (1, 2, 3)) * 6000)
+    signal = np.concatenate(parts)
+    return (signal + rng.normal(0, 200, len(signal))).astype(np.int16)
+
+
+def run(utterance_count: int = 200) -> None:
+    rng = np.random.default_rng(7)
+    detector = WakeWordDetector()
+    detector.enroll("jarvis", [synth(JARVIS, rng, speed) for speed in (0.9, 1.0, 1.1)])
+    gate = WakeWordGate(detector, follow_up_seconds=0.0)
+
+    utterances = []
+    for index in range(utterance_count):
+        if index % 20 == 0:
+            utterances.append(synth(JARVIS, rng, rng.uniform(0.85, 1.2)))
+        else:
+            syllables = [(rng.uniform(150, 900), rng.uniform(0.1, 0.3)) for _ in range(rng.integers(2, 10))]
+            utterances.append(synth(syllables, rng))
+
+    audio_seconds = sum(len(samples) for samples in utterances) / SAMPLE_RATE
+    started = time.perf_counter()
+    admitted = sum(gate.admit(Utterance(samples.tobytes())) for samples in utterances)
+    elapsed = time.perf_counter() - started
+
+    print(f"utterances:          {utterance_count} ({audio_seconds:.1f} s of audio)")
+    print(f"sent to recognition: {admitted} ({utterance_count / max(admitted, 1):.0f}x fewer requests)")
+    print(f"spotting:            {elapsed * 1000 / utterance_count:.2f} ms/utterance, "
+          f"real-time factor {elapsed / audio_seconds:.4f}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -23,6 +23,27 @@ class JarvisConfig:
     threat_poll_interval_seconds: float = 5.0
     voice_poll_interval_seconds: float = 0.1
     gesture_poll_interval_seconds: float = 0.1
+    runtime_mode: str = "threaded"
+    command_workers: int = 4
+    critical_lane_limit: int = 16
+    device_lane_limit: int = 32
+    background_lane_limit: int = 64
+    command_shed_policy: str = "reject"
+    command_timeout_seconds: float = 8.0
+    llm_streaming: bool = False
+    llm_cache_size: int = 256
+    llm_cache_ttl_seconds: float = 3600.0
+    llm_cache_path: str = ""
+    llm_hedge_after_seconds: float = 0.0
+    local_model_path: str = ""
+    local_model_threads: int = 0
+    llm_context_tokens: int = 1024
+    stt_backend: str = "google"
+    vosk_model_path: str = ""
+    audio_preprocess: bool = True
+    tts_cache_dir: str = ""
+    wake_word_dir: str = ""
+    wake_word_threshold: float = 0.0
 
     @classmethod
     def from_env(cls) -> "JarvisConfig":
@@ -33,4 +54,25 @@ class JarvisConfig:
             threat_poll_interval_seconds=float(os.getenv("JARVIS_THREAT_INTERVAL", "5.0")),
             voice_poll_interval_seconds=float(os.getenv("JARVIS_VOICE_INTERVAL", "0.1")),
             gesture_poll_interval_seconds=float(os.getenv("JARVIS_GESTURE_INTERVAL", "0.1")),
+            runtime_mode=os.getenv("JARVIS_RUNTIME_MODE", "threaded").lower(),
+            command_workers=int(os.getenv("JARVIS_COMMAND_WORKERS", "4")),
+            critical_lane_limit=int(os.getenv("JARVIS_CRITICAL_LANE_LIMIT", "16")),
+            device_lane_limit=int(os.getenv("JARVIS_DEVICE_LANE_LIMIT", "32")),
+            background_lane_limit=int(os.getenv("JARVIS_BACKGROUND_LANE_LIMIT", "64")),
+            command_shed_policy=os.getenv("JARVIS_COMMAND_SHED_POLICY", "reject").lower(),
+            command_timeout_seconds=float(os.getenv("JARVIS_COMMAND_TIMEOUT", "8.0")),
+            llm_streaming=os.getenv("JARVIS_LLM_STREAMING", "false").lower() in {"1", "true", "yes"},
+            llm_cache_size=int(os.getenv("JARVIS_LLM_CACHE_SIZE", "256")),
+            llm_cache_ttl_seconds=float(os.getenv("JARVIS_LLM_CACHE_TTL", "3600")),
+            llm_cache_path=os.getenv("JARVIS_LLM_CACHE_PATH", ""),
+            llm_hedge_after_seconds=float(os.getenv("JARVIS_LLM_HEDGE_AFTER", "0")),
+            local_model_path=os.getenv("JARVIS_LOCAL_MODEL_PATH", ""),
+            local_model_threads=int(os.getenv("JARVIS_LOCAL_MODEL_THREADS", "0")),
+            llm_context_tokens=int(os.getenv("JARVIS_LLM_CONTEXT_TOKENS", "1024")),
+            stt_backend=os.getenv("JARVIS_STT_BACKEND", "google").lower(),
+            vosk_model_path=os.getenv("JARVIS_VOSK_MODEL_PATH", ""),
+            audio_preprocess=os.getenv("JARVIS_AUDIO_PREPROCESS", "true").lower() in {"1", "true", "yes"},
+            tts_cache_dir=os.getenv("JARVIS_TTS_CACHE_DIR", ""),
+            wake_word_dir=os.getenv("JARVIS_WAKE_WORD_DIR", ""),
+            wake_word_threshold=float(os.getenv("JARVIS_WAKE_WORD_THRESHOLD", "0")),
         )
@@ -0,0 +1,100 @@
+"""Precompiled multi-pattern intent matching on token boundaries.
+
+Triggers are compiled once into an Aho-Corasick automaton whose alphabet is
+whole tokens, so a command is scanned in a single pass regardless of how many
+triggers are registered, and "time" can never match inside "sometimes".
+"""
+
+from __future__ import annotations
+
+import re
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase ``text`` and split it into word tokens."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+@dataclass(frozen=True)
+class Intent:
+    """A named intent, its trigger phrases and its priority (lower wins)."""
+
+    name: str
+    triggers: tuple[str, ...]
+    priority: int = 100
+
+
+@dataclass(frozen=True)
+class IntentMatch:
+    intent: str
+    trigger: str
+    priority: int
+    start: int
+    end: int
+
+
+class IntentMatcher:
+    """Aho-Corasick automaton over trigger token sequences."""
+
+    def __init__(self, intents: Iterable[Intent]) -> None:
+        self._children: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._outputs: list[list[tuple[Intent, str, int]]] = [[]]
+        self.intents = tuple(intents)
+        for intent in self.intents:
+            for trigger in intent.triggers:
+                self._insert(intent, trigger)
+        self._link()
+
+    def _insert(self, intent: Intent, trigger: str) -> None:
+        tokens = tokenize(trigger)
+        if not tokens:
+            raise ValueError(f"Intent '{intent.name}' has an empty trigger")
+        node = 0
+        for token in tokens:
+            child = self._children[node].get(token)
+            if child is None:
+                child = len(self._children)
+                self._children.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+                self._children[node][token] = child
+            node = child
+        self._outputs[node].append((intent, trigger, len(tokens)))
+
+    def _link(self) -> None:
+        pending = deque(self._children[0].values())
+        while pending:
+            node = pending.popleft()
+            for token, child in self._children[node].items():
+                fallback = self._fail[node]
+                while fallback and token not in self._children[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._children[fallback].get(token, 0)
+                self._outputs[child].extend(self._outputs[self._fail[child]])
+                pending.append(child)
+
+    def match_all(self, text: str) -> list[IntentMatch]:
+        """Return every trigger occurrence in ``text`` in scan order."""
+        matches: list[IntentMatch] = []
+        node = 0
+        for position, token in enumerate(tokenize(text)):
+            while node and token not in self._children[node]:
+                node = self._fail[node]
+            node = self._children[node].get(token, 0)
+            for intent, trigger, length in self._outputs[node]:
+                end = position + 1
+                matches.append(IntentMatch(intent.name, trigger, intent.priority, end - length, end))
+        return matches
+
+    def match(self, text: str) -> IntentMatch | None:
+        """Return the winning match: lowest priority, then earliest, then longest."""
+        matches = self.match_all(text)
+        if not matches:
+            return None
+        return min(matches, key=lambda m: (m.priority, m.start, m.start - m.end))
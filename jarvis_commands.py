@@ -7,6 +7,8 @@ import os
 import webbrowser
 from typing import Callable
 
+from intent_matcher import Intent, IntentMatcher
+
 try:
     import requests
 except ImportError:  # optional in constrained environments
@@ -19,10 +21,18 @@ except ImportError:  # optional in constrained environments
 
 OPENWEATHER_URL = "http://api.openweathermap.org/data/2.5/weather"
 DEFAULT_CITY = "London"
+REQUEST_TIMEOUT_SECONDS = 10.0
+
 
+def get_weather(city: str = DEFAULT_CITY, timeout: float = REQUEST_TIMEOUT_SECONDS) -> str:
+    """Return a short weather summary for the provided city.
+
+    ``timeout`` bounds the HTTP call so callers with a deadline get a fast
+    degraded answer instead of waiting on a slow weather service.
+    """
+    if timeout <= 0:
+        return "Sorry, I couldn't fetch the weather information in time."
 
-def get_weather(city: str = DEFAULT_CITY) -> str:
-    """Return a short weather summary for the provided city."""
     if requests is None:
         return "Weather service is unavailable because requests is not installed."
 
@@ -34,13 +44,15 @@ def get_weather(city: str = DEFAULT_CITY) -> str:
         response = requests.get(
             OPENWEATHER_URL,
             params={"q": city, "appid": api_key, "units": "metric"},
-            timeout=10,
+            timeout=min(timeout, REQUEST_TIMEOUT_SECONDS),
         )
         response.raise_for_status()
         data = response.json()
         temp = data["main"]["temp"]
         description = data["weather"][0]["description"]
         return f"The temperature in {city} is {temp}°C with {description}."
+    except requests.Timeout:
+        return "Sorry, I couldn't fetch the weather information in time."
     except requests.RequestException:
         return "Sorry, I couldn't fetch the weather information right now."
     except (KeyError, IndexError, TypeError, ValueError):
@@ -63,57 +75,100 @@ def _extract_city(command: str) -> str:
     return command.split(" in ", maxsplit=1)[1].strip() or DEFAULT_CITY
 
 
-def execute_command(command: str) -> str:
-    """Execute supported command intents from a normalized text command."""
+def _tell_time(_command: str, _timeout: float) -> str:
+    return f"The current time is {datetime.datetime.now().strftime('%I:%M %p')}"
+
+
+def _tell_date(_command: str, _timeout: float) -> str:
+    return f"Today's date is {datetime.datetime.now().strftime('%B %d, %Y')}"
+
+
+def _open_youtube(_command: str, _timeout: float) -> str:
+    webbrowser.open("https://www.youtube.com")
+    return "Opening YouTube for you, sir."
+
+
+def _open_google(_command: str, _timeout: float) -> str:
+    webbrowser.open("https://www.google.com")
+    return "Opening Google, sir."
+
+
+def _search(command: str, _timeout: float) -> str:
+    search_term = command.replace("search", "", 1).strip()
+    if not search_term:
+        return "What would you like me to search for, sir?"
+    webbrowser.open(f"https://www.google.com/search?q={search_term}")
+    return f"Searching for {search_term}."
+
+
+def _system_status(_command: str, _timeout: float) -> str:
+    return get_system_info()
+
+
+def _weather(command: str, timeout: float) -> str:
+    return get_weather(_extract_city(command), timeout=timeout)
+
+
+def _greet_by_time_of_day(_command: str, _timeout: float) -> str:
+    hour = datetime.datetime.now().hour
+    if 5 <= hour < 12:
+        return "Good morning, sir."
+    if 12 <= hour < 17:
+        return "Good afternoon, sir."
+    return "Good evening, sir."
+
+
+def _reply(text: str) -> Callable[[str, float], str]:
+    return lambda _command, _timeout: text
+
+
+# Declarative intent table; lower priority wins when several intents match.
+INTENTS: tuple[Intent, ...] = (
+    Intent("time", ("time",), priority=10),
+    Intent("date", ("date",), priority=20),
+    Intent("open_youtube", ("open youtube",), priority=30),
+    Intent("open_google", ("open google",), priority=40),
+    Intent("search", ("search",), priority=50),
+    Intent("system_status", ("system status", "system info"), priority=60),
+    Intent("weather", ("weather",), priority=70),
+    Intent("how_are_you", ("how are you",), priority=80),
+    Intent("thanks", ("thank you",), priority=81),
+    Intent("shutdown", ("shutdown",), priority=82),
+    Intent("greeting", ("good morning", "good afternoon", "good evening"), priority=90),
+)
+
+INTENT_HANDLERS: dict[str, Callable[[str, float], str]] = {
+    "time": _tell_time,
+    "date": _tell_date,
+    "open_youtube": _open_youtube,
+    "open_google": _open_google,
+    "search": _search,
+    "system_status": _system_status,
+    "weather": _weather,
+    "how_are_you": _reply("I'm functioning at optimal levels, sir. How may I assist you today?"),
+    "thanks": _reply("You're welcome, sir."),
+    "shutdown": _reply("Initiating shutdown sequence. Goodbye, sir."),
+    "greeting": _greet_by_time_of_day,
+}
+
+_MATCHER = IntentMatcher(INTENTS)
+
+
+def execute_command(command: str, timeout: float | None = None) -> str:
+    """Execute supported command intents from a normalized text command.
+
+    ``timeout`` is the time budget left for the command; network-backed
+    intents use it to bound their requests.
+    """
     command = command.lower().strip()
 
     if not command:
         return "Please tell me what you'd like me to do."
 
-    if "time" in command:
-        return f"The current time is {datetime.datetime.now().strftime('%I:%M %p')}"
-
-    if "date" in command:
-        return f"Today's date is {datetime.datetime.now().strftime('%B %d, %Y')}"
-
-    if "open youtube" in command:
-        webbrowser.open("https://www.youtube.com")
-        return "Opening YouTube for you, sir."
-
-    if "open google" in command:
-        webbrowser.open("https://www.google.com")
-        return "Opening Google, sir."
-
-    if command.startswith("search") or " search " in command:
-        search_term = command.replace("search", "", 1).strip()
-        if not search_term:
-            return "What would you like me to search for, sir?"
-        webbrowser.open(f"https://www.google.com/search?q={search_term}")
-        return f"Searching for {search_term}."
-
-    if "system status" in command or "system info" in command:
-        return get_system_info()
-
-    if "weather" in command:
-        return get_weather(_extract_city(command))
-
-    conversational_responses: dict[str, Callable[[], str]] = {
-        "how are you": lambda: "I'm functioning at optimal levels, sir. How may I assist you today?",
-        "thank you": lambda: "You're welcome, sir.",
-        "shutdown": lambda: "Initiating shutdown sequence. Goodbye, sir.",
-    }
-
-    for trigger, response_factory in conversational_responses.items():
-        if trigger in command:
-            return response_factory()
-
-    if any(phrase in command for phrase in ("good morning", "good afternoon", "good evening")):
-        hour = datetime.datetime.now().hour
-        if 5 <= hour < 12:
-            return "Good morning, sir."
-        if 12 <= hour < 17:
-            return "Good afternoon, sir."
-        return "Good evening, sir."
+    match = _MATCHER.match(command)
+    if match:
+        budget = REQUEST_TIMEOUT_SECONDS if timeout is None else timeout
+        return INTENT_HANDLERS[match.intent](command, budget)
 
     return (
         "I'm not sure how to help with that yet, sir. "
@@ -2,20 +2,31 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import threading
 import time
 from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import asdict, dataclass, field
+from typing import Any
 
 from config import JarvisConfig
+from deadline import Deadline
 from logging_config import configure_logging
 from typing import TYPE_CHECKING
+from worker_pool import Lane, LaneFullError, PriorityWorkerPool
+
+from modules.tts_worker import PRIORITY_ALERT
 
 if TYPE_CHECKING:
     from modules.device_controller import DeviceController
     from modules.enhanced_gui import EnhancedGUI
     from modules.gesture_recognition import GestureRecognition
+    from modules.intent_classifier import IntentClassifier
     from modules.llm_selector import LLMSelector
+    from modules.local_llm import LocalModel
     from modules.personality import PersonalityModule
     from modules.threat_analyzer import ThreatAnalyzer
     from modules.voice_interface import VoiceInterface
@@ -24,9 +35,58 @@ configure_logging()
 logger = logging.getLogger(__name__)
 
 
+BUSY_RESPONSE = "I'm handling too many requests right now, sir. Please try again in a moment."
+TIMEOUT_RESPONSE = "That took longer than expected, sir. Please try again."
+DEGRADED_RESPONSES: dict[str, str] = {
+    "llm": "I couldn't finish thinking that through in time, sir.",
+    "device": "The device didn't respond in time, sir.",
+}
+# Voice sources wake up this often to notice shutdown while nobody is speaking.
+VOICE_LISTEN_TIMEOUT_SECONDS = 0.5
+
+
+@dataclass
+class ModuleTiming:
+    """Initialization outcome for one runtime module."""
+
+    name: str
+    status: str = "pending"
+    seconds: float | None = None
+    background: bool = False
+    error: str | None = None
+
+
+@dataclass
+class StartupReport:
+    """Structured record of how long startup took, per module."""
+
+    modules: dict[str, ModuleTiming] = field(default_factory=dict)
+    text_ready_seconds: float | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "text_ready_seconds": self.text_ready_seconds,
+            "modules": {name: asdict(timing) for name, timing in self.modules.items()},
+        }
+
+
 class JarvisCore:
     """Industrialized core runtime with explicit lifecycle management."""
 
+    # Modules that probe hardware (camera, TTS engine, microphone, display)
+    # or train a model warm up in the background; text commands never wait on them.
+    BACKGROUND_MODULES = frozenset({"voice", "gesture", "gui", "intent_classifier"})
+
+    # Command prefix -> worker lane. Lanes are served in the order built by
+    # ``_command_pool``; unprefixed and control commands use the critical lane.
+    COMMAND_LANES: dict[str, str] = {
+        "gesture": "critical",
+        "threat": "critical",
+        "device": "device",
+        "llm": "background",
+        "personality": "background",
+    }
+
     def __init__(self, config: JarvisConfig | None = None) -> None:
         self.config = config or JarvisConfig.from_env()
 
@@ -37,13 +97,36 @@ class JarvisCore:
         self.device_controller = None
         self.personality = None
         self.threat_analyzer = None
+        self.intent_classifier = None
 
         self.running = False
         self.processing_command = False
         self.responding = False
         self._threads: list[threading.Thread] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._shutdown_event: asyncio.Event | None = None
+        self._sources_stopped = threading.Event()
+        self._pool: PriorityWorkerPool | None = None
+        self._closed = False
+        self._handler_executors: dict[str, ThreadPoolExecutor] = {}
+        self._pool_lock = threading.Lock()
+        self._module_futures: dict[str, Future] = {}
+        self.startup_report = StartupReport()
+
+        # Attribute name -> zero-argument factory, built in declaration order.
+        self.module_factories: dict[str, Callable[[], Any]] = {
+            "llm": self._create_llm,
+            "device_controller": self._create_device_controller,
+            "personality": self._create_personality,
+            "threat_analyzer": self._create_threat_analyzer,
+            "voice": self._create_voice,
+            "gesture": self._create_gesture,
+            "gui": self._create_gui,
+            # Trained off the startup path so the first offline answer does not pay for it.
+            "intent_classifier": self._create_intent_classifier,
+        }
 
-        self.command_handlers: dict[str, Callable[[str], str | None]] = {
+        self.command_handlers: dict[str, Callable[[str, Deadline | None], str | None]] = {
             "llm": self._handle_llm,
             "device": self._handle_device,
             "gesture": self._handle_gesture,
@@ -52,28 +135,171 @@ class JarvisCore:
         }
 
     def initialize(self) -> None:
+        """Build runtime modules, returning once text commands can be served.
+
+        Lightweight modules are built inline; hardware-backed modules are
+        built concurrently on background threads and attached when ready.
+        Per-module timings are recorded in ``startup_report``.
+        """
         logger.info("Initializing modules")
-        from modules.device_controller import DeviceController
-        from modules.enhanced_gui import EnhancedGUI
-        from modules.gesture_recognition import GestureRecognition
+        started = time.perf_counter()
+        self.startup_report = StartupReport()
+        background = [name for name in self.module_factories if name in self.BACKGROUND_MODULES]
+        executor = ThreadPoolExecutor(max_workers=max(1, len(background)), thread_name_prefix="jarvis-init")
+        for name in background:
+            self.startup_report.modules[name] = ModuleTiming(name, background=True)
+            self._module_futures[name] = executor.submit(self._init_module, name)
+        executor.shutdown(wait=False)
+
+        for name in self.module_factories:
+            if name not in self.BACKGROUND_MODULES:
+                self.startup_report.modules[name] = ModuleTiming(name)
+                self._init_module(name)
+
+        self.startup_report.text_ready_seconds = time.perf_counter() - started
+        logger.info("Text commands ready in %.0f ms", self.startup_report.text_ready_seconds * 1000)
+
+    def _init_module(self, name: str) -> None:
+        timing = self.startup_report.modules[name]
+        started = time.perf_counter()
+        try:
+            setattr(self, name, self.module_factories[name]())
+            timing.status = "ready"
+        except Exception as exc:  # a missing driver must not block the rest of startup
+            logger.exception("Module '%s' failed to initialize", name)
+            timing.status = "failed"
+            timing.error = str(exc)
+        finally:
+            timing.seconds = time.perf_counter() - started
+        logger.info("Module '%s' %s in %.0f ms", name, timing.status, timing.seconds * 1000)
+
+    def wait_for_module(self, name: str, timeout: float | None = None) -> Any:
+        """Return module ``name``, waiting up to ``timeout`` if it is still warming up."""
+        future = self._module_futures.get(name)
+        if future is not None:
+            try:
+                future.result(timeout=timeout)
+            except FutureTimeoutError:
+                pass
+        return getattr(self, name)
+
+    def _create_llm(self) -> LLMSelector:
+        from modules.conversation_memory import ConversationMemory
+        from modules.llm_cache import ResponseCache
         from modules.llm_selector import LLMSelector
+        from modules.local_llm import LocalModel
+
+        local_model = None
+        if self.config.local_model_path:
+            local_model = LocalModel(self.config.local_model_path, n_threads=self.config.local_model_threads or None)
+            if local_model.available:
+                # Load off the startup path so the first offline query finds it warm.
+                threading.Thread(target=self._warm_local_model, args=(local_model,), daemon=True).start()
+            else:
+                logger.warning("Local model unavailable (missing file or llama-cpp-python): %s", local_model.model_path)
+
+        return LLMSelector(
+            openai_api_key=self.config.openai_api_key,
+            huggingface_api_key=self.config.huggingface_api_key,
+            cache=ResponseCache(
+                max_entries=self.config.llm_cache_size,
+                ttl_seconds=self.config.llm_cache_ttl_seconds,
+                db_path=self.config.llm_cache_path or None,
+            ),
+            hedge_after_seconds=self.config.llm_hedge_after_seconds or None,
+            local_model=local_model,
+            memory=ConversationMemory(token_budget=self.config.llm_context_tokens)
+            if self.config.llm_context_tokens > 0
+            else None,
+        )
+
+    @staticmethod
+    def _warm_local_model(local_model: LocalModel) -> None:
+        try:
+            local_model.load()
+        except Exception as exc:
+            logger.warning("Local model warm-up failed: %s", exc)
+
+    def _create_intent_classifier(self) -> IntentClassifier:
+        from modules.intent_classifier import default_classifier
+
+        return default_classifier()
+
+    def _create_device_controller(self) -> DeviceController:
+        from modules.device_controller import DeviceController
+
+        controller = DeviceController()
+        controller.register_device("lights", interface="mock_interface")
+        return controller
+
+    def _create_personality(self) -> PersonalityModule:
         from modules.personality import PersonalityModule
+
+        return PersonalityModule()
+
+    def _create_threat_analyzer(self) -> ThreatAnalyzer:
         from modules.threat_analyzer import ThreatAnalyzer
+
+        return ThreatAnalyzer()
+
+    def _create_voice(self) -> VoiceInterface:
+        from modules.stt_backends import STTError, create_backend
         from modules.voice_interface import VoiceInterface
 
-        self.voice = VoiceInterface()
-        self.gesture = GestureRecognition()
-        self.llm = LLMSelector(
-            openai_api_key=self.config.openai_api_key,
-            huggingface_api_key=self.config.huggingface_api_key,
+        try:
+            stt = create_backend(self.config.stt_backend, self.config.vosk_model_path)
+        except STTError as exc:
+            logger.warning("Speech recognition unavailable: %s", exc)
+            stt = None
+        phrase_cache = None
+        if self.config.tts_cache_dir:
+            from modules.phrase_cache import PhraseCache
+
+            phrase_cache = PhraseCache(self.config.tts_cache_dir)
+        voice = VoiceInterface(
+            stt_backend=stt,
+            on_partial=self._show_partial_transcript,
+            phrase_cache=phrase_cache,
+            preprocess=self.config.audio_preprocess,
         )
-        self.device_controller = DeviceController()
-        self.personality = PersonalityModule()
-        self.threat_analyzer = ThreatAnalyzer()
-        self.device_controller.register_device("lights", interface="mock_interface")
-        self.gui = EnhancedGUI()
+        if phrase_cache is not None:
+            voice.prerender(self._stock_phrases())
+        return voice
+
+    @staticmethod
+    def _stock_phrases() -> list[str]:
+        """Fixed replies worth pre-rendering: personality, local and fallback responses."""
+        from modules.llm_selector import FALLBACK_RESPONSES, LOCAL_RESPONSES
+        from modules.personality import IDLE_RESPONSE, RESPONSES
+
+        phrases = [BUSY_RESPONSE, TIMEOUT_RESPONSE, *DEGRADED_RESPONSES.values(), IDLE_RESPONSE]
+        phrases.extend(phrase for replies in RESPONSES.values() for phrase in replies)
+        phrases.extend(LOCAL_RESPONSES.values())
+        phrases.extend(FALLBACK_RESPONSES)
+        return phrases
+
+    def _show_partial_transcript(self, text: str) -> None:
+        if self.gui:
+            self.gui.update_task("Hearing", text)
+
+    def _create_gesture(self) -> GestureRecognition:
+        from modules.gesture_recognition import GestureRecognition
+
+        return GestureRecognition()
+
+    def _create_gui(self) -> EnhancedGUI:
+        from modules.enhanced_gui import EnhancedGUI
+
+        return EnhancedGUI()
 
-    def process_command(self, command: str) -> str:
+    def process_command(self, command: str, deadline: Deadline | None = None) -> str:
+        """Route a command to its handler.
+
+        ``deadline`` is passed to the handler so it can bound its own I/O. A
+        command whose deadline has already passed (for example while queued)
+        is cancelled and answered with a fast degraded response, and so is
+        one whose handler is still running when the deadline passes.
+        """
         if not command:
             return ""
 
@@ -86,9 +312,13 @@ class JarvisCore:
 
         if ":" in clean:
             prefix, payload = clean.split(":", maxsplit=1)
-            handler = self.command_handlers.get(prefix.strip().lower())
+            prefix = prefix.strip().lower()
+            handler = self.command_handlers.get(prefix)
             if handler:
-                response = handler(payload.strip())
+                if deadline is not None and deadline.expired:
+                    logger.warning("Deadline expired before '%s' handler ran", prefix)
+                    return DEGRADED_RESPONSES.get(prefix, TIMEOUT_RESPONSE)
+                response = self._run_handler(prefix, handler, payload.strip(), deadline)
                 return response or ""
 
         return (
@@ -96,19 +326,116 @@ class JarvisCore:
             "Would you like me to search the internet for information about it?"
         )
 
-    def _handle_llm(self, payload: str) -> str:
-        return self.llm.query_llm(payload) if self.llm else "LLM unavailable"
-
-    def _handle_device(self, payload: str) -> str:
+    def _run_handler(
+        self,
+        prefix: str,
+        handler: Callable[[str, Deadline | None], str | None],
+        payload: str,
+        deadline: Deadline | None,
+    ) -> str | None:
+        """Run ``handler``, giving up on it with a degraded answer once ``deadline`` passes.
+
+        The handler runs on a separate thread so the caller stops waiting at the
+        deadline even when the handler itself cannot be interrupted; handlers
+        that do I/O bound it with the same deadline, which frees that thread too.
+        Each lane has its own handler threads, so handlers abandoned on the
+        background lane never hold up a critical command.
+        """
+        if deadline is None:
+            return handler(payload, None)
+        lane = self.COMMAND_LANES.get(prefix, "critical")
+        with self._pool_lock:
+            if self._closed:
+                # Accepted just before shutdown; don't start new handler threads for it
+                return DEGRADED_RESPONSES.get(prefix, TIMEOUT_RESPONSE)
+            executor = self._handler_executors.get(lane)
+            if executor is None:
+                executor = self._handler_executors[lane] = ThreadPoolExecutor(
+                    max_workers=max(1, self.config.command_workers), thread_name_prefix=f"jarvis-{lane}-handler"
+                )
+        future = executor.submit(handler, payload, deadline)
+        try:
+            return future.result(timeout=deadline.remaining())
+        except FutureTimeoutError:
+            future.cancel()
+            logger.warning("'%s' handler missed its deadline", prefix)
+            return DEGRADED_RESPONSES.get(prefix, TIMEOUT_RESPONSE)
+
+    def _command_pool(self) -> PriorityWorkerPool:
+        with self._pool_lock:
+            if self._closed:
+                raise RuntimeError("JARVIS is shut down; not accepting commands")
+            if self._pool is None:
+                workers = max(1, self.config.command_workers)
+                self._pool = PriorityWorkerPool(
+                    [
+                        Lane("critical", self.config.critical_lane_limit),
+                        Lane("device", self.config.device_lane_limit),
+                        # Keep one worker free for the lanes above a burst of LLM traffic.
+                        Lane("background", self.config.background_lane_limit, max_concurrency=max(1, workers - 1)),
+                    ],
+                    workers=workers,
+                    shed_policy=self.config.command_shed_policy,
+                )
+            return self._pool
+
+    def lane_for(self, command: str) -> str:
+        """Return the worker lane a command is scheduled on."""
+        prefix, separator, _ = command.strip().partition(":")
+        if not separator:
+            return "critical"
+        return self.COMMAND_LANES.get(prefix.strip().lower(), "critical")
+
+    def submit_command(
+        self, command: str, deadline: Deadline | None = None, stream_to_voice: bool = False
+    ) -> Future:
+        """Schedule ``process_command`` on the priority worker pool.
+
+        Without an explicit ``deadline`` the command gets the configured
+        ``command_timeout_seconds`` budget, measured from submission. With
+        ``stream_to_voice`` and ``llm_streaming`` enabled, ``llm:`` answers are
+        spoken sentence by sentence while the provider is still streaming.
+        The returned future resolves to the response text, or raises
+        ``LaneFullError`` when the command was shed under load. After
+        ``shutdown()`` this raises ``RuntimeError`` instead of starting a new pool.
+        """
+        if deadline is None:
+            deadline = Deadline.after(self.config.command_timeout_seconds)
+        pool = self._command_pool()
+        lane = self.lane_for(command)
+        prefix, _, payload = command.strip().partition(":")
+        if stream_to_voice and self.config.llm_streaming and prefix.strip().lower() == "llm":
+            return pool.submit(lane, self._speak_llm_stream, payload.strip(), deadline)
+        return pool.submit(lane, self.process_command, command, deadline)
+
+    def _speak_llm_stream(self, payload: str, deadline: Deadline) -> str:
+        if deadline.expired:
+            return DEGRADED_RESPONSES["llm"]
+        if not self.llm or not self.voice:
+            return self._handle_llm(payload, deadline)
+        return self.voice.speak(self.llm.query_llm_stream(payload, timeout=deadline.remaining()))
+
+    def command_pool_stats(self) -> dict[str, dict[str, int]]:
+        """Return per-lane worker pool counters."""
+        return self._pool.stats() if self._pool else {}
+
+    def _handle_llm(self, payload: str, deadline: Deadline | None = None) -> str:
+        if not self.llm:
+            return "LLM unavailable"
+        if deadline is None:
+            return self.llm.query_llm(payload)
+        return self.llm.query_llm(payload, timeout=deadline.remaining())
+
+    def _handle_device(self, payload: str, _deadline: Deadline | None = None) -> str:
         return self.device_controller.process_command(payload) if self.device_controller else "Device controller unavailable"
 
-    def _handle_threat(self, payload: str) -> str:
+    def _handle_threat(self, payload: str, _deadline: Deadline | None = None) -> str:
         return self.threat_analyzer.analyze_threat(payload) if self.threat_analyzer else "Threat analyzer unavailable"
 
-    def _handle_personality(self, payload: str) -> str:
+    def _handle_personality(self, payload: str, _deadline: Deadline | None = None) -> str:
         return self.personality.process_interaction(payload) if self.personality else "Personality module unavailable"
 
-    def _handle_gesture(self, payload: str) -> str:
+    def _handle_gesture(self, payload: str, _deadline: Deadline | None = None) -> str:
         gesture_actions: dict[str, Callable[[], str]] = {
             "wave": self._toggle_voice_recognition,
             "thumbs_up": lambda: "Action confirmed",
@@ -123,10 +450,11 @@ class JarvisCore:
         return action() if action else f"Unrecognized gesture: {payload}"
 
     def _toggle_voice_recognition(self) -> str:
-        if not self.voice:
+        voice = self.wait_for_module("voice", timeout=1.0)
+        if not voice:
             return "Voice interface unavailable"
-        self.voice.enabled = not self.voice.enabled
-        status = "enabled" if self.voice.enabled else "disabled"
+        voice.enabled = not voice.enabled
+        status = "enabled" if voice.enabled else "disabled"
         return f"Voice recognition {status}"
 
     def run_voice_loop(self) -> None:
@@ -134,16 +462,27 @@ class JarvisCore:
             if not self.processing_command and not self.responding and self.voice and self.gui:
                 self.gui.set_listening_mode(True)
                 self.gui.update_task("Listening", "Active")
-                cmd = self.voice.listen()
+                cmd = self.voice.listen(timeout=VOICE_LISTEN_TIMEOUT_SECONDS)
                 self.gui.set_listening_mode(False)
 
-                if cmd:
+                if cmd and self.running:
                     self.gui.display_output(f"You said: {cmd}")
-                    response = self.process_command(cmd)
-                    if response:
-                        self.gui.display_output(f"JARVIS: {response}")
+                    self.submit_command(cmd, stream_to_voice=True).add_done_callback(self._display_response)
             time.sleep(self.config.voice_poll_interval_seconds)
 
+    def _display_response(self, future: Future) -> None:
+        if future.cancelled() or not self.gui:
+            return
+        try:
+            response = future.result()
+        except LaneFullError:
+            response = BUSY_RESPONSE
+        except Exception:
+            logger.exception("Command failed")
+            return
+        if response:
+            self.gui.display_output(f"JARVIS: {response}")
+
     def run_threat_monitor(self) -> None:
         while self.running:
             if not self.processing_command and self.threat_analyzer and self.gui and self.voice:
@@ -152,11 +491,12 @@ class JarvisCore:
                     alert = f"High threat detected! Level {threat_level}"
                     self.gui.update_task("Threat Alert", "High")
                     self.gui.display_output(f"JARVIS: {alert}")
-                    self.voice.speak(alert)
+                    # Queued ahead of (and cutting off) any reply; polling continues at once.
+                    self.voice.speak(alert, priority=PRIORITY_ALERT, wait=False)
             time.sleep(self.config.threat_poll_interval_seconds)
 
     def run_gesture_loop(self) -> None:
-        if not self.gesture:
+        if not self.wait_for_module("gesture"):
             return
         if not self.gesture.start():
             logger.warning("Gesture recognition failed to start")
@@ -164,17 +504,25 @@ class JarvisCore:
 
         while self.running:
             gesture = self.gesture.detect_gesture()
-            if gesture != "none":
-                response = self.process_command(f"gesture:{gesture}")
-                logger.info("Gesture '%s' -> %s", gesture, response)
+            if gesture != "none" and self.running:
+                future = self.submit_command(f"gesture:{gesture}")
+                future.add_done_callback(lambda done, name=gesture: self._log_gesture(name, done))
             time.sleep(self.config.gesture_poll_interval_seconds)
 
+    def _log_gesture(self, gesture: str, future: Future) -> None:
+        if future.cancelled():
+            return
+        try:
+            logger.info("Gesture '%s' -> %s", gesture, future.result())
+        except LaneFullError:
+            logger.warning("Gesture '%s' shed under load", gesture)
+
     def start(self) -> None:
         logger.info("Starting JARVIS runtime")
         self.running = True
         self.initialize()
 
-        if self.gui:
+        if self.wait_for_module("gui"):
             self.gui.start()
         time.sleep(1)
 
@@ -192,15 +540,161 @@ class JarvisCore:
         except KeyboardInterrupt:
             self.shutdown()
 
+    async def run_async(self) -> None:
+        """Run voice, gesture and threat sources as events on one asyncio loop.
+
+        Blocking capture drivers run on daemon source threads that push events
+        onto the loop; commands are awaited on the priority worker pool. The loop
+        exits as soon as :meth:`shutdown` sets the shutdown event.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._shutdown_event = asyncio.Event()
+        self._sources_stopped.clear()
+        self.running = True
+        events: asyncio.Queue[tuple[str, str]] = asyncio.Queue()
+
+        self._threads = [
+            threading.Thread(target=self._voice_source, args=(events,), daemon=True),
+            threading.Thread(target=self._gesture_source, args=(events,), daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+        threat_task = asyncio.create_task(self._threat_source(events))
+        dispatch_task = asyncio.create_task(self._dispatch_events(events))
+        try:
+            await self._shutdown_event.wait()
+        finally:
+            self.running = False
+            self._sources_stopped.set()
+            threat_task.cancel()
+            dispatch_task.cancel()
+            await asyncio.gather(threat_task, dispatch_task, return_exceptions=True)
+            self._loop = None
+
+    def _emit(self, events: asyncio.Queue[tuple[str, str]], source: str, payload: str) -> None:
+        """Push an event from a source thread onto the runtime loop."""
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(events.put_nowait, (source, payload))
+
+    def _voice_source(self, events: asyncio.Queue[tuple[str, str]]) -> None:
+        self.wait_for_module("voice")
+        while not self._sources_stopped.is_set() and self.voice:
+            if self.gui:
+                self.gui.set_listening_mode(True)
+                self.gui.update_task("Listening", "Active")
+            cmd = self.voice.listen(timeout=VOICE_LISTEN_TIMEOUT_SECONDS)
+            if self.gui:
+                self.gui.set_listening_mode(False)
+            if cmd:
+                self._emit(events, "voice", cmd)
+
+    def _gesture_source(self, events: asyncio.Queue[tuple[str, str]]) -> None:
+        if not self.wait_for_module("gesture"):
+            return
+        if not self.gesture.start():
+            logger.warning("Gesture recognition failed to start")
+            return
+        while not self._sources_stopped.is_set():
+            gesture = self.gesture.wait_for_gesture(timeout=0.5)
+            if gesture != "none":
+                self._emit(events, "gesture", gesture)
+
+    async def _threat_source(self, events: asyncio.Queue[tuple[str, str]]) -> None:
+        if not self.threat_analyzer:
+            return
+        loop = asyncio.get_running_loop()
+        while not self._shutdown_event.is_set():
+            threat_level = await loop.run_in_executor(None, self.threat_analyzer.analyze)
+            if threat_level >= 7:
+                await events.put(("threat", str(threat_level)))
+            try:
+                await asyncio.wait_for(
+                    self._shutdown_event.wait(), timeout=self.config.threat_poll_interval_seconds
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def _dispatch_events(self, events: asyncio.Queue[tuple[str, str]]) -> None:
+        pending: set[asyncio.Task[None]] = set()
+        try:
+            while True:
+                source, payload = await events.get()
+                task = asyncio.create_task(self._handle_event(source, payload))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _run_command(self, command: str, stream_to_voice: bool = False) -> str:
+        try:
+            return await asyncio.wrap_future(self.submit_command(command, stream_to_voice=stream_to_voice))
+        except LaneFullError:
+            return BUSY_RESPONSE
+
+    async def _handle_event(self, source: str, payload: str) -> None:
+        try:
+            if source == "voice":
+                if self.gui:
+                    self.gui.display_output(f"You said: {payload}")
+                response = await self._run_command(payload, stream_to_voice=True)
+                if response and self.gui:
+                    self.gui.display_output(f"JARVIS: {response}")
+            elif source == "gesture":
+                response = await self._run_command(f"gesture:{payload}")
+                logger.info("Gesture '%s' -> %s", payload, response)
+            elif source == "threat":
+                alert = f"High threat detected! Level {payload}"
+                if self.gui:
+                    self.gui.update_task("Threat Alert", "High")
+                    self.gui.display_output(f"JARVIS: {alert}")
+                if self.voice:
+                    self.voice.speak(alert, priority=PRIORITY_ALERT, wait=False)
+        except Exception:  # keep the runtime loop alive on handler failure
+            logger.exception("Handler for %s event failed", source)
+
+    def start_async(self) -> None:
+        """Initialize modules and run the asyncio runtime until shutdown."""
+        logger.info("Starting JARVIS async runtime")
+        self.initialize()
+        if self.wait_for_module("gui"):
+            self.gui.start()
+        try:
+            asyncio.run(self.run_async())
+        except KeyboardInterrupt:
+            self.shutdown()
+
     def shutdown(self) -> None:
         logger.info("Shutdown initiated")
         self.running = False
+        self._sources_stopped.set()
+        with self._pool_lock:
+            self._closed = True
+            pool, self._pool = self._pool, None
+            executors, self._handler_executors = self._handler_executors, {}
+        if pool is not None:
+            pool.shutdown(wait=False)
+        for executor in executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        if self._loop is not None and self._shutdown_event is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._shutdown_event.set)
+            except RuntimeError:  # loop already closed
+                pass
         if self.gesture:
             self.gesture.release()
+        if self.voice and hasattr(self.voice, "close"):
+            self.voice.close()
         if self.gui:
             self.gui.stop()
         logger.info("Shutdown complete")
 
 
 if __name__ == "__main__":
-    JarvisCore().start()
+    core = JarvisCore()
+    if core.config.runtime_mode == "async":
+        core.start_async()
+    else:
+        core.start()
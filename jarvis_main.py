@@ -1,5 +1,4 @@
 import win32com.client
-import speech_recognition as sr
 import time
 from jarvis_commands import execute_command
 import os
@@ -12,6 +11,14 @@ from ctypes import wintypes
 import win32api
 import win32con
 from modules.enhanced_gui import EnhancedGUI
+from modules.audio_capture import AudioCapture, UtteranceSegmenter
+from modules.audio_preprocess import AudioPreprocessor
+from modules.stt_backends import STTError, create_backend
+from modules.phrase_cache import PhraseCache
+from modules.tts_worker import PRIORITY_RESPONSE, TTSWorker
+from modules.wake_word import WakeWordDetector, WakeWordGate, transcribe_around_wake_word
+from config import JarvisConfig
+from deadline import Deadline
 import pyttsx3
 
 # Load environment variables
@@ -20,26 +27,62 @@ load_dotenv()
 # Initialize GUI
 gui = EnhancedGUI()
 
-# Initialize text-to-speech engine
-try:
+def create_speaker():
+    """Build the text-to-speech engine (called on the TTS worker thread)"""
     speaker = pyttsx3.init()
     speaker.setProperty('rate', 150)  # Speed of speech
     speaker.setProperty('volume', 1.0)  # Volume (0.0 to 1.0)
-except Exception as e:
-    print(f"Error initializing speech engine: {e}")
-    speaker = None
+    return speaker
+
+config = JarvisConfig.from_env()
+
+# One worker thread owns the speech engine and speaks queued utterances,
+# most urgent first, so callers never race on the engine. Stock phrases play
+# from pre-rendered audio when JARVIS_TTS_CACHE_DIR is set.
+phrase_cache = PhraseCache(config.tts_cache_dir) if config.tts_cache_dir else None
+tts = TTSWorker(create_speaker, phrase_cache)
 
 # Global variables
 listening_active = True
 conversation_active = False
-is_speaking = False
 security_activated = False
 
 # Queue for commands to process
 command_queue = queue.Queue()
 
-# Event to signal when to stop speaking
-stop_speaking_event = threading.Event()
+# Speech-to-text backend: Google by default, or offline Vosk with partial results
+stt = create_backend(config.stt_backend, config.vosk_model_path)
+
+def show_partial(text):
+    """Show what JARVIS has heard so far while the user is still speaking"""
+    if gui and gui.root:
+        gui.root.after(0, lambda: gui.update_task("Hearing", text))
+
+# Resample, denoise and trim utterances before they are sent for recognition
+preprocessor = AudioPreprocessor() if config.audio_preprocess else None
+
+# On-device wake-word spotting: with templates in JARVIS_WAKE_WORD_DIR, only
+# utterances containing "jarvis" (and follow-ups shortly after) reach the recognizer
+wake_gate = None
+if config.wake_word_dir:
+    wake_gate = WakeWordGate(WakeWordDetector.from_directory(
+        config.wake_word_dir, threshold=config.wake_word_threshold or None))
+    if not wake_gate.detector.ready:
+        print(f"⚠️ No wake-word templates in {config.wake_word_dir}; recognizing everything")
+
+def open_recognition_stream(sample_rate):
+    """Decode while the user speaks, but only when the wake-word window is open"""
+    if wake_gate is not None and not wake_gate.is_open:
+        return None
+    return stt.open_stream(sample_rate)
+
+# One microphone stream for the whole session. Utterances are cut by voice
+# activity detection as they end, against a continuously updated noise floor.
+audio_capture = AudioCapture(
+    segmenter=UtteranceSegmenter(hangover_ms=500, max_utterance_seconds=5),
+    open_stream=open_recognition_stream if stt.streaming else None,
+    on_partial=show_partial,
+)
 
 # Security settings
 SECURITY_KEYWORD = "WAKE UP JARVIS"  # The keyword required to activate JARVIS
@@ -75,73 +118,73 @@ security_responses = {
     ]
 }
 
-def speak(text):
-    global is_speaking
-    try:
-        print("🤖 JARVIS:", text)
-        if gui and gui.root:
-            gui.root.after(0, lambda: gui.display_output(f"JARVIS: {text}"))
-        is_speaking = True
-        stop_speaking_event.clear()
-        
-        if speaker:
-            speaker.say(text)
-            speaker.runAndWait()
-        
-    except Exception as e:
-        print(f"Error in speech generation: {e}")
-    finally:
-        is_speaking = False
+# Render the fixed replies ahead of time; the worker does this while idle
+tts.prerender(greetings + interruption_responses + security_responses["success"]
+              + security_responses["failure"]
+              + ["You're welcome, sir.", "Goodbye, sir. Call me when you need me.",
+                 "Initiating shutdown sequence. Goodbye, sir."])
+
+def speak(text, priority=PRIORITY_RESPONSE, wait=True):
+    """Queue text on the speech worker; by default wait until it has been spoken"""
+    print("🤖 JARVIS:", text)
+    if gui and gui.root:
+        gui.root.after(0, lambda: gui.display_output(f"JARVIS: {text}"))
+    handle = tts.say(text, priority)
+    if wait:
+        handle.wait()
 
 def stop_speaking():
-    """Stop the current speech"""
-    global is_speaking
-    if is_speaking and speaker:
-        try:
-            speaker.stop()
-            is_speaking = False
-            return True
-        except Exception as e:
-            print(f"Error stopping speech: {e}")
-    return False
+    """Stop the current speech and drop queued replies"""
+    return tts.interrupt()
+
+def transcribe(utterance):
+    """Preprocess and recognize one utterance; silence never reaches the recognizer"""
+    if preprocessor is not None:
+        utterance, report = preprocessor.process(utterance)
+        print(f"Audio preprocessed: {report.bytes_saved} bytes saved in {report.total_ms:.0f} ms")
+    return stt.transcribe(utterance) if utterance.pcm else ""
 
 def listen():
-    recognizer = sr.Recognizer()
-    recognizer.dynamic_energy_threshold = True
-    recognizer.energy_threshold = 250  # Even lower threshold for better sensitivity
-    recognizer.pause_threshold = 0.5  # Shorter pause threshold for faster response
-    
-    with sr.Microphone() as source:
-        # Quick ambient noise adjustment
-        recognizer.adjust_for_ambient_noise(source, duration=0.3)
-        try:
-            # Shorter timeout and phrase time limit for faster response
-            audio = recognizer.listen(source, timeout=2, phrase_time_limit=2)
-            print("Processing speech...")
-            
-            try:
-                text = recognizer.recognize_google(audio)
-                print("🧠 You said:", text)
-                
-                # If JARVIS is speaking and we detect speech, interrupt him
-                if is_speaking:
-                    stop_speaking()
-                    # Add a brief pause to acknowledge the interruption
-                    time.sleep(0.5)
-                    speak(random.choice(interruption_responses))
-                
-                return text.lower()
-            except sr.UnknownValueError:
-                # Don't print error to keep interface clean
-                pass
-            except sr.RequestError as e:
-                print("⚠️ Could not request results; {0}".format(e))
-                
-        except sr.WaitTimeoutError:
-            # Don't print timeout message to keep the interface clean
-            pass
-    
-    return ""
+    # Wait briefly for the capture thread to cut the next utterance
+    utterance = audio_capture.next_utterance(timeout=2)
+    if utterance is None:
+        # Don't print timeout message to keep the interface clean
+        return ""
+
+    # Background chatter without the wake word never reaches the recognizer
+    if wake_gate is not None and not wake_gate.admit(utterance):
+        return ""
+    match = wake_gate.last_match if wake_gate is not None else None
+
+    print("Processing speech...")
+    try:
+        # Streaming backends have already decoded the utterance during capture
+        if utterance.text is not None:
+            text = utterance.text
+        elif match is not None:
+            # The spotter already knows the wake phrase; only the speech around it
+            # ("wake up" in "wake up jarvis") is sent for recognition
+            text = transcribe_around_wake_word(utterance, match, transcribe)
+        else:
+            text = transcribe(utterance)
+    except STTError as e:
+        print("⚠️ Could not request results; {0}".format(e))
+        return ""
+
+    if not text:
+        # Don't print error to keep interface clean
+        return ""
+
+    print("🧠 You said:", text)
+
+    # If JARVIS is speaking and we detect speech, interrupt him
+    if tts.is_speaking:
+        stop_speaking()
+        # Add a brief pause to acknowledge the interruption
+        time.sleep(0.5)
+        speak(random.choice(interruption_responses))
+
+    return text.lower()
 
 def is_wake_word(command):
     wake_words = ["hey jarvis", "hello jarvis", "jarvis", "hey j", "hello j"]
@@ -166,11 +209,11 @@ def continuous_listening():
     while listening_active:
         command = listen()
         if command:
-            # Add command to queue for processing
-            command_queue.put(command)
+            # Add command to queue for processing; its time budget starts now
+            command_queue.put((command, Deadline.after(config.command_timeout_seconds)))
 
-def process_command(command):
-    """Process the command and respond"""
+def process_command(command, deadline=None):
+    """Process the command and respond within ``deadline`` (JARVIS_COMMAND_TIMEOUT by default)"""
     global conversation_active, security_activated, listening_active
     
     if "exit" in command or "shutdown" in command:
@@ -196,14 +239,21 @@ def process_command(command):
     # Process command
     if command.strip() != "":
         print("⚙️ Processing your command...")
-        response = execute_command(command)
+        if deadline is None:
+            deadline = Deadline.after(config.command_timeout_seconds)
+        response = execute_command(command, timeout=deadline.remaining())
         speak(response)
+        if wake_gate is not None:
+            # Give the user a moment to follow up without saying "jarvis" again
+            wake_gate.hold_open()
         
         # Check for follow-up indicators
         if "thank you" in command or "thanks" in command:
             speak("You're welcome, sir.")
         elif "goodbye" in command or "bye" in command:
             conversation_active = False
+            if wake_gate is not None:
+                wake_gate.close()
             speak("Goodbye, sir. Call me when you need me.")
 
 def command_processor():
@@ -211,8 +261,8 @@ def command_processor():
     while listening_active:
         try:
             # Get command from queue with timeout
-            command = command_queue.get(timeout=0.1)
-            process_command(command)
+            command, deadline = command_queue.get(timeout=0.1)
+            process_command(command, deadline)
         except queue.Empty:
             # No commands in queue, continue
             pass
@@ -234,7 +284,8 @@ def main():
     print("     You can interrupt JARVIS while he's speaking by just talking")
     print(f"     Security keyword: '{SECURITY_KEYWORD}'")
     
-    # Start continuous listening in a separate thread
+    # Open the microphone once and start continuous listening in a separate thread
+    audio_capture.start()
     listen_thread = threading.Thread(target=continuous_listening)
     listen_thread.daemon = True
     listen_thread.start()
@@ -251,6 +302,8 @@ def main():
         print("\nShutting down JARVIS...")
     finally:
         listening_active = False
+        audio_capture.stop()
+        tts.close()
         gui.stop()
 
 if __name__ == "__main__":
@@ -0,0 +1,406 @@
+"""Long-lived microphone capture with ring-buffered, frame-level speech segmentation.
+
+One input stream is opened for the life of the process. A capture thread
+reads fixed-size frames into a ring buffer and runs an energy-based voice
+activity detector on each frame; completed utterances are sliced out of the
+ring buffer (with some pre-roll) and queued for recognition. The noise floor
+the detector compares against is updated on every non-speech frame, so there
+is no per-utterance ambient-noise calibration. The most recent non-speech
+frames travel with each utterance (``Utterance.ambient``) so later noise
+reduction can learn the background from real silence.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+import wave
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Protocol
+
+import numpy as np
+
+try:
+    import speech_recognition as sr
+except ImportError:  # optional in constrained environments
+    sr = None
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # 16-bit signed PCM
+FRAME_MS = 30
+
+
+class AudioSource(Protocol):
+    def read(self, frames: int) -> bytes: ...
+
+    def close(self) -> None: ...
+
+
+class SpeechStream(Protocol):
+    """Incremental recognizer fed while an utterance is in progress."""
+
+    def accept(self, pcm: bytes) -> str | None: ...
+
+    def finish(self) -> str: ...
+
+
+class WavFileSource:
+    """Replay a 16-bit mono WAV file as if it were a microphone (tests, offline runs)."""
+
+    def __init__(self, path: str, sample_rate: int = SAMPLE_RATE) -> None:
+        self._wav = wave.open(path, "rb")
+        if (self._wav.getnchannels(), self._wav.getsampwidth(), self._wav.getframerate()) != (1, 2, sample_rate):
+            self._wav.close()
+            raise ValueError(f"{path}: expected 16-bit mono PCM at {sample_rate} Hz")
+
+    def read(self, frames: int) -> bytes:
+        return self._wav.readframes(frames)
+
+    def close(self) -> None:
+        self._wav.close()
+
+
+class MicrophoneSource:
+    """The default input device, opened once through SpeechRecognition/PyAudio."""
+
+    def __init__(
+        self, sample_rate: int = SAMPLE_RATE, frame_samples: int = 480, device_index: int | None = None
+    ) -> None:
+        if sr is None:
+            raise RuntimeError("SpeechRecognition is not installed")
+        self._microphone = sr.Microphone(device_index=device_index, sample_rate=sample_rate, chunk_size=frame_samples)
+        self._stream = self._microphone.__enter__().stream
+
+    def read(self, frames: int) -> bytes:
+        return self._stream.read(frames)
+
+    def close(self) -> None:
+        self._microphone.__exit__(None, None, None)
+
+
+class RingBuffer:
+    """Fixed-size circular store of int16 samples addressed by absolute sample index."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.int16)
+        self.written = 0
+        self._lock = threading.Lock()
+
+    def write(self, samples: np.ndarray) -> None:
+        samples = samples[-self.capacity:]
+        with self._lock:
+            start = self.written % self.capacity
+            first = min(len(samples), self.capacity - start)
+            self._data[start:start + first] = samples[:first]
+            self._data[: len(samples) - first] = samples[first:]
+            self.written += len(samples)
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """Copy samples ``[start, end)``; the start is clamped to what is still held."""
+        with self._lock:
+            start = max(start, self.written - self.capacity, 0)
+            end = min(end, self.written)
+            indices = np.arange(start, end) % self.capacity
+            return self._data[indices].copy()
+
+
+def frame_energy(frame: np.ndarray) -> float:
+    """Root-mean-square amplitude of an int16 frame."""
+    if not len(frame):
+        return 0.0
+    return float(np.sqrt(np.mean(frame.astype(np.float32) ** 2)))
+
+
+class NoiseFloor:
+    """Running estimate of background energy, tracked on non-speech frames.
+
+    The estimate falls quickly when the room gets quieter and rises slowly
+    when it gets louder, so brief speech onsets do not drag it upward.
+    """
+
+    def __init__(
+        self, ratio: float = 3.0, min_threshold: float = 100.0, fall_alpha: float = 0.2, rise_alpha: float = 0.02
+    ) -> None:
+        self.ratio = ratio
+        self.min_threshold = min_threshold
+        self.fall_alpha = fall_alpha
+        self.rise_alpha = rise_alpha
+        self.level: float | None = None
+
+    @property
+    def threshold(self) -> float:
+        return max(self.min_threshold, (self.level or 0.0) * self.ratio)
+
+    def update(self, energy: float) -> None:
+        if self.level is None:
+            self.level = energy
+            return
+        alpha = self.fall_alpha if energy < self.level else self.rise_alpha
+        self.level += alpha * (energy - self.level)
+
+    def reseed(self, energy: float) -> None:
+        """Jump to ``energy`` when it is clearly the new background level."""
+        self.level = max(self.level or 0.0, energy)
+
+
+class UtteranceSegmenter:
+    """Frame-by-frame speech start/end detection over absolute sample indices.
+
+    Speech starts after ``start_ms`` of consecutive frames above the noise
+    threshold and ends after ``hangover_ms`` of frames below it, or once the
+    utterance reaches ``max_utterance_seconds``. Returned spans include
+    ``pre_roll_ms`` of audio before the detected onset.
+
+    Speech has pauses, so if even the quietest frame of a max-length
+    utterance was above the threshold, the room got louder: the noise floor is
+    re-seeded from that frame instead of cutting noise forever.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = SAMPLE_RATE,
+        frame_ms: int = FRAME_MS,
+        start_ms: int = 90,
+        hangover_ms: int = 500,
+        pre_roll_ms: int = 300,
+        max_utterance_seconds: float = 10.0,
+        noise_floor: NoiseFloor | None = None,
+    ) -> None:
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.pre_roll_samples = sample_rate * pre_roll_ms // 1000
+        self.max_samples = int(sample_rate * max_utterance_seconds)
+        self.noise_floor = noise_floor or NoiseFloor()
+        self.in_speech = False
+        # Whether the last pushed frame was above the noise threshold.
+        self.last_voiced = False
+        self._voiced = 0
+        self._silent = 0
+        self._start = 0
+        self._quietest = float("inf")
+
+    @property
+    def utterance_start(self) -> int:
+        """Sample index where the current (or last) utterance starts, pre-roll included."""
+        return self._start
+
+    def push(self, frame: np.ndarray, end_index: int) -> tuple[int, int] | None:
+        """Feed the frame ending at ``end_index``; returns a finished ``(start, end)`` span."""
+        energy = frame_energy(frame)
+        voiced = energy > self.noise_floor.threshold
+        self.last_voiced = voiced
+        if not self.in_speech:
+            if voiced:
+                self._voiced += 1
+            else:
+                self._voiced = 0
+                self.noise_floor.update(energy)
+            if self._voiced >= self.start_frames:
+                self.in_speech = True
+                self._silent = 0
+                self._quietest = float("inf")
+                onset = end_index - self._voiced * len(frame)
+                self._start = max(0, onset - self.pre_roll_samples)
+            return None
+
+        self._silent = 0 if voiced else self._silent + 1
+        self._quietest = min(self._quietest, energy)
+        too_long = end_index - self._start >= self.max_samples
+        if self._silent >= self.hangover_frames or too_long:
+            if too_long and self._quietest > self.noise_floor.threshold:
+                self.noise_floor.reseed(self._quietest)
+            self.in_speech = False
+            self._voiced = 0
+            return self._start, end_index
+        return None
+
+
+@dataclass(frozen=True)
+class Utterance:
+    """A segmented stretch of 16-bit PCM speech (interleaved if ``channels`` > 1)."""
+
+    pcm: bytes
+    sample_rate: int = SAMPLE_RATE
+    sample_width: int = SAMPLE_WIDTH
+    # Final transcript when a streaming recognizer decoded it during capture.
+    text: str | None = None
+    channels: int = 1
+    # Background audio heard just before the utterance (non-speech frames, same format).
+    ambient: bytes = b""
+
+    @property
+    def duration(self) -> float:
+        return len(self.pcm) / (self.sample_rate * self.sample_width * self.channels)
+
+    def to_audio_data(self):
+        """Wrap as ``speech_recognition.AudioData`` for its recognizers."""
+        if sr is None:
+            raise RuntimeError("SpeechRecognition is not installed")
+        return sr.AudioData(self.pcm, self.sample_rate, self.sample_width)
+
+
+class AudioCapture:
+    """Keep one input stream open and hand out utterances as they are cut.
+
+    With ``open_stream`` set, each utterance is also fed frame by frame to a
+    streaming recognizer while it is being spoken: partial hypotheses go to
+    ``on_partial`` and the final transcript arrives on ``Utterance.text``.
+    ``open_stream`` may return None to leave an utterance undecoded.
+    The last ``ambient_seconds`` of non-speech frames are attached to every
+    utterance as ``Utterance.ambient``. Failed reads are retried with
+    exponential backoff from ``read_backoff_seconds`` (capped at one second);
+    after ``max_read_errors`` in a row, e.g. an unplugged device, capture stops.
+    """
+
+    def __init__(
+        self,
+        source: AudioSource | None = None,
+        sample_rate: int = SAMPLE_RATE,
+        frame_ms: int = FRAME_MS,
+        buffer_seconds: float = 15.0,
+        segmenter: UtteranceSegmenter | None = None,
+        max_pending: int = 8,
+        open_stream: Callable[[int], SpeechStream | None] | None = None,
+        on_partial: Callable[[str], None] | None = None,
+        ambient_seconds: float = 1.0,
+        max_read_errors: int = 10,
+        read_backoff_seconds: float = 0.05,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self._ambient: deque[np.ndarray] = deque(maxlen=max(1, int(ambient_seconds * 1000) // frame_ms))
+        self.max_read_errors = max_read_errors
+        self.read_backoff_seconds = read_backoff_seconds
+        self.segmenter = segmenter or UtteranceSegmenter(sample_rate=sample_rate, frame_ms=frame_ms)
+        self.ring = RingBuffer(int(sample_rate * buffer_seconds))
+        self._source = source
+        self._open_stream = open_stream
+        self._on_partial = on_partial
+        self._speech_stream: SpeechStream | None = None
+        self._last_partial = ""
+        self._utterances: queue.Queue[Utterance] = queue.Queue(maxsize=max_pending)
+        self._running = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._counters = {
+            "frames": 0,
+            "utterances": 0,
+            "dropped_utterances": 0,
+            "read_errors": 0,
+            "partials": 0,
+            "decode_errors": 0,
+        }
+
+    def start(self) -> None:
+        """Open the source (the default microphone if none was given) and start capturing."""
+        if self._thread is not None:
+            return
+        if self._source is None:
+            self._source = MicrophoneSource(self.sample_rate, self.frame_samples)
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, name="audio-capture", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        failures = 0
+        while self._running.is_set():
+            try:
+                data = self._source.read(self.frame_samples)
+            except Exception as exc:  # device hiccups should not kill the stream
+                self._counters["read_errors"] += 1
+                failures += 1
+                if failures >= self.max_read_errors:
+                    logger.error("Audio capture stopped after %d failed reads in a row: %s", failures, exc)
+                    break
+                logger.warning("Audio read failed: %s", exc)
+                time.sleep(min(1.0, self.read_backoff_seconds * 2 ** (failures - 1)))
+                continue
+            failures = 0
+            if not data:
+                break
+            frame = np.frombuffer(data, dtype=np.int16)
+            self.ring.write(frame)
+            self._counters["frames"] += 1
+            was_in_speech = self.segmenter.in_speech
+            span = self.segmenter.push(frame, self.ring.written)
+            if not was_in_speech and not self.segmenter.in_speech and not self.segmenter.last_voiced:
+                self._ambient.append(frame)
+            text = self._decode(data, was_in_speech, span) if self._open_stream is not None else None
+            if span is not None:
+                ambient = b"".join(noise.tobytes() for noise in self._ambient)
+                self._emit(Utterance(self.ring.read(*span).tobytes(), self.sample_rate, text=text, ambient=ambient))
+        self._running.clear()
+
+    def _decode(self, data: bytes, was_in_speech: bool, span: tuple[int, int] | None) -> str | None:
+        """Feed the streaming recognizer; returns the final text when ``span`` closes an utterance."""
+        try:
+            if not was_in_speech and self.segmenter.in_speech:
+                self._speech_stream = self._open_stream(self.sample_rate)
+                self._last_partial = ""
+                # Catch the recognizer up on the onset frames and pre-roll.
+                data = self.ring.read(self.segmenter.utterance_start, self.ring.written).tobytes()
+            if self._speech_stream is None:
+                return None
+            partial = self._speech_stream.accept(data)
+            if partial and partial != self._last_partial:
+                self._last_partial = partial
+                self._counters["partials"] += 1
+                if self._on_partial is not None:
+                    self._on_partial(partial)
+            if span is not None:
+                stream, self._speech_stream = self._speech_stream, None
+                return stream.finish()
+        except Exception as exc:  # the consumer falls back to batch transcription
+            self._counters["decode_errors"] += 1
+            logger.warning("Streaming recognition failed: %s", exc)
+            self._speech_stream = None
+        return None
+
+    def _emit(self, utterance: Utterance) -> None:
+        # A consumer that falls behind loses the oldest pending utterance.
+        while True:
+            try:
+                self._utterances.put_nowait(utterance)
+                break
+            except queue.Full:
+                try:
+                    self._utterances.get_nowait()
+                    self._counters["dropped_utterances"] += 1
+                except queue.Empty:
+                    pass
+        self._counters["utterances"] += 1
+
+    def next_utterance(self, timeout: float | None = None) -> Utterance | None:
+        """Block until an utterance is cut; ``None`` on timeout."""
+        try:
+            return self._utterances.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    @property
+    def running(self) -> bool:
+        return self._running.is_set()
+
+    def stop(self) -> None:
+        self._running.clear()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self._source is not None:
+            self._source.close()
+
+    def stats(self) -> dict[str, float]:
+        """Return frame and utterance counters plus the current noise floor and threshold."""
+        return {
+            **self._counters,
+            "noise_floor": self.segmenter.noise_floor.level or 0.0,
+            "threshold": self.segmenter.noise_floor.threshold,
+            "in_speech": self.segmenter.in_speech,
+        }
@@ -0,0 +1,220 @@
+"""Vectorized clean-up of captured utterances before speech recognition.
+
+``AudioPreprocessor.process`` turns an utterance in whatever format it was
+captured into what the recognizers want, and makes it smaller on the way:
+
+1. ``resample``: down-mix to mono and resample to 16 kHz (band-limited, via FFT).
+2. ``denoise``: spectral gating. STFT bins below a per-frequency noise
+   threshold are attenuated and the signal is overlap-added back. The
+   threshold is learned from the non-speech audio the capture VAD saw just
+   before the utterance (``Utterance.ambient``), or from the quietest frames
+   of the utterance itself when there is none, and carried across utterances.
+3. ``trim``: drop leading and trailing silence, keeping a little padding. The
+   silence threshold follows the learned noise profile rather than a fixed
+   level, so quiet speech the capture VAD accepted is not trimmed away.
+4. ``quantize``: clip back to 16-bit mono PCM. Recognizers that upload audio
+   compress it themselves (the Google backend sends FLAC), so the bytes saved
+   come from resampling, down-mixing and trimming.
+
+Every step works on whole arrays in reusable scratch buffers; there are no
+per-frame Python loops. Each call returns a ``PreprocessReport`` with the
+bytes saved and the milliseconds each step took.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field, replace
+
+import numpy as np
+
+from modules.audio_capture import SAMPLE_RATE, SAMPLE_WIDTH, Utterance
+
+STFT_WINDOW = 512
+STFT_HOP = STFT_WINDOW // 2
+STEPS = ("resample", "denoise", "trim", "quantize")
+
+
+@dataclass(frozen=True)
+class PreprocessReport:
+    input_bytes: int
+    output_bytes: int
+    step_ms: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.input_bytes - self.output_bytes
+
+    @property
+    def total_ms(self) -> float:
+        return sum(self.step_ms.values())
+
+
+def resample(samples: np.ndarray, from_rate: int, to_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Band-limited resampling by truncating or zero-padding the spectrum."""
+    if from_rate == to_rate or not len(samples):
+        return samples
+    length = max(1, round(len(samples) * to_rate / from_rate))
+    spectrum = np.fft.rfft(samples)
+    return (np.fft.irfft(spectrum[: length // 2 + 1], length) * (length / len(samples))).astype(np.float32)
+
+
+class AudioPreprocessor:
+    """Resample, denoise, trim and quantize utterances, reporting what it saved.
+
+    A bin counts as speech once it exceeds the noise mean by ``n_std``
+    standard deviations; gated bins are scaled by ``attenuation``. Without
+    ambient audio, ``noise_percentile`` picks which of the utterance's own
+    frames are treated as noise when learning the profile.
+
+    Trimming keeps the frames louder than ``trim_ratio`` of the loudest one and
+    louder than ``trim_noise_ratio`` times the noise left over after gating.
+    """
+
+    def __init__(
+        self,
+        target_rate: int = SAMPLE_RATE,
+        n_std: float = 2.5,
+        attenuation: float = 0.1,
+        noise_percentile: float = 20.0,
+        noise_smoothing: float = 0.5,
+        trim_ratio: float = 0.05,
+        trim_noise_ratio: float = 3.0,
+        trim_padding_ms: int = 100,
+    ) -> None:
+        self.target_rate = target_rate
+        self.n_std = n_std
+        self.attenuation = attenuation
+        self.noise_percentile = noise_percentile
+        self.noise_smoothing = noise_smoothing
+        self.trim_ratio = trim_ratio
+        self.trim_noise_ratio = trim_noise_ratio
+        self.trim_padding = target_rate * trim_padding_ms // 1000
+        # Periodic sqrt-Hann: analysis x synthesis windows overlap-add to exactly 1 at 50% hop.
+        self._window = np.sqrt(0.5 - 0.5 * np.cos(2 * np.pi * np.arange(STFT_WINDOW) / STFT_WINDOW)).astype(np.float32)
+        self.noise_profile: np.ndarray | None = None
+        self._scratch: dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+        self._totals = {"utterances": 0, "input_bytes": 0, "output_bytes": 0, **{f"{step}_ms": 0.0 for step in STEPS}}
+
+    def _buffer(self, name: str, size: int, dtype=np.float32) -> np.ndarray:
+        """A length-``size`` view of a reusable buffer that only grows."""
+        buffer = self._scratch.get(name)
+        if buffer is None or len(buffer) < size or buffer.dtype != dtype:
+            buffer = np.empty(max(size, 2 * len(buffer) if buffer is not None else size), dtype=dtype)
+            self._scratch[name] = buffer
+        return buffer[:size]
+
+    def process(self, utterance: Utterance) -> tuple[Utterance, PreprocessReport]:
+        """Return the cleaned-up utterance (16-bit mono at ``target_rate``) and its report."""
+        with self._lock:
+            timings: dict[str, float] = {}
+            started = time.perf_counter()
+            samples = resample(self._to_mono(utterance), utterance.sample_rate, self.target_rate)
+            ambient = None
+            if utterance.ambient:
+                ambient = self._to_mono(replace(utterance, pcm=utterance.ambient), "ambient")
+                ambient = resample(ambient, utterance.sample_rate, self.target_rate)
+            timings["resample"] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            samples = self._denoise(samples, ambient)
+            timings["denoise"] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            samples = self._trim(samples)
+            timings["trim"] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            pcm = np.clip(samples, -32768, 32767, out=samples).astype(np.int16).tobytes()
+            timings["quantize"] = time.perf_counter() - started
+
+            report = PreprocessReport(len(utterance.pcm), len(pcm), {step: ms * 1000 for step, ms in timings.items()})
+            self._totals["utterances"] += 1
+            self._totals["input_bytes"] += report.input_bytes
+            self._totals["output_bytes"] += report.output_bytes
+            for step, ms in report.step_ms.items():
+                self._totals[f"{step}_ms"] += ms
+        cleaned = replace(utterance, pcm=pcm, sample_rate=self.target_rate, sample_width=SAMPLE_WIDTH, channels=1)
+        return cleaned, report
+
+    def _to_mono(self, utterance: Utterance, buffer: str = "mono") -> np.ndarray:
+        raw = np.frombuffer(utterance.pcm, dtype=np.int16)
+        usable = len(raw) // utterance.channels * utterance.channels
+        samples = self._buffer(buffer, usable // utterance.channels)
+        if utterance.channels == 1:
+            samples[:] = raw[:usable]
+        else:
+            np.sum(raw[:usable].reshape(-1, utterance.channels), axis=1, dtype=np.float32, out=samples)
+            samples /= utterance.channels
+        return samples
+
+    def _denoise(self, samples: np.ndarray, ambient: np.ndarray | None = None) -> np.ndarray:
+        if len(samples) < STFT_WINDOW:
+            return samples
+        # Pad by one hop on each side (and up to a whole hop) so every sample is covered twice.
+        frame_count = -(-len(samples) // STFT_HOP) + 1
+        padded = self._buffer("padded", (frame_count + 1) * STFT_HOP)
+        padded[:] = 0.0
+        padded[STFT_HOP:STFT_HOP + len(samples)] = samples
+        frames = np.lib.stride_tricks.sliding_window_view(padded, STFT_WINDOW)[::STFT_HOP][:frame_count]
+        spectrum = np.fft.rfft(frames * self._window, axis=1)
+        magnitude = np.abs(spectrum)
+
+        if ambient is not None and len(ambient) >= 2 * STFT_WINDOW:
+            # Real background audio: every frame is noise, however much of the utterance is speech.
+            ambient_frames = np.lib.stride_tricks.sliding_window_view(ambient, STFT_WINDOW)[::STFT_HOP]
+            noise = np.abs(np.fft.rfft(ambient_frames * self._window, axis=1))
+        else:
+            frame_energy = magnitude.sum(axis=1)
+            noise = magnitude[frame_energy <= np.percentile(frame_energy, self.noise_percentile)]
+        profile = noise.mean(axis=0) + self.n_std * noise.std(axis=0)
+        if self.noise_profile is not None and self.noise_profile.shape == profile.shape:
+            profile = self.noise_smoothing * self.noise_profile + (1 - self.noise_smoothing) * profile
+        self.noise_profile = profile
+
+        # Speech bins must clear the noise profile. Averaging the mask with the neighbouring bins and
+        # frames keeps isolated noise peaks mostly gated and softens the edges of speech.
+        mask = (magnitude > profile).astype(np.float32)
+        smoothed = self._buffer("mask", mask.size).reshape(mask.shape)
+        smoothed[:] = mask
+        smoothed[1:] += mask[:-1]
+        smoothed[:-1] += mask[1:]
+        smoothed[:, 1:] += mask[:, :-1]
+        smoothed[:, :-1] += mask[:, 1:]
+        gain = self.attenuation + (1.0 - self.attenuation) * smoothed / 5.0
+
+        restored = np.fft.irfft(spectrum * gain, STFT_WINDOW, axis=1).astype(np.float32) * self._window
+        output = self._buffer("overlap", (frame_count + 1) * STFT_HOP)
+        output[:] = 0.0
+        output[:frame_count * STFT_HOP].reshape(frame_count, STFT_HOP)[:] += restored[:, :STFT_HOP]
+        output[STFT_HOP:].reshape(frame_count, STFT_HOP)[:] += restored[:, STFT_HOP:]
+        return output[STFT_HOP:STFT_HOP + len(samples)]
+
+    def _trim(self, samples: np.ndarray) -> np.ndarray:
+        hop = STFT_HOP
+        usable = len(samples) // hop * hop
+        if not usable:
+            return samples
+        rms = np.sqrt(np.mean(np.square(samples[:usable].reshape(-1, hop)), axis=1))
+        threshold = max(self.trim_noise_ratio * self._residual_noise_rms(), rms.max() * self.trim_ratio)
+        loud = np.flatnonzero(rms > threshold)
+        if not len(loud):
+            return samples[:0]
+        start = max(0, loud[0] * hop - self.trim_padding)
+        end = min(len(samples), (loud[-1] + 1) * hop + self.trim_padding)
+        return samples[start:end]
+
+    def _residual_noise_rms(self) -> float:
+        """Time-domain RMS of noise at the learned profile once gating has attenuated it."""
+        if self.noise_profile is None:
+            return 0.0
+        # Parseval over the one-sided spectrum, then undo the sqrt-Hann window's mean square of 1/2.
+        power = 2 * np.sum(np.square(self.noise_profile)) - self.noise_profile[0] ** 2 - self.noise_profile[-1] ** 2
+        return float(self.attenuation * np.sqrt(2 * power) / STFT_WINDOW)
+
+    def stats(self) -> dict[str, float]:
+        """Return cumulative bytes in and out, bytes saved and milliseconds per step."""
+        with self._lock:
+            return {**self._totals, "bytes_saved": self._totals["input_bytes"] - self._totals["output_bytes"]}
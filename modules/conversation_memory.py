@@ -0,0 +1,173 @@
+"""Conversation history packed into a bounded token budget for LLM requests."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+_STOPWORDS = frozenset(
+    "a an and are can do does for how i in is it me my of on or please the this to was what when where who why you"
+    .split()
+)
+SUMMARY_PREFIX = "Summary of the earlier conversation: "
+# Words and openings that make a query lean on earlier turns ("what about tomorrow", "why is that").
+_FOLLOW_UP_TERMS = frozenset(
+    "it its that this these those they them their he him his she her there then also again else more another"
+    .split()
+)
+_FOLLOW_UP_OPENERS = ("and", "but", "so", "what about", "how about", "tell me more", "go on")
+# Queries this short ("next one", "really?") are read as replies to the conversation.
+_FOLLOW_UP_MAX_WORDS = 3
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return len(text) // 4 + 1
+
+
+def _terms(text: str) -> frozenset[str]:
+    return frozenset(token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in _STOPWORDS)
+
+
+def _clip(text: str, max_tokens: int) -> str:
+    limit = max_tokens * 4
+    return text if len(text) <= limit else text[: limit - 3].rstrip() + "..."
+
+
+@dataclass(frozen=True)
+class Exchange:
+    """One user turn and the assistant's reply."""
+
+    user: str
+    assistant: str
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.user) + estimate_tokens(self.assistant)
+
+
+def summarize_exchanges(exchanges: Sequence[Exchange]) -> str:
+    """Extractive summary: the gist of each question and answer, clipped."""
+    return " ".join(
+        f"User asked {_clip(exchange.user, 20)!r}; JARVIS said {_clip(exchange.assistant, 30)!r}."
+        for exchange in exchanges
+    )
+
+
+def is_follow_up(query: str) -> bool:
+    """True when ``query`` reads as a continuation of the conversation rather than a standalone question."""
+    tokens = _TOKEN_PATTERN.findall(query.lower())
+    if not tokens:
+        return False
+    text = " ".join(tokens)
+    return (
+        len(tokens) <= _FOLLOW_UP_MAX_WORDS
+        or any(text == opener or text.startswith(opener + " ") for opener in _FOLLOW_UP_OPENERS)
+        or not _FOLLOW_UP_TERMS.isdisjoint(tokens)
+    )
+
+
+def context_digest(messages: Sequence[dict[str, str]]) -> str:
+    """Stable short hash of packed context, for cache and coalescing keys."""
+    return hashlib.sha256(json.dumps(list(messages), sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+class ConversationMemory:
+    """Recent exchanges plus rolling summaries of older ones.
+
+    ``context(query)`` returns chat messages that never exceed
+    ``summary_budget + token_budget`` estimated tokens: the cached summaries,
+    then the latest ``recent_exchanges`` exchanges, then other live exchanges
+    with those sharing the most terms with the query first. Once more than
+    ``max_live_exchanges`` are held, the oldest ``fold_size`` are folded into
+    a summary computed once and reused on every later request.
+
+    Context is only worth sending for follow-ups (``is_follow_up``): it makes
+    the answer depend on the conversation and therefore keys its cache entry
+    by the conversation too, while standalone questions share one entry.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 1024,
+        summary_budget: int = 256,
+        max_live_exchanges: int = 16,
+        fold_size: int = 4,
+        recent_exchanges: int = 2,
+        summarizer: Callable[[Sequence[Exchange]], str] = summarize_exchanges,
+    ) -> None:
+        self.token_budget = token_budget
+        self.summary_budget = summary_budget
+        self.max_live_exchanges = max_live_exchanges
+        self.fold_size = max(1, fold_size)
+        self.recent_exchanges = recent_exchanges
+        self.summarizer = summarizer
+        self._exchanges: list[Exchange] = []
+        self._summaries: list[str] = []
+        self._lock = threading.Lock()
+        self._counters = {"exchanges": 0, "folded": 0, "summaries_dropped": 0, "last_context_tokens": 0}
+
+    def add_exchange(self, user: str, assistant: str) -> None:
+        # A single oversized exchange is clipped so it can still fit the budget.
+        half = max(1, self.token_budget // 2 - 1)
+        exchange = Exchange(_clip(user, half), _clip(assistant, half))
+        with self._lock:
+            self._exchanges.append(exchange)
+            self._counters["exchanges"] += 1
+            summary_room = max(1, self.summary_budget - estimate_tokens(SUMMARY_PREFIX))
+            while len(self._exchanges) > self.max_live_exchanges:
+                folded = self._exchanges[: self.fold_size]
+                del self._exchanges[: self.fold_size]
+                self._summaries.append(_clip(self.summarizer(folded), summary_room))
+                self._counters["folded"] += len(folded)
+                while sum(estimate_tokens(summary) for summary in self._summaries) > summary_room:
+                    self._summaries.pop(0)
+                    self._counters["summaries_dropped"] += 1
+
+    def context(self, query: str) -> list[dict[str, str]]:
+        """Return prior-conversation messages to send ahead of ``query``."""
+        with self._lock:
+            exchanges = list(self._exchanges)
+            summaries = list(self._summaries)
+
+        messages: list[dict[str, str]] = []
+        used = 0
+        if summaries:
+            summary = SUMMARY_PREFIX + " ".join(summaries)
+            messages.append({"role": "system", "content": summary})
+            used += estimate_tokens(summary)
+
+        # Priority: the latest exchanges, then older ones sharing terms with
+        # the query (most overlap first), then any other older ones, newest first.
+        recent_start = max(0, len(exchanges) - self.recent_exchanges)
+        query_terms = _terms(query)
+        overlap = [len(query_terms & _terms(f"{item.user} {item.assistant}")) for item in exchanges[:recent_start]]
+        older = sorted(range(recent_start), key=lambda index: (overlap[index], index), reverse=True)
+        remaining = self.token_budget
+        chosen: list[int] = []
+        for index in [*range(len(exchanges) - 1, recent_start - 1, -1), *older]:
+            if exchanges[index].tokens <= remaining:
+                chosen.append(index)
+                remaining -= exchanges[index].tokens
+
+        for index in sorted(chosen):
+            messages.append({"role": "user", "content": exchanges[index].user})
+            messages.append({"role": "assistant", "content": exchanges[index].assistant})
+        with self._lock:
+            self._counters["last_context_tokens"] = used + self.token_budget - remaining
+        return messages
+
+    def clear(self) -> None:
+        with self._lock:
+            self._exchanges.clear()
+            self._summaries.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Return live exchange and summary counts plus the last packed context size."""
+        with self._lock:
+            return {**self._counters, "live_exchanges": len(self._exchanges), "summaries": len(self._summaries)}
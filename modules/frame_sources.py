@@ -0,0 +1,165 @@
+"""Frame sources for the gesture engine: cameras, video files, image folders, synthetic clips.
+
+Every source follows the slice of the ``cv2.VideoCapture`` interface that
+``GestureRecognition`` uses (``isOpened``, ``read``, ``release``), so a
+recorded clip can stand in for the webcam. Like ``VideoCapture.read``,
+``read`` accepts a frame buffer to decode into where the source can. Finite sources set ``finished``
+once they run out, which lets a headless run end instead of retrying reads.
+"""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+IMAGE_SUFFIXES = frozenset({".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff"})
+
+
+class _Pacer:
+    """Sleeps so that frames come out no faster than ``fps`` (0 or None: as fast as possible)."""
+
+    def __init__(self, fps: float | None) -> None:
+        self.interval = 1.0 / fps if fps else 0.0
+        self._next = 0.0
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        now = time.perf_counter()
+        if self._next > now:
+            time.sleep(self._next - now)
+        self._next = max(now, self._next) + self.interval
+
+
+class VideoFileSource:
+    """Frames from a video file, optionally paced at the clip's own frame rate."""
+
+    def __init__(self, path: str | Path, realtime: bool = False, loop: bool = False) -> None:
+        self.path = str(path)
+        self.loop = loop
+        self.finished = False
+        self._capture = cv2.VideoCapture(self.path)
+        self.fps = self._capture.get(cv2.CAP_PROP_FPS) or 30.0
+        self._pacer = _Pacer(self.fps if realtime else None)
+
+    def isOpened(self) -> bool:
+        return self._capture.isOpened()
+
+    def read(self, image: np.ndarray | None = None) -> tuple[bool, np.ndarray | None]:
+        if self.finished:
+            return False, None
+        self._pacer.wait()
+        success, frame = self._capture.read(image)
+        if not success and self.loop:
+            self._capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            success, frame = self._capture.read(image)
+        if not success:
+            self.finished = True
+            return False, None
+        return True, frame
+
+    def release(self) -> None:
+        self._capture.release()
+
+
+class ImageDirectorySource:
+    """Frames from the image files in a directory, in file-name order."""
+
+    def __init__(self, directory: str | Path, fps: float | None = None, loop: bool = False) -> None:
+        root = Path(directory).expanduser()
+        self.paths = sorted(path for path in root.iterdir() if path.suffix.lower() in IMAGE_SUFFIXES)
+        self.loop = loop
+        self.finished = not self.paths
+        self._index = 0
+        self._pacer = _Pacer(fps)
+
+    def isOpened(self) -> bool:
+        return bool(self.paths)
+
+    def read(self, image: np.ndarray | None = None) -> tuple[bool, np.ndarray | None]:
+        # Decoding always allocates, so ``image`` is ignored
+        if self._index >= len(self.paths) and self.loop:
+            self._index = 0
+        if self._index >= len(self.paths):
+            self.finished = True
+            return False, None
+        self._pacer.wait()
+        frame = cv2.imread(str(self.paths[self._index]), cv2.IMREAD_COLOR)
+        self._index += 1
+        return frame is not None, frame
+
+    def release(self) -> None:
+        self._index = len(self.paths)
+
+
+class SyntheticSource:
+    """A hand-sized blob sweeping across a static noisy background.
+
+    Deterministic for a given ``seed``; useful for CI benchmarks where no
+    recorded clip is available. ``frame_count=None`` generates forever.
+    """
+
+    def __init__(
+        self,
+        width: int = 640,
+        height: int = 480,
+        frame_count: int | None = 300,
+        fps: float | None = 30.0,
+        radius: int = 50,
+        seed: int = 0,
+    ) -> None:
+        self.width = width
+        self.height = height
+        self.frame_count = frame_count
+        self.radius = radius
+        self.finished = False
+        self._index = 0
+        self._pacer = _Pacer(fps)
+        rng = np.random.default_rng(seed)
+        self._background = cv2.GaussianBlur(rng.integers(0, 80, (height, width, 3), dtype=np.uint8), (0, 0), 3)
+        # A few fixed noise fields, cycled, keep generation allocation-free
+        self._noise = [rng.integers(0, 6, (height, width, 3), dtype=np.uint8) for _ in range(4)]
+
+    def isOpened(self) -> bool:
+        return True
+
+    def position(self, index: int) -> tuple[int, int]:
+        """Centre of the blob in frame ``index``: it bounces left and right across the middle."""
+        span = self.width - 4 * self.radius
+        step = index * 8 % (2 * span)
+        x = 2 * self.radius + (step if step < span else 2 * span - step)
+        return int(x), self.height // 2
+
+    def read(self, image: np.ndarray | None = None) -> tuple[bool, np.ndarray | None]:
+        if self.frame_count is not None and self._index >= self.frame_count:
+            self.finished = True
+            return False, None
+        self._pacer.wait()
+        if image is None or image.shape != self._background.shape:
+            frame = self._background.copy()
+        else:
+            frame = image
+            np.copyto(frame, self._background)
+        cv2.circle(frame, self.position(self._index), self.radius, (200, 180, 160), -1)
+        # Light sensor noise so the background model has something to learn.
+        cv2.add(frame, self._noise[self._index % len(self._noise)], dst=frame)
+        self._index += 1
+        return True, frame
+
+    def release(self) -> None:
+        self.finished = True
+
+
+def open_source(spec: str, realtime: bool = True):
+    """Build a source from a spec: ``synthetic``, a camera index, an image directory or a video file."""
+    if spec == "synthetic":
+        return SyntheticSource(fps=30.0 if realtime else None)
+    if spec.isdigit():
+        return cv2.VideoCapture(int(spec))
+    path = Path(spec).expanduser()
+    if path.is_dir():
+        return ImageDirectorySource(path, fps=30.0 if realtime else None)
+    return VideoFileSource(path, realtime=realtime)
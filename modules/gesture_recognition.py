@@ -4,18 +4,120 @@ import threading
 import queue
 import numpy as np
 import sys
+from collections import deque
+
+# Stages timed for every processed frame, in pipeline order
+STAGES = ("flip", "copy", "background", "threshold", "contours", "classify", "display")
+
+
+class LatestFrameBuffer:
+    """Single-slot handoff between the capture and processing threads.
+
+    The capture thread always overwrites the slot, so the processor only
+    ever sees the newest frame; frames replaced before anyone took them are
+    counted as dropped and handed back by ``put`` for reuse.
+    """
 
-class GestureRecognition:
     def __init__(self):
+        self._cond = threading.Condition()
+        self._frame = None
+        self._sequence = 0
+        self._taken = 0
+        self.dropped = 0
+
+    def put(self, frame):
+        """Publish ``frame``; returns the frame it displaced unseen (or None)."""
+        with self._cond:
+            displaced = None
+            if self._sequence > self._taken:
+                self.dropped += 1
+                displaced = self._frame
+            self._frame = frame
+            self._sequence += 1
+            self._cond.notify()
+            return displaced
+
+    def get(self, timeout=None):
+        """Return ``(frame, sequence)`` for the newest unseen frame, or ``(None, sequence)`` on timeout."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._sequence > self._taken, timeout):
+                return None, self._sequence
+            self._taken = self._sequence
+            return self._frame, self._sequence
+
+
+class GestureRecognition:
+    def __init__(self, source=None, headless=False, overlay=True):
+        """Open the webcam, or use ``source`` (any object with ``isOpened``/``read``/``release``).
+
+        ``headless`` skips the window, overlay drawing and per-frame prints so the
+        engine can run on servers and be benchmarked against recorded clips.
+        ``overlay=False`` keeps the window but shows the plain mirrored frame.
+        """
+        self.headless = headless
+        self.overlay = overlay and not headless
         self.running = False
         self.gesture_thread = None
         self.gesture_queue = queue.Queue()
         self.current_gesture = "none"
         self.last_gesture_time = 0
         self.gesture_cooldown = 1.0  # seconds
-        self.debug_mode = True  # Enable debug mode
+        self.debug_mode = not headless  # Debug overlay and prints (off when headless)
         self.camera_available = False
+        self.capture_thread = None
+        # Capture runs on its own thread; processing takes only the newest frame
+        self.frames = LatestFrameBuffer()
+        # Frame buffers cycle between capture, the slot and processing (three in
+        # steady state), and every processing stage writes into a buffer
+        # allocated once, so the hot loop does not allocate per frame
+        self._free_frames = deque()
+        self._flipped = None
+        self._display = None
+        self._mask = None
+        self._stats_lock = threading.Lock()
+        self._stage_seconds = dict.fromkeys(STAGES, 0.0)
+        self._frames_captured = 0
+        self._frames_processed = 0
+        self._read_seconds = 0.0
+        self._latency_seconds = 0.0
+        self._detections = 0
+        self._detection_latency_seconds = 0.0
+        self._first_frame_time = None
+        self._last_frame_time = None
+        # Set when a finite source runs out, and when processing has stopped
+        self.source_finished = threading.Event()
+        self.done = threading.Event()
+        
+        if source is not None:
+            self.cap = source
+            if not self.cap.isOpened():
+                print("[Gesture] ERROR: Could not open the frame source.")
+                return
+        elif not self._open_camera():
+            return
+        self.camera_available = True
+        
+        # Initialize background subtractor
+        self.bg_subtractor = cv2.createBackgroundSubtractorMOG2(history=500, detectShadows=False)
+        if self.headless:
+            return
         
+        print("[Gesture] Initialized with basic gesture detection")
+        print("[Gesture] Available gestures and their actions:")
+        print("  👋 Wave - Toggle voice recognition")
+        print("  👍 Thumbs Up - Confirm/Accept")
+        print("  👎 Thumbs Down - Cancel/Reject")
+        print("  👆 Point - Select/Choose")
+        print("  👉 Swipe Right - Next/Forward")
+        print("  👈 Swipe Left - Previous/Back")
+        print("  ✊ Fist - Stop/Pause")
+        print("  ✋ Open Hand - Start/Resume")
+        print("\n[Gesture] IMPORTANT: A window titled 'Gesture Recognition' will open.")
+        print("[Gesture] If you don't see this window, check if it's minimized or behind other windows.")
+        print("[Gesture] Press 'q' in the gesture window to close it.")
+    
+    def _open_camera(self):
+        """Open the first working webcam (indices 0-2) at 640x480."""
         # Initialize webcam
         print("[Gesture] Attempting to open camera...")
         self.cap = cv2.VideoCapture(0)
@@ -33,7 +135,7 @@ class GestureRecognition:
             print("[Gesture] ERROR: Could not open any camera. Please check your camera connection.")
             print("[Gesture] Available camera indices: 0, 1, 2")
             print("[Gesture] If you have an external camera, try connecting it and restarting.")
-            return
+            return False
             
         # Set camera resolution
         self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
@@ -44,27 +146,10 @@ class GestureRecognition:
         if not ret or frame is None:
             print("[Gesture] ERROR: Camera opened but cannot read frames.")
             print("[Gesture] This might be due to permission issues or the camera being used by another application.")
-            return
+            return False
             
         print(f"[Gesture] Camera successfully opened. Resolution: {frame.shape[1]}x{frame.shape[0]}")
-        self.camera_available = True
-        
-        # Initialize background subtractor
-        self.bg_subtractor = cv2.createBackgroundSubtractorMOG2(history=500, detectShadows=False)
-        
-        print("[Gesture] Initialized with basic gesture detection")
-        print("[Gesture] Available gestures and their actions:")
-        print("  👋 Wave - Toggle voice recognition")
-        print("  👍 Thumbs Up - Confirm/Accept")
-        print("  👎 Thumbs Down - Cancel/Reject")
-        print("  👆 Point - Select/Choose")
-        print("  👉 Swipe Right - Next/Forward")
-        print("  👈 Swipe Left - Previous/Back")
-        print("  ✊ Fist - Stop/Pause")
-        print("  ✋ Open Hand - Start/Resume")
-        print("\n[Gesture] IMPORTANT: A window titled 'Gesture Recognition' will open.")
-        print("[Gesture] If you don't see this window, check if it's minimized or behind other windows.")
-        print("[Gesture] Press 'q' in the gesture window to close it.")
+        return True
     
     def start(self):
         """Start the gesture recognition system."""
@@ -77,30 +162,61 @@ class GestureRecognition:
 
         try:
             self.running = True
-            self.gesture_thread = threading.Thread(target=self._gesture_loop)
+            self.capture_thread = threading.Thread(target=self._capture_loop, name="gesture-capture")
+            self.capture_thread.daemon = True
+            self.capture_thread.start()
+            self.gesture_thread = threading.Thread(target=self._gesture_loop, name="gesture-processing")
             self.gesture_thread.daemon = True
             self.gesture_thread.start()
             
             print("[Gesture] Started basic gesture recognition")
-            print("[Gesture] Press 'q' to quit the gesture window")
+            if not self.headless:
+                print("[Gesture] Press 'q' to quit the gesture window")
             return True
         except Exception as e:
             print(f"[Gesture] Error starting gesture recognition: {e}")
             return False
     
+    def _capture_loop(self):
+        """Read frames as fast as the source delivers them into the latest-frame buffer."""
+        while self.running:
+            spare = self._free_frames.pop() if self._free_frames else None
+            started = time.perf_counter()
+            success, image = self.cap.read(spare) if spare is not None else self.cap.read()
+            elapsed = time.perf_counter() - started
+            if not success:
+                if spare is not None:
+                    self._free_frames.append(spare)
+                if getattr(self.cap, "finished", False):
+                    # A clip or image folder ran out; let processing drain and stop
+                    self.source_finished.set()
+                    break
+                if not self.headless:
+                    print("[Gesture] Failed to read frame from camera")
+                time.sleep(0.1)
+                continue
+            with self._stats_lock:
+                self._frames_captured += 1
+                self._read_seconds += elapsed
+            displaced = self.frames.put((image, time.perf_counter()))
+            if displaced is not None:
+                self._free_frames.append(displaced[0])
+
     def _gesture_loop(self):
-        """Basic gesture recognition loop using OpenCV."""
+        """Basic gesture recognition loop using OpenCV, always on the newest captured frame."""
         frame_count = 0
         last_fps_time = time.time()
         fps = 0
+        timings = dict.fromkeys(STAGES, 0.0)
         
         while self.running:
             try:
-                success, image = self.cap.read()
-                if not success:
-                    print("[Gesture] Failed to read frame from camera")
-                    time.sleep(0.1)
+                item, _ = self.frames.get(timeout=0.5)
+                if item is None:
+                    if self.source_finished.is_set():
+                        break
                     continue
+                image, captured_at = item
                 
                 # Calculate FPS
                 frame_count += 1
@@ -109,77 +225,166 @@ class GestureRecognition:
                     frame_count = 0
                     last_fps_time = time.time()
                 
-                # Flip the image horizontally for a later selfie-view display
-                image = cv2.flip(image, 1)
+                gesture, display_image = self._process_frame(image, timings)
+                latency = time.perf_counter() - captured_at
+                # The captured frame is no longer needed; let capture read into it again
+                self._free_frames.append(image)
                 
-                # Create a copy for display
-                display_image = image.copy()
-                
-                # Apply background subtraction
-                fg_mask = self.bg_subtractor.apply(image)
-                
-                # Apply threshold to get binary image
-                _, thresh = cv2.threshold(fg_mask, 127, 255, cv2.THRESH_BINARY)
-                
-                # Find contours
-                contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-                
-                if contours:
-                    # Get the largest contour
-                    largest_contour = max(contours, key=cv2.contourArea)
-                    
-                    # Draw the contour
-                    cv2.drawContours(display_image, [largest_contour], -1, (0, 255, 0), 2)
-                    
-                    # Get the bounding rectangle
-                    x, y, w, h = cv2.boundingRect(largest_contour)
-                    cv2.rectangle(display_image, (x, y), (x+w, y+h), (255, 0, 0), 2)
+                key = -1
+                if not self.headless:
+                    started = time.perf_counter()
+                    if self.overlay:
+                        self._draw_overlay(display_image, gesture, fps)
                     
-                    # Calculate aspect ratio
-                    aspect_ratio = float(w)/h
-                    
-                    # Detect gesture based on shape and aspect ratio
-                    gesture = self._detect_gesture_type(largest_contour, aspect_ratio)
-                    
-                    current_time = time.time()
-                    if gesture != "none" and (current_time - self.last_gesture_time) > self.gesture_cooldown:
-                        self.current_gesture = gesture
-                        self.last_gesture_time = current_time
-                        self.gesture_queue.put(gesture)
-                        print(f"[Gesture] Detected gesture: {gesture}")
-                        
-                        # Add visual feedback for the detected gesture
-                        cv2.putText(display_image, f"Gesture: {gesture}", (10, 30),
-                                  cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-                
-                # Add debug information
-                if self.debug_mode:
-                    # Add FPS counter
-                    cv2.putText(display_image, f"FPS: {fps}", (10, 60),
-                              cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
-                    
-                    # Add gesture legend
-                    cv2.putText(display_image, "Press 'q' to quit", (10, display_image.shape[0] - 20),
-                              cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-                    
-                    # Add gesture instructions
-                    cv2.putText(display_image, "Wave hand for 'wave'", (10, display_image.shape[0] - 50),
-                              cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+                    # Display the image
+                    cv2.imshow('Gesture Recognition', display_image)
+                    key = cv2.waitKey(1) & 0xFF
+                    timings["display"] = time.perf_counter() - started
                 
-                # Display the image
-                cv2.imshow('Gesture Recognition', display_image)
+                self._record_frame(timings, latency, gesture != "none")
                 
                 # Break the loop if 'q' is pressed
-                if cv2.waitKey(1) & 0xFF == ord('q'):
+                if key == ord('q'):
                     print("[Gesture] Quit command received, closing gesture window")
                     break
                 
-                # Add a small delay to reduce CPU usage
-                time.sleep(0.01)
-                
             except Exception as e:
                 print(f"[Gesture] Error in gesture loop: {e}")
                 time.sleep(0.1)
+        self.done.set()
+
+    def _allocate_buffers(self, image):
+        """(Re)allocate the per-stage output buffers for frames shaped like ``image``."""
+        self._flipped = np.empty_like(image)
+        self._display = np.empty_like(image) if self.overlay else None
+        self._mask = np.empty(image.shape[:2], dtype=np.uint8)
+
+    def _process_frame(self, image, timings):
+        """Run one frame through the pipeline; returns the gesture emitted ("none" if any) and the display image.
+
+        Every stage writes into a preallocated buffer (``dst=``), so the
+        returned display image is only valid until the next call.
+        """
+        if self._flipped is None or self._flipped.shape != image.shape:
+            self._allocate_buffers(image)
+        
+        # Flip the image horizontally for a later selfie-view display
+        started = time.perf_counter()
+        image = cv2.flip(image, 1, dst=self._flipped)
+        timings["flip"] = time.perf_counter() - started
+        
+        # Copy for display only when an overlay will be drawn on it
+        display_image = None
+        if self.overlay:
+            started = time.perf_counter()
+            np.copyto(self._display, image)
+            display_image = self._display
+            timings["copy"] = time.perf_counter() - started
+        elif not self.headless:
+            display_image = image
+        
+        # Apply background subtraction
+        started = time.perf_counter()
+        fg_mask = self.bg_subtractor.apply(image, fgmask=self._mask)
+        timings["background"] = time.perf_counter() - started
+        
+        # Apply threshold to get binary image (in place on the mask)
+        started = time.perf_counter()
+        _, thresh = cv2.threshold(fg_mask, 127, 255, cv2.THRESH_BINARY, dst=fg_mask)
+        timings["threshold"] = time.perf_counter() - started
+        
+        # Find contours
+        started = time.perf_counter()
+        contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        timings["contours"] = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        emitted = "none"
+        if contours:
+            # Get the largest contour
+            largest_contour = max(contours, key=cv2.contourArea)
+            
+            # Get the bounding rectangle
+            x, y, w, h = cv2.boundingRect(largest_contour)
+            
+            if self.overlay:
+                # Draw the contour and its bounding box
+                cv2.drawContours(display_image, [largest_contour], -1, (0, 255, 0), 2)
+                cv2.rectangle(display_image, (x, y), (x+w, y+h), (255, 0, 0), 2)
+            
+            # Calculate aspect ratio
+            aspect_ratio = float(w)/h
+            
+            # Detect gesture based on shape and aspect ratio
+            gesture = self._detect_gesture_type(largest_contour, aspect_ratio)
+            
+            current_time = time.time()
+            if gesture != "none" and (current_time - self.last_gesture_time) > self.gesture_cooldown:
+                self.current_gesture = gesture
+                self.last_gesture_time = current_time
+                self.gesture_queue.put(gesture)
+                emitted = gesture
+                if not self.headless:
+                    print(f"[Gesture] Detected gesture: {gesture}")
+        timings["classify"] = time.perf_counter() - started
+        return emitted, display_image
+
+    def _draw_overlay(self, display_image, gesture, fps):
+        # Add visual feedback for the detected gesture
+        if gesture != "none":
+            cv2.putText(display_image, f"Gesture: {gesture}", (10, 30),
+                      cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+        
+        # Add debug information
+        if self.debug_mode:
+            # Add FPS counter
+            cv2.putText(display_image, f"FPS: {fps}", (10, 60),
+                      cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
+            
+            # Add gesture legend
+            cv2.putText(display_image, "Press 'q' to quit", (10, display_image.shape[0] - 20),
+                      cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+            
+            # Add gesture instructions
+            cv2.putText(display_image, "Wave hand for 'wave'", (10, display_image.shape[0] - 50),
+                      cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+
+    def _record_frame(self, timings, latency, detected):
+        now = time.perf_counter()
+        with self._stats_lock:
+            self._frames_processed += 1
+            for stage, seconds in timings.items():
+                self._stage_seconds[stage] += seconds
+            self._latency_seconds += latency
+            if detected:
+                self._detections += 1
+                self._detection_latency_seconds += latency
+            if self._first_frame_time is None:
+                self._first_frame_time = now
+            self._last_frame_time = now
+
+    def stats(self):
+        """Frame counts, dropped frames, FPS, capture-to-result latency and mean milliseconds per stage."""
+        with self._stats_lock:
+            processed = self._frames_processed
+            captured = self._frames_captured
+            elapsed = (self._last_frame_time or 0.0) - (self._first_frame_time or 0.0)
+            return {
+                "frames_captured": captured,
+                "frames_processed": processed,
+                "frames_dropped": self.frames.dropped,
+                "fps": (processed - 1) / elapsed if elapsed > 0 else 0.0,
+                "read_ms": self._read_seconds * 1000 / captured if captured else 0.0,
+                "latency_ms": self._latency_seconds * 1000 / processed if processed else 0.0,
+                "detections": self._detections,
+                "detection_latency_ms": (
+                    self._detection_latency_seconds * 1000 / self._detections if self._detections else 0.0
+                ),
+                "stage_ms": {
+                    stage: seconds * 1000 / processed if processed else 0.0
+                    for stage, seconds in self._stage_seconds.items()
+                },
+            }
     
     def _detect_gesture_type(self, contour, aspect_ratio):
         """Detect the type of gesture based on contour shape and aspect ratio."""
@@ -243,15 +448,31 @@ class GestureRecognition:
         except queue.Empty:
             return "none"
     
+    def wait_for_gesture(self, timeout=None):
+        """Block until a new gesture is detected or the timeout expires."""
+        try:
+            gesture = self.gesture_queue.get(timeout=timeout)
+        except queue.Empty:
+            return "none"
+        self.current_gesture = gesture
+        return gesture
+
     def release(self):
         """Release resources."""
         self.running = False
         if self.gesture_thread:
             self.gesture_thread.join(timeout=1.0)
+        if self.capture_thread:
+            self.capture_thread.join(timeout=1.0)
         
         # Release the webcam and close windows
         if self.cap is not None and self.cap.isOpened():
             self.cap.release()
-        cv2.destroyAllWindows()
+        if not self.headless:
+            cv2.destroyAllWindows()
         
+        stats = self.stats()
+        stages = ", ".join(f"{stage} {ms:.1f}" for stage, ms in stats["stage_ms"].items())
+        print(f"[Gesture] Processed {stats['frames_processed']} of {stats['frames_captured']} frames "
+              f"({stats['frames_dropped']} dropped); ms per stage: {stages}")
         print("[Gesture] Released resources") 
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""Lightweight local intent classification with hashed n-grams and NumPy.
+
+Utterances are mapped to hashed word unigrams, word bigrams and
+boundary-marked character trigrams (so "hi" never matches inside "this"), and
+scored by a multinomial logistic regression trained from a labelled intent
+file. Scoring a batch is a single gather-and-sum over the weight matrix.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import threading
+import zlib
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_INTENTS_PATH = Path(__file__).with_name("intents.json")
+DEFAULT_FEATURES = 1 << 12
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+@lru_cache(maxsize=65536)
+def _hash(feature: str, n_features: int) -> int:
+    return zlib.crc32(feature.encode("utf-8")) % n_features
+
+
+def text_features(text: str, n_features: int = DEFAULT_FEATURES) -> list[int]:
+    """Return hashed feature indices for ``text`` (repeats allowed)."""
+    tokens = _TOKEN_PATTERN.findall(text.lower())
+    features = [_hash(f"w:{token}", n_features) for token in tokens]
+    features.extend(_hash(f"b:{left} {right}", n_features) for left, right in zip(tokens, tokens[1:]))
+    for token in tokens:
+        marked = f"<{token}>"
+        features.extend(_hash(f"c:{marked[i:i + 3]}", n_features) for i in range(len(marked) - 2))
+    return features
+
+
+def _sparse_batch(texts: Sequence[str], n_features: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return ``(rows, cols, values)`` with each row scaled to unit length."""
+    rows: list[int] = []
+    cols: list[int] = []
+    values: list[float] = []
+    for row, text in enumerate(texts):
+        features = text_features(text, n_features)
+        if features:
+            rows.extend([row] * len(features))
+            cols.extend(features)
+            values.extend([1.0 / np.sqrt(len(features))] * len(features))
+    return np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp), np.asarray(values, dtype=np.float32)
+
+
+@dataclass(frozen=True)
+class IntentPrediction:
+    label: str
+    confidence: float
+
+
+class IntentClassifier:
+    """Linear softmax classifier over hashed n-gram features.
+
+    Predictions below ``min_confidence`` are reported as ``fallback_label``.
+    """
+
+    def __init__(
+        self,
+        labels: Sequence[str],
+        weights: np.ndarray,
+        bias: np.ndarray,
+        n_features: int = DEFAULT_FEATURES,
+        fallback_label: str = "other",
+        min_confidence: float = 0.4,
+    ) -> None:
+        self.labels = list(labels)
+        self.weights = weights.astype(np.float32)
+        self.bias = bias.astype(np.float32)
+        self.n_features = n_features
+        self.fallback_label = fallback_label
+        self.min_confidence = min_confidence
+
+    @classmethod
+    def fit(
+        cls,
+        texts: Sequence[str],
+        labels: Sequence[str],
+        n_features: int = DEFAULT_FEATURES,
+        epochs: int = 300,
+        learning_rate: float = 2.0,
+        l2: float = 1e-4,
+        **kwargs,
+    ) -> "IntentClassifier":
+        """Train with full-batch gradient descent on the softmax cross-entropy."""
+        names = sorted(set(labels))
+        targets = np.zeros((len(texts), len(names)), dtype=np.float32)
+        targets[np.arange(len(texts)), [names.index(label) for label in labels]] = 1.0
+        rows, cols, values = _sparse_batch(texts, n_features)
+        features = np.zeros((len(texts), n_features), dtype=np.float32)
+        np.add.at(features, (rows, cols), values)
+
+        weights = np.zeros((n_features, len(names)), dtype=np.float32)
+        bias = np.zeros(len(names), dtype=np.float32)
+        for _ in range(epochs):
+            error = (_softmax(features @ weights + bias) - targets) / len(texts)
+            weights -= learning_rate * (features.T @ error + l2 * weights)
+            bias -= learning_rate * error.sum(axis=0)
+        return cls(names, weights, bias, n_features=n_features, **kwargs)
+
+    @classmethod
+    def from_file(cls, path: str | Path = DEFAULT_INTENTS_PATH, **kwargs) -> "IntentClassifier":
+        """Train from a JSON file mapping each intent label to example utterances."""
+        examples = json.loads(Path(path).read_text(encoding="utf-8"))
+        texts = [text for utterances in examples.values() for text in utterances]
+        labels = [label for label, utterances in examples.items() for _ in utterances]
+        return cls.fit(texts, labels, **kwargs)
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        """Return a ``(len(texts), len(labels))`` matrix of class probabilities."""
+        rows, cols, values = _sparse_batch(texts, self.n_features)
+        contributions = self.weights[cols] * values[:, None]
+        scores = np.empty((len(texts), len(self.labels)), dtype=np.float32)
+        for column in range(len(self.labels)):
+            scores[:, column] = np.bincount(rows, weights=contributions[:, column], minlength=len(texts))
+        return _softmax(scores + self.bias)
+
+    def classify_batch(self, texts: Sequence[str]) -> list[IntentPrediction]:
+        if not texts:
+            return []
+        probabilities = self.predict_proba(texts)
+        best = probabilities.argmax(axis=1)
+        confidence = probabilities[np.arange(len(texts)), best]
+        return [
+            IntentPrediction(self.labels[index] if score >= self.min_confidence else self.fallback_label, float(score))
+            for index, score in zip(best, confidence)
+        ]
+
+    def classify(self, text: str) -> IntentPrediction:
+        return self.classify_batch([text])[0]
+
+
+def _softmax(scores: np.ndarray) -> np.ndarray:
+    shifted = np.exp(scores - scores.max(axis=1, keepdims=True))
+    return shifted / shifted.sum(axis=1, keepdims=True)
+
+
+_default: IntentClassifier | None = None
+_default_lock = threading.Lock()
+
+
+def default_classifier() -> IntentClassifier:
+    """Return the classifier trained on the bundled ``intents.json`` (built once).
+
+    ``JarvisCore`` trains it in the background at startup; callers arriving
+    while that is still running wait for it rather than training again.
+    """
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = IntentClassifier.from_file()
+    return _default
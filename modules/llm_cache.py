@@ -0,0 +1,176 @@
+"""Response caching for LLM queries: a two-tier LRU/SQLite cache and single-flight."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """Collapse case, whitespace and trailing punctuation so rephrasings share a key."""
+    return " ".join(query.lower().split()).rstrip("?!. ")
+
+
+def make_cache_key(query: str, model: str, params: dict[str, Any]) -> str:
+    """Stable key over the normalized query, model name and generation parameters."""
+    material = json.dumps([normalize_query(query), model, params], sort_keys=True)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """LRU with TTL in memory, optionally backed by an on-disk SQLite store.
+
+    Memory misses fall through to SQLite and promote disk hits back into the
+    LRU. Entries older than ``ttl_seconds`` are treated as misses in both tiers.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600.0, db_path: str | None = None) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[str, str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+        self._db: sqlite3.Connection | None = None
+        if db_path:
+            Path(db_path).expanduser().parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(Path(db_path).expanduser()), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, model TEXT NOT NULL, response TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_model ON responses (model)")
+            self._db.execute("DELETE FROM responses WHERE created < ?", (time.time() - ttl_seconds,))
+            self._db.commit()
+
+    def get(self, query: str, model: str, params: dict[str, Any]) -> str | None:
+        key = make_cache_key(query, model, params)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                response, _, created = entry
+                if now - created <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return response
+                del self._entries[key]
+                self._counters["expirations"] += 1
+
+            if self._db is not None:
+                row = self._db.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    response, created = row
+                    if now - created <= self.ttl_seconds:
+                        self._store_memory(key, response, model, created)
+                        self._counters["disk_hits"] += 1
+                        return response
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+                    self._counters["expirations"] += 1
+
+            self._counters["misses"] += 1
+            return None
+
+    def put(self, query: str, model: str, params: dict[str, Any], response: str) -> None:
+        key = make_cache_key(query, model, params)
+        created = time.time()
+        with self._lock:
+            self._store_memory(key, response, model, created)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, model, response, created) VALUES (?, ?, ?, ?)",
+                    (key, model, response, created),
+                )
+                self._db.commit()
+
+    def _store_memory(self, key: str, response: str, model: str, created: float) -> None:
+        self._entries[key] = (response, model, created)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def invalidate_model(self, model: str) -> int:
+        """Drop every cached response produced by ``model``; returns entries removed."""
+        with self._lock:
+            stale = [key for key, (_, entry_model, _) in self._entries.items() if entry_model == model]
+            for key in stale:
+                del self._entries[key]
+            removed = len(stale)
+            if self._db is not None:
+                cursor = self._db.execute("DELETE FROM responses WHERE model = ?", (model,))
+                self._db.commit()
+                removed = max(removed, cursor.rowcount)
+        logger.info("Invalidated %d cached responses for model=%s", removed, model)
+        return removed
+
+    def stats(self) -> dict[str, float]:
+        """Return hit, miss, eviction and expiration counters plus the hit rate."""
+        with self._lock:
+            stats: dict[str, float] = dict(self._counters)
+            stats["entries"] = len(self._entries)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one upstream call.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait for and share its result (or its exception).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._in_flight: dict[str, Future] = {}
+        self._counters = {"leaders": 0, "coalesced": 0}
+
+    def do(self, key: str, fn: Callable[[], T], timeout: float | None = None) -> T:
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+                self._counters["leaders"] += 1
+            else:
+                self._counters["coalesced"] += 1
+
+        if not leader:
+            return future.result(timeout=timeout)
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def stats(self) -> dict[str, int]:
+        """Return how many calls ran upstream and how many were coalesced onto them."""
+        with self._lock:
+            return dict(self._counters)
@@ -0,0 +1,165 @@
+"""Latency-aware provider routing with per-provider circuit breakers."""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable
+from dataclasses import asdict, dataclass
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+# Recent latencies kept per provider for tail estimates such as the p95.
+LATENCY_WINDOW = 64
+
+
+@dataclass
+class ProviderHealth:
+    """Smoothed latency and error rate for one provider, plus breaker state."""
+
+    name: str
+    latency_ewma: float | None = None
+    latency_p95: float | None = None
+    error_rate: float = 0.0
+    consecutive_failures: int = 0
+    state: str = CLOSED
+    opened_at: float | None = None
+    trial_started_at: float | None = None
+    successes: int = 0
+    failures: int = 0
+
+
+class ProviderRouter:
+    """Rank providers by expected latency and stop routing to failing ones.
+
+    Latency and error rate are exponentially weighted moving averages. After
+    ``failure_threshold`` consecutive failures a provider's breaker opens and
+    it is skipped for ``cooldown_seconds``; it then turns half-open and
+    ``acquire`` lets exactly one trial request through, while everyone else
+    is routed elsewhere. The trial's outcome either closes the breaker or
+    re-opens it for another cooldown.
+    The last ``LATENCY_WINDOW`` successful latencies are kept for
+    ``tail_latency``.
+    """
+
+    def __init__(
+        self,
+        providers: Iterable[str],
+        alpha: float = 0.3,
+        failure_threshold: int = 3,
+        cooldown_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._health = {name: ProviderHealth(name) for name in providers}
+        self._latencies: dict[str, deque[float]] = {}
+
+    def _refresh(self, health: ProviderHealth) -> None:
+        if health.state == OPEN and self._clock() - (health.opened_at or 0.0) >= self.cooldown_seconds:
+            health.state = HALF_OPEN
+
+    def _trial_running(self, health: ProviderHealth) -> bool:
+        # A trial whose outcome never arrives stops blocking after one cooldown.
+        started = health.trial_started_at
+        return started is not None and self._clock() - started < self.cooldown_seconds
+
+    def acquire(self, name: str) -> bool:
+        """Return whether a request may be sent to ``name`` now.
+
+        Closed breakers always admit. A half-open breaker admits a single
+        trial until ``record_success``, ``record_failure`` or ``release``.
+        """
+        with self._lock:
+            health = self._health.setdefault(name, ProviderHealth(name))
+            self._refresh(health)
+            if health.state == CLOSED:
+                return True
+            if health.state == OPEN or self._trial_running(health):
+                return False
+            health.trial_started_at = self._clock()
+            return True
+
+    def release(self, name: str) -> None:
+        """End an admitted request that produced no outcome (e.g. it was cancelled)."""
+        with self._lock:
+            health = self._health.get(name)
+            if health is not None:
+                health.trial_started_at = None
+
+    def record_success(self, name: str, latency: float) -> None:
+        with self._lock:
+            health = self._health.setdefault(name, ProviderHealth(name))
+            health.successes += 1
+            health.latency_ewma = (
+                latency
+                if health.latency_ewma is None
+                else self.alpha * latency + (1 - self.alpha) * health.latency_ewma
+            )
+            samples = self._latencies.setdefault(name, deque(maxlen=LATENCY_WINDOW))
+            samples.append(latency)
+            health.latency_p95 = _quantile(samples, 0.95)
+            health.error_rate *= 1 - self.alpha
+            health.consecutive_failures = 0
+            health.state = CLOSED
+            health.opened_at = None
+            health.trial_started_at = None
+
+    def record_failure(self, name: str) -> None:
+        with self._lock:
+            health = self._health.setdefault(name, ProviderHealth(name))
+            self._refresh(health)
+            health.failures += 1
+            health.error_rate = self.alpha + (1 - self.alpha) * health.error_rate
+            health.consecutive_failures += 1
+            health.trial_started_at = None
+            if health.state == HALF_OPEN or health.consecutive_failures >= self.failure_threshold:
+                health.state = OPEN
+                health.opened_at = self._clock()
+
+    def tail_latency(self, name: str, quantile: float = 0.95, min_samples: int = 10) -> float | None:
+        """Return the ``quantile`` of recent latencies, or None with fewer than ``min_samples``."""
+        with self._lock:
+            samples = self._latencies.get(name)
+            if samples is None or len(samples) < min_samples:
+                return None
+            return _quantile(samples, quantile)
+
+    def rank(self, candidates: Iterable[str], preferred: str | None = None) -> list[str]:
+        """Return routable candidates, fastest expected first.
+
+        Providers without latency samples rank first so they get measured,
+        with ``preferred`` ahead of other unmeasured providers.
+        """
+        with self._lock:
+            routable = []
+            for position, name in enumerate(candidates):
+                health = self._health.setdefault(name, ProviderHealth(name))
+                self._refresh(health)
+                if health.state == OPEN or (health.state == HALF_OPEN and self._trial_running(health)):
+                    continue
+                if health.latency_ewma is None:
+                    cost = 0.0
+                else:
+                    cost = health.latency_ewma / max(0.05, 1.0 - health.error_rate)
+                routable.append((cost, name != preferred, position, name))
+        return [name for *_, name in sorted(routable)]
+
+    def snapshot(self) -> dict[str, dict]:
+        """Return a monitoring view of every provider's health."""
+        with self._lock:
+            for health in self._health.values():
+                self._refresh(health)
+            return {name: asdict(health) for name, health in self._health.items()}
+
+
+def _quantile(samples: Iterable[float], quantile: float) -> float:
+    """Nearest-rank quantile of a non-empty sample."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(quantile * len(ordered)) - 1))]
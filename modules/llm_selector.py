@@ -2,20 +2,187 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
 import os
 import random
+import socket
+import threading
+import time
+from collections.abc import Callable, Generator, Iterable, Iterator, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
 
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+try:
+    import httpx
+except ImportError:  # optional; batch queries fall back to worker threads
+    httpx = None
+
+from modules.conversation_memory import ConversationMemory, context_digest, estimate_tokens, is_follow_up
+from modules.intent_classifier import default_classifier
+from modules.llm_cache import ResponseCache, SingleFlight, make_cache_key
+from modules.llm_routing import ProviderRouter
+from modules.local_llm import LocalModel, LocalModelError
+from modules.rate_limiter import ProviderRateLimiter, RateLimitExceeded
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+REQUEST_TIMEOUT_SECONDS = 10.0
+LOCAL_PROVIDER = "local"
+SYSTEM_PROMPT = "You are JARVIS, a helpful AI assistant."
+# Offline answers keyed by the intent the local classifier assigns to a query.
+LOCAL_RESPONSES = {
+    "question": "I'm processing your question. This would normally be handled by my language models.",
+    "how_to": "I'm processing your instructions. This would normally be handled by my language models.",
+    "open_app": "I would open that for you. This would normally be handled by my system commands.",
+    "device_control": "I would control that device for you. This would normally be handled by my device controller.",
+}
+FALLBACK_RESPONSES = (
+    "I'm having trouble connecting to my language models right now.",
+    "I'm experiencing some technical difficulties with my language processing.",
+    "I'm unable to access my knowledge base at the moment.",
+    "My language models are temporarily unavailable.",
+    "I'm having trouble processing that request right now.",
+)
+POOL_CONNECTIONS = 2
+POOL_MAXSIZE = 8
+# Retry only connection failures, where the provider cannot have started
+# generating. A 5xx or read timeout goes to the next candidate instead, so one
+# call never repeats a whole request past the caller's deadline.
+RETRY_POLICY = Retry(
+    total=2,
+    connect=2,
+    read=0,
+    status=0,
+    other=0,
+    backoff_factor=0.2,
+    allowed_methods=frozenset({"GET", "POST"}),
+    raise_on_status=False,
+)
+# Once a provider has enough latency samples, hedge after its p95 latency.
+HEDGE_QUANTILE = 0.95
+
+
+def _attempt_timeout(timeout: float) -> tuple[float, float]:
+    """``(connect, read)`` timeouts that keep every connect retry within ``timeout`` together."""
+    return timeout / (RETRY_POLICY.connect + 1), timeout
+
+
+class ProviderError(RuntimeError):
+    """Raised when a provider cannot produce an answer for a query."""
+
+
+class ProviderUnavailable(ProviderError):
+    """Raised when a provider is not configured (for example, no API key)."""
+
+
+class _Cancellation:
+    """Cancels one in-flight provider request by shutting down its connection.
+
+    While ``_query_provider`` runs, the connection pools attach every
+    connection the request checks out, so ``cancel()`` from another thread
+    unblocks a request that is waiting on a slow provider.
+    """
+
+    def __init__(self) -> None:
+        self._cancelled = threading.Event()
+        self._connections: list = []
+        self._lock = threading.Lock()
+
+    def is_set(self) -> bool:
+        return self._cancelled.is_set()
+
+    def attach(self, connection) -> None:
+        with self._lock:
+            self._connections.append(connection)
+        if self.is_set():
+            self._abort(connection)
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+        with self._lock:
+            connections = list(self._connections)
+        for connection in connections:
+            self._abort(connection)
+
+    @staticmethod
+    def _abort(connection) -> None:
+        sock = getattr(connection, "sock", None)
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+# The cancellation of the request running on the current thread, if any.
+_inflight = threading.local()
+
+
+class _CancellablePoolMixin:
+    def _get_conn(self, timeout=None):
+        connection = super()._get_conn(timeout)
+        cancellation = getattr(_inflight, "cancellation", None)
+        if cancellation is not None:
+            cancellation.attach(connection)
+        return connection
+
+
+class _CancellableHTTPConnectionPool(_CancellablePoolMixin, HTTPConnectionPool):
+    pass
+
+
+class _CancellableHTTPSConnectionPool(_CancellablePoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class _CancellableAdapter(HTTPAdapter):
+    """``HTTPAdapter`` whose connections can be aborted through a ``_Cancellation``."""
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CancellableHTTPConnectionPool,
+            "https": _CancellableHTTPSConnectionPool,
+        }
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one query in a ``query_llm_many`` batch."""
+
+    query: str
+    response: str | None = None
+    provider: str | None = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
 
 class LLMSelector:
-    def __init__(self, openai_api_key: str | None = None, huggingface_api_key: str | None = None) -> None:
+    def __init__(
+        self,
+        openai_api_key: str | None = None,
+        huggingface_api_key: str | None = None,
+        pool_maxsize: int = POOL_MAXSIZE,
+        cache: ResponseCache | None = None,
+        hedge_after_seconds: float | None = None,
+        router: ProviderRouter | None = None,
+        rate_limit_wait_seconds: float = 5.0,
+        local_model: LocalModel | None = None,
+        memory: ConversationMemory | None = None,
+    ) -> None:
         self.openai_api_key = openai_api_key if openai_api_key is not None else os.getenv("OPENAI_API_KEY", "")
         self.huggingface_api_key = (
             huggingface_api_key if huggingface_api_key is not None else os.getenv("HUGGINGFACE_API_KEY", "")
@@ -30,89 +197,695 @@ class LLMSelector:
                     "Content-Type": "application/json",
                     "Authorization": f"Bearer {self.openai_api_key}",
                 },
+                "params": {"max_tokens": 150, "temperature": 0.7},
+                "max_concurrency": 16,
+                "rate_limits": {"requests_per_minute": 60, "tokens_per_minute": 40000},
             },
             "huggingface": {
                 "name": "gpt2",
                 "endpoint": "https://api-inference.huggingface.co/models/gpt2",
                 "headers": {"Authorization": f"Bearer {self.huggingface_api_key}"},
+                "params": {"max_length": 100, "temperature": 0.7},
+                "max_concurrency": 4,
+                "rate_limits": {"requests_per_minute": 30, "tokens_per_minute": 20000},
             },
+            LOCAL_PROVIDER: {
+                "name": os.path.basename(local_model.model_path) if local_model else "local",
+                "params": {
+                    "max_tokens": local_model.max_tokens if local_model else 150,
+                    "temperature": local_model.temperature if local_model else 0.7,
+                },
+                "max_concurrency": 1,
+            },
+        }
+        self.local_model = local_model
+        self.cache = cache
+        # Interactive follow-up queries carry packed prior turns when memory
+        # is set; standalone and batch queries never do.
+        self.memory = memory
+        self.router = router or ProviderRouter(self.models)
+        self.rate_limiters = {
+            name: ProviderRateLimiter(**spec["rate_limits"], max_wait_seconds=rate_limit_wait_seconds)
+            for name, spec in self.models.items()
+            if "rate_limits" in spec
         }
+        self._single_flight = SingleFlight()
 
-        self.fallback_responses = [
-            "I'm having trouble connecting to my language models right now.",
-            "I'm experiencing some technical difficulties with my language processing.",
-            "I'm unable to access my knowledge base at the moment.",
-            "My language models are temporarily unavailable.",
-            "I'm having trouble processing that request right now.",
-        ]
+        # One keep-alive session per provider, created on first use.
+        self.pool_maxsize = pool_maxsize
+        self._sessions: dict[str, requests.Session] = {}
+        self._sessions_lock = threading.Lock()
+
+        # Hedging: if the primary has not answered within its observed p95
+        # latency (this many seconds until it has enough samples), race the
+        # same query on another configured provider.
+        self.hedge_after_seconds = hedge_after_seconds
+        self._hedge_executor: ThreadPoolExecutor | None = None
+        self._hedge_stats = {"hedged": 0, "primary_wins": 0, "secondary_wins": 0, "cancelled": 0}
+        self._hedge_lock = threading.Lock()
+
+        self.fallback_responses = list(FALLBACK_RESPONSES)
+
+    def query_llm(self, query: str, model: str | None = None, timeout: float | None = None) -> str:
+        """Query a provider, falling back to local processing on failure.
 
-    def query_llm(self, query: str, model: str | None = None) -> str:
+        Without an explicit ``model`` the query goes to the fastest healthy
+        provider according to ``router``, then to the next one on failure.
+        ``timeout`` bounds the provider calls; a caller whose deadline has
+        already passed gets the local answer without any network I/O.
+        Successful provider answers are served from ``cache`` when present
+        and, with ``memory`` set, recorded as conversation turns. Only
+        follow-up queries are sent with (and cached under) prior turns, so a
+        repeated standalone question still hits the cache mid-conversation.
+        """
         if not query:
             return "I didn't receive a query to process."
 
-        model_name = model if model in self.models else self.default_model
+        timeout = REQUEST_TIMEOUT_SECONDS if timeout is None else min(timeout, REQUEST_TIMEOUT_SECONDS)
+        if timeout <= 0:
+            return self._local_processing(query)
+
+        context = self._conversation_context(query)
+        candidates = self._candidates(model)
+        for name in candidates or [self._model_name(model)]:
+            cached = self._cache_get(name, query, context)
+            if cached is not None:
+                self._remember(query, cached)
+                return cached
+        # Identical concurrent queries (in the same context) share one upstream request.
+        flight_key = make_cache_key(query, model if model in self.models else "auto", self._context_params(context))
+
+        def lead() -> str:
+            # Runs once per coalesced group, so the turn is cached and remembered once.
+            answer, answered_by = self._dispatch(candidates, query, timeout, context)
+            self._cache_put(answered_by, query, answer, context)
+            self._remember(query, answer)
+            return answer
+
         try:
-            if model_name == "openai":
-                return self._query_openai(query)
-            if model_name == "huggingface":
-                return self._query_huggingface(query)
+            answer = self._single_flight.do(flight_key, lead, timeout=timeout)
+        except ProviderUnavailable as exc:
+            logger.debug("No LLM provider available: %s", exc)
+            return self._local_processing(query)
+        except ProviderError as exc:
+            logger.warning("%s", exc)
             return self._local_processing(query)
         except Exception as exc:  # defensive boundary for provider adapters
-            logger.exception("LLM query failed for model=%s: %s", model_name, exc)
+            logger.exception("LLM query failed for candidates=%s: %s", candidates, exc)
             return self._local_processing(query)
+        return answer
 
-    def _query_openai(self, query: str) -> str:
-        if not self.openai_api_key:
-            return self._local_processing(query)
+    def query_llm_stream(self, query: str, model: str | None = None, timeout: float | None = None) -> Iterator[str]:
+        """Yield the answer incrementally as the provider streams tokens.
 
-        payload = {
-            "model": self.models["openai"]["name"],
-            "messages": [
-                {"role": "system", "content": "You are JARVIS, a helpful AI assistant."},
-                {"role": "user", "content": query},
-            ],
-            "max_tokens": 150,
-            "temperature": 0.7,
+        OpenAI responses are read from its server-sent event stream and the
+        local model streams tokens as it generates them; providers without
+        streaming support yield their full answer as a single chunk. A
+        provider that fails before its first token counts as a failure with
+        ``router`` and the next candidate is tried, as in ``query_llm``.
+        """
+        candidates = self._candidates(model) if query else []
+        streamers = {"openai": self._stream_openai, LOCAL_PROVIDER: self._stream_local}
+        if not candidates or candidates[0] not in streamers:
+            yield self.query_llm(query, model=model, timeout=timeout)
+            return
+
+        context = self._conversation_context(query)
+        cached = self._cache_get(candidates[0], query, context)
+        if cached is not None:
+            self._remember(query, cached)
+            yield cached
+            return
+
+        timeout = REQUEST_TIMEOUT_SECONDS if timeout is None else min(timeout, REQUEST_TIMEOUT_SECONDS)
+        expires_at = time.monotonic() + timeout
+        for name in candidates:
+            remaining = expires_at - time.monotonic()
+            if remaining <= 0:
+                break
+            if name not in streamers:
+                try:
+                    answer = self._query_provider(name, query, remaining, context=context)
+                except (ProviderError, requests.RequestException) as exc:
+                    logger.info("Provider %s failed, trying next: %s", name, exc)
+                    continue
+                self._cache_put(name, query, answer, context)
+                self._remember(query, answer)
+                yield answer
+                return
+            tokens, completed = yield from self._stream_provider(name, streamers[name], query, remaining, context)
+            if completed:
+                answer = "".join(tokens).strip()
+                self._cache_put(name, query, answer, context)
+                self._remember(query, answer)
+                return
+            if tokens:
+                # Cut off mid-answer; starting over elsewhere would repeat what was already said
+                return
+        yield self._local_processing(query)
+
+    def _stream_provider(
+        self,
+        name: str,
+        streamer: Callable[[str, float, Sequence[dict[str, str]]], Iterator[str]],
+        query: str,
+        timeout: float,
+        context: Sequence[dict[str, str]] = (),
+    ) -> Generator[str, None, tuple[list[str], bool]]:
+        """Yield ``name``'s tokens; returns them and whether the stream completed."""
+        tokens: list[str] = []
+        if not self.router.acquire(name):
+            logger.info("Provider %s is cooling down after repeated failures, trying next", name)
+            return tokens, False
+        try:
+            timeout -= self._admit(name, query, timeout, context)
+        except ProviderError as exc:
+            self.router.release(name)
+            logger.info("Provider %s failed, trying next: %s", name, exc)
+            return tokens, False
+        started = time.monotonic()
+        try:
+            for token in streamer(query, max(timeout, 0.001), context):
+                tokens.append(token)
+                yield token
+        except GeneratorExit:
+            # The consumer stopped listening (barge-in); no verdict on the provider
+            self.router.release(name)
+            raise
+        except ProviderUnavailable as exc:
+            self.router.release(name)
+            logger.info("Provider %s failed, trying next: %s", name, exc)
+            return tokens, False
+        except (ProviderError, requests.RequestException) as exc:
+            logger.warning("LLM stream failed for model=%s: %s", name, exc)
+            self.router.record_failure(name)
+            return tokens, False
+        except Exception as exc:  # defensive boundary for provider adapters
+            logger.exception("LLM stream failed for model=%s: %s", name, exc)
+            self.router.record_failure(name)
+            return tokens, False
+        if not tokens:
+            logger.warning("LLM stream from %s ended without an answer", name)
+            self.router.record_failure(name)
+            return tokens, False
+        self.router.record_success(name, time.monotonic() - started)
+        return tokens, True
+
+    async def query_llm_many(
+        self,
+        queries: Iterable[str],
+        model: str | None = None,
+        concurrency: int = 8,
+        timeout: float | None = None,
+    ) -> list[BatchResult]:
+        """Run many queries concurrently and return their results in input order.
+
+        Requests go through a non-blocking ``httpx`` client when it is
+        installed (worker threads otherwise). At most ``concurrency`` queries
+        are in flight overall and at most each provider's ``max_concurrency``
+        per provider. Failures are reported per item in ``BatchResult.error``
+        instead of being replaced by canned local answers.
+        """
+        timeout = REQUEST_TIMEOUT_SECONDS if timeout is None else min(timeout, REQUEST_TIMEOUT_SECONDS)
+        overall = asyncio.Semaphore(max(1, concurrency))
+        per_provider = {
+            name: asyncio.Semaphore(max(1, spec.get("max_concurrency", concurrency)))
+            for name, spec in self.models.items()
         }
+        client = None
+        if httpx is not None:
+            limit = max(1, concurrency)
+            client = httpx.AsyncClient(limits=httpx.Limits(max_connections=limit, max_keepalive_connections=limit))
+        try:
+            return list(
+                await asyncio.gather(
+                    *(self._batch_item(query, model, timeout, overall, per_provider, client) for query in queries)
+                )
+            )
+        finally:
+            if client is not None:
+                await client.aclose()
 
-        response = requests.post(
+    async def _batch_item(
+        self,
+        query: str,
+        model: str | None,
+        timeout: float,
+        overall: asyncio.Semaphore,
+        per_provider: dict[str, asyncio.Semaphore],
+        client,
+    ) -> BatchResult:
+        if not query:
+            return BatchResult(query, error="Empty query")
+        async with overall:
+            candidates = self._candidates(model)
+            for name in candidates or [self._model_name(model)]:
+                cached = self._cache_get(name, query)
+                if cached is not None:
+                    return BatchResult(query, cached, name)
+            if not candidates:
+                return BatchResult(query, error="No healthy provider is configured")
+
+            last_error: Exception | None = None
+            for name in candidates:
+                try:
+                    async with per_provider[name]:
+                        answer = await self._aquery_provider(client, name, query, timeout)
+                except Exception as exc:  # reported per item
+                    last_error = exc
+                    continue
+                self._cache_put(name, query, answer)
+                return BatchResult(query, answer, name)
+            return BatchResult(query, error=f"{type(last_error).__name__}: {last_error}")
+
+    async def _aquery_provider(self, client, model_name: str, query: str, timeout: float) -> str:
+        if client is None or model_name == LOCAL_PROVIDER:
+            return await asyncio.to_thread(self._query_provider, model_name, query, timeout)
+        endpoint, headers, payload = self._build_request(model_name, query)
+        if not self.router.acquire(model_name):
+            raise ProviderError(f"{model_name} is cooling down after repeated failures")
+        try:
+            timeout -= await asyncio.to_thread(self._admit, model_name, query, timeout)
+        except BaseException:
+            self.router.release(model_name)
+            raise
+        started = time.monotonic()
+        try:
+            response = await client.post(endpoint, headers=headers, json=payload, timeout=timeout)
+            answer = self._parse_answer(model_name, response)
+        except asyncio.CancelledError:
+            self.router.release(model_name)
+            raise
+        except Exception:
+            self.router.record_failure(model_name)
+            raise
+        self.router.record_success(model_name, time.monotonic() - started)
+        return answer
+
+    def _model_name(self, model: str | None) -> str:
+        return model if model in self.models else self.default_model
+
+    def _candidates(self, model: str | None) -> list[str]:
+        """Providers to try in order: the explicit model, or all configured ones.
+
+        Remote providers are ranked by speed. The local model comes after
+        them, so it answers when they are unconfigured, have open breakers
+        or fail, unless it is the default model, in which case it comes first.
+        """
+        if model in self.models:
+            return self.router.rank([model])
+        remote = [name for name in self.models if name != LOCAL_PROVIDER and self._is_configured(name)]
+        ranked = self.router.rank(remote, preferred=self.default_model)
+        if self._is_configured(LOCAL_PROVIDER):
+            local = self.router.rank([LOCAL_PROVIDER])
+            ranked = local + ranked if self.default_model == LOCAL_PROVIDER else ranked + local
+        return ranked
+
+    def _dispatch(
+        self, candidates: list[str], query: str, timeout: float, context: Sequence[dict[str, str]] = ()
+    ) -> tuple[str, str]:
+        """Return ``(answer, provider)`` from the first candidate that answers.
+
+        With hedging enabled the top two candidates are raced first. The rest
+        (or, without hedging, all of them) are then tried in order until one
+        answers or the time budget runs out.
+        """
+        if not candidates:
+            raise ProviderUnavailable("No healthy provider is configured")
+        expires_at = time.monotonic() + timeout
+        last_error: Exception | None = None
+        if self.hedge_after_seconds is not None and len(candidates) > 1:
+            try:
+                return self._query_hedged(candidates[0], candidates[1], query, timeout, context)
+            except (ProviderError, requests.RequestException) as exc:
+                logger.info("Hedged providers %s failed, trying next: %s", candidates[:2], exc)
+                last_error = exc
+            candidates = candidates[2:]
+
+        for name in candidates:
+            remaining = expires_at - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                return self._query_provider(name, query, remaining, context=context), name
+            except (ProviderError, requests.RequestException) as exc:
+                logger.info("Provider %s failed, trying next: %s", name, exc)
+                last_error = exc
+        if last_error is not None:
+            raise last_error
+        raise ProviderError(f"No provider answered within {timeout:.1f}s")
+
+    def _is_configured(self, model_name: str) -> bool:
+        if model_name == "openai":
+            return bool(self.openai_api_key)
+        if model_name == "huggingface":
+            return bool(self.huggingface_api_key)
+        if model_name == LOCAL_PROVIDER:
+            return self.local_model is not None and self.local_model.available
+        return False
+
+    def _query_hedged(
+        self, primary: str, secondary: str, query: str, timeout: float, context: Sequence[dict[str, str]] = ()
+    ) -> tuple[str, str]:
+        """Race ``secondary`` against a slow ``primary`` and keep the first answer.
+
+        The secondary starts once the primary has taken longer than its p95
+        latency. The loser is cancelled: if it has not started it never runs,
+        and if it is in flight its connection is shut down.
+        """
+        with self._hedge_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(
+                    max_workers=self.pool_maxsize, thread_name_prefix="llm-hedge"
+                )
+            executor = self._hedge_executor
+        expires_at = time.monotonic() + timeout
+        cancellations: dict[Future, _Cancellation] = {}
+
+        def start(name: str, budget: float) -> Future:
+            cancellation = _Cancellation()
+            future = executor.submit(self._query_provider, name, query, budget, cancellation, context)
+            cancellations[future] = cancellation
+            return future
+
+        attempts: dict[Future, str] = {start(primary, timeout): primary}
+        done, _ = wait(attempts, timeout=min(self.hedge_delay(primary), timeout))
+        primary_failed = bool(done) and next(iter(done)).exception() is not None
+        if not done or primary_failed:
+            attempts[start(secondary, max(0.001, expires_at - time.monotonic()))] = secondary
+            if not done:
+                self._count_hedge("hedged")
+
+        pending = set(attempts)
+        last_error: Exception | None = None
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, expires_at - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                error = future.exception()
+                if error is not None:
+                    last_error = error
+                    continue
+                for loser in pending:
+                    loser.cancel()
+                    cancellations[loser].cancel()
+                    self._count_hedge("cancelled")
+                winner = attempts[future]
+                self._count_hedge("primary_wins" if winner == primary else "secondary_wins")
+                return future.result(), winner
+        for cancellation in cancellations.values():
+            cancellation.cancel()
+        if last_error is not None:
+            raise last_error
+        raise ProviderError(f"No provider answered within {timeout:.1f}s")
+
+    def hedge_delay(self, primary: str) -> float:
+        """Seconds to wait on ``primary`` before hedging: its p95 latency once measured."""
+        observed = self.router.tail_latency(primary, HEDGE_QUANTILE)
+        return observed if observed is not None else self.hedge_after_seconds
+
+    def _count_hedge(self, counter: str) -> None:
+        with self._hedge_lock:
+            self._hedge_stats[counter] += 1
+
+    def hedge_stats(self) -> dict[str, int]:
+        """Return how often hedging fired and which side won."""
+        with self._hedge_lock:
+            return dict(self._hedge_stats)
+
+    def _query_provider(
+        self,
+        model_name: str,
+        query: str,
+        timeout: float,
+        cancel: _Cancellation | None = None,
+        context: Sequence[dict[str, str]] = (),
+    ) -> str:
+        if cancel is not None and cancel.is_set():
+            raise ProviderError(f"Request to {model_name} was cancelled")
+        adapters = {
+            "openai": self._query_openai,
+            "huggingface": self._query_huggingface,
+            LOCAL_PROVIDER: self._query_local,
+        }
+        adapter = adapters.get(model_name)
+        if adapter is None:
+            raise ProviderUnavailable(f"Unknown provider: {model_name}")
+        if not self.router.acquire(model_name):
+            raise ProviderError(f"{model_name} is cooling down after repeated failures")
+        started = None
+        _inflight.cancellation = cancel
+        try:
+            if self._is_configured(model_name):
+                timeout -= self._admit(model_name, query, timeout, context)
+            started = time.monotonic()
+            answer = adapter(query, timeout, context)
+        except ProviderUnavailable:
+            self.router.release(model_name)
+            raise
+        except Exception as exc:
+            if started is None:
+                # Turned away by the rate limiter before anything was sent
+                self.router.release(model_name)
+                raise
+            if cancel is not None and cancel.is_set():
+                # Aborted because another provider answered first; not the provider's fault
+                self.router.release(model_name)
+                raise ProviderError(f"Request to {model_name} was cancelled") from exc
+            self.router.record_failure(model_name)
+            raise
+        finally:
+            _inflight.cancellation = None
+        self.router.record_success(model_name, time.monotonic() - started)
+        return answer
+
+    def _admit(self, model_name: str, query: str, timeout: float, context: Sequence[dict[str, str]] = ()) -> float:
+        """Wait for ``model_name``'s rate limiter; returns seconds spent queued."""
+        limiter = self.rate_limiters.get(model_name)
+        if limiter is None:
+            return 0.0
+        try:
+            return limiter.acquire(self._estimate_tokens(model_name, query, context), timeout=timeout)
+        except RateLimitExceeded as exc:
+            raise ProviderError(f"{model_name} rate limit: {exc}") from exc
+
+    def _estimate_tokens(self, model_name: str, query: str, context: Sequence[dict[str, str]] = ()) -> int:
+        """Rough prompt-plus-completion token count (about four characters per token)."""
+        params = self.models[model_name]["params"]
+        completion = params.get("max_tokens", params.get("max_length", 0))
+        prompt = len(query) // 4 + 16 + sum(estimate_tokens(message["content"]) for message in context)
+        return prompt + completion
+
+    def rate_limit_levels(self) -> dict[str, dict[str, float]]:
+        """Return current bucket levels and queue depth per provider."""
+        return {name: limiter.levels() for name, limiter in self.rate_limiters.items()}
+
+    def local_stats(self) -> dict[str, float]:
+        """Return load time and tokens-per-second metrics for the local model."""
+        return self.local_model.stats() if self.local_model is not None else {}
+
+    def coalescing_stats(self) -> dict[str, int]:
+        """Return upstream calls made and concurrent duplicates coalesced onto them."""
+        return self._single_flight.stats()
+
+    def router_state(self) -> dict[str, dict]:
+        """Return per-provider latency, error rate and circuit breaker state."""
+        return self.router.snapshot()
+
+    def _cache_get(self, model_name: str, query: str, context: Sequence[dict[str, str]] = ()) -> str | None:
+        if self.cache is None:
+            return None
+        spec = self.models[model_name]
+        return self.cache.get(query, spec["name"], {**spec["params"], **self._context_params(context)})
+
+    def _cache_put(self, model_name: str, query: str, answer: str, context: Sequence[dict[str, str]] = ()) -> None:
+        if self.cache is not None:
+            spec = self.models[model_name]
+            self.cache.put(query, spec["name"], {**spec["params"], **self._context_params(context)}, answer)
+
+    def _conversation_context(self, query: str) -> list[dict[str, str]]:
+        """Prior turns to send with ``query``: only follow-ups carry them (and are cached per conversation)."""
+        if self.memory is None or not is_follow_up(query):
+            return []
+        return self.memory.context(query)
+
+    @staticmethod
+    def _context_params(context: Sequence[dict[str, str]]) -> dict[str, str]:
+        """Key material that keeps answers given in different conversations apart."""
+        return {"context": context_digest(context)} if context else {}
+
+    def _remember(self, query: str, answer: str) -> None:
+        if self.memory is not None:
+            self.memory.add_exchange(query, answer)
+
+    def reset_conversation(self) -> None:
+        """Forget prior turns so the next query starts a fresh conversation."""
+        if self.memory is not None:
+            self.memory.clear()
+
+    def invalidate_cache(self, model: str) -> int:
+        """Drop cached answers for a provider key (``"openai"``) or model name."""
+        if self.cache is None:
+            return 0
+        name = self.models[model]["name"] if model in self.models else model
+        return self.cache.invalidate_model(name)
+
+    def _stream_openai(self, query: str, timeout: float, context: Sequence[dict[str, str]] = ()) -> Iterator[str]:
+        payload = {**self._openai_payload(query, context), "stream": True}
+        with self._session("openai").post(
             self.models["openai"]["endpoint"],
             headers=self.models["openai"]["headers"],
             json=payload,
-            timeout=10,
-        )
-        if response.status_code == 200:
+            timeout=_attempt_timeout(timeout),
+            stream=True,
+        ) as response:
+            if response.status_code != 200:
+                raise ProviderError(f"OpenAI API error: {response.status_code}")
+            response.encoding = response.encoding or "utf-8"
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    return
+                delta = json.loads(data)["choices"][0].get("delta", {})
+                if delta.get("content"):
+                    yield delta["content"]
+
+    def _stream_local(self, query: str, timeout: float, context: Sequence[dict[str, str]] = ()) -> Iterator[str]:
+        if not self._is_configured(LOCAL_PROVIDER):
+            raise ProviderUnavailable("Local model is not configured")
+        yield from self.local_model.stream(self._messages(query, context), timeout=timeout)
+
+    def _query_local(
+        self, query: str, timeout: float = REQUEST_TIMEOUT_SECONDS, context: Sequence[dict[str, str]] = ()
+    ) -> str:
+        if not self._is_configured(LOCAL_PROVIDER):
+            raise ProviderUnavailable("Local model is not configured")
+        try:
+            return self.local_model.generate(self._messages(query, context), timeout=timeout)
+        except LocalModelError as exc:
+            raise ProviderError(str(exc)) from exc
+
+    def _messages(self, query: str, context: Sequence[dict[str, str]] = ()) -> list[dict[str, str]]:
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            *context,
+            {"role": "user", "content": query},
+        ]
+
+    def _openai_payload(self, query: str, context: Sequence[dict[str, str]] = ()) -> dict:
+        return {
+            "model": self.models["openai"]["name"],
+            "messages": self._messages(query, context),
+            **self.models["openai"]["params"],
+        }
+
+    @staticmethod
+    def _prompt_text(query: str, context: Sequence[dict[str, str]] = ()) -> str:
+        """Flatten packed context into a plain-text prompt for completion-only providers."""
+        if not context:
+            return query
+        speakers = {"system": "", "user": "User: ", "assistant": "JARVIS: "}
+        lines = [speakers.get(message["role"], "") + message["content"] for message in context]
+        return "\n".join([*lines, f"User: {query}", "JARVIS:"])
+
+    def _build_request(
+        self, model_name: str, query: str, context: Sequence[dict[str, str]] = ()
+    ) -> tuple[str, dict, dict]:
+        """Return ``(endpoint, headers, payload)`` for an HTTP provider."""
+        spec = self.models[model_name]
+        if model_name == "openai":
+            if not self.openai_api_key:
+                raise ProviderUnavailable("OpenAI API key is not configured")
+            payload = self._openai_payload(query, context)
+        elif model_name == "huggingface":
+            if not self.huggingface_api_key:
+                raise ProviderUnavailable("Hugging Face API key is not configured")
+            payload = {"inputs": self._prompt_text(query, context), "parameters": spec["params"]}
+        else:
+            raise ProviderUnavailable(f"Unknown provider: {model_name}")
+        return spec["endpoint"], spec["headers"], payload
+
+    def _parse_answer(self, model_name: str, response) -> str:
+        """Extract the answer text from a ``requests`` or ``httpx`` response."""
+        if model_name == "openai":
+            if response.status_code != 200:
+                raise ProviderError(f"OpenAI API error: {response.status_code}")
             return response.json()["choices"][0]["message"]["content"].strip()
-        logger.warning("OpenAI API error: %s", response.status_code)
-        return self._local_processing(query)
+        if response.status_code != 200:
+            raise ProviderError(f"Hugging Face API error: {response.status_code}")
+        return response.json()[0]["generated_text"].strip()
 
-    def _query_huggingface(self, query: str) -> str:
-        if not self.huggingface_api_key:
-            return self._local_processing(query)
+    def _query_openai(
+        self, query: str, timeout: float = REQUEST_TIMEOUT_SECONDS, context: Sequence[dict[str, str]] = ()
+    ) -> str:
+        return self._query_http("openai", query, timeout, context)
 
-        payload = {"inputs": query, "parameters": {"max_length": 100, "temperature": 0.7}}
-        response = requests.post(
-            self.models["huggingface"]["endpoint"],
-            headers=self.models["huggingface"]["headers"],
-            json=payload,
-            timeout=10,
+    def _query_huggingface(
+        self, query: str, timeout: float = REQUEST_TIMEOUT_SECONDS, context: Sequence[dict[str, str]] = ()
+    ) -> str:
+        return self._query_http("huggingface", query, timeout, context)
+
+    def _query_http(self, model_name: str, query: str, timeout: float, context: Sequence[dict[str, str]] = ()) -> str:
+        endpoint, headers, payload = self._build_request(model_name, query, context)
+        response = self._session(model_name).post(
+            endpoint, headers=headers, json=payload, timeout=_attempt_timeout(timeout)
         )
-        if response.status_code == 200:
-            return response.json()[0]["generated_text"].strip()
-        logger.warning("Hugging Face API error: %s", response.status_code)
-        return self._local_processing(query)
+        return self._parse_answer(model_name, response)
+
+    def _session(self, provider: str) -> requests.Session:
+        """Return the pooled keep-alive session for ``provider``."""
+        with self._sessions_lock:
+            session = self._sessions.get(provider)
+            if session is None:
+                session = requests.Session()
+                adapter = _CancellableAdapter(
+                    pool_connections=POOL_CONNECTIONS,
+                    pool_maxsize=self.pool_maxsize,
+                    max_retries=RETRY_POLICY,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[provider] = session
+            return session
+
+    def connection_stats(self) -> dict[str, dict[str, int]]:
+        """Return per-provider request, connection and reuse counters."""
+        stats: dict[str, dict[str, int]] = {}
+        with self._sessions_lock:
+            sessions = dict(self._sessions)
+        for provider, session in sessions.items():
+            adapter = session.get_adapter(self.models[provider]["endpoint"])
+            pools = adapter.poolmanager.pools
+            connections = requests_sent = 0
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    connections += pool.num_connections
+                    requests_sent += pool.num_requests
+            stats[provider] = {
+                "requests": requests_sent,
+                "connections": connections,
+                "reused": max(0, requests_sent - connections),
+            }
+        return stats
+
+    def close(self) -> None:
+        """Close all pooled provider sessions."""
+        with self._hedge_lock:
+            executor, self._hedge_executor = self._hedge_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        with self._sessions_lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
 
     def _local_processing(self, query: str) -> str:
-        query_lower = query.lower()
-        if "what is" in query_lower or "who is" in query_lower:
-            return "I'm processing your question. This would normally be handled by my language models."
-        if "how to" in query_lower or "how do" in query_lower:
-            return "I'm processing your instructions. This would normally be handled by my language models."
-        if any(word in query_lower for word in ("open", "start", "launch")):
-            return "I would open that for you. This would normally be handled by my system commands."
-        if "turn on" in query_lower or "turn off" in query_lower:
-            return "I would control that device for you. This would normally be handled by my device controller."
-        return random.choice(self.fallback_responses)
+        intent = default_classifier().classify(query).label
+        return LOCAL_RESPONSES.get(intent) or random.choice(self.fallback_responses)
 
     def get_available_models(self) -> list[str]:
         return list(self.models.keys())
@@ -0,0 +1,187 @@
+"""In-process quantized language model for offline operation (llama.cpp)."""
+
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterator
+from typing import Any
+
+try:
+    from llama_cpp import Llama
+except ImportError:  # optional in constrained environments
+    Llama = None
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a generation in the token queue.
+_DONE = object()
+
+
+class LocalModelError(RuntimeError):
+    """Raised when the local model cannot be loaded or produce an answer."""
+
+
+class LocalModel:
+    """A GGUF model loaded once into this process and kept warm.
+
+    Generation runs on CPU and the underlying model is not thread-safe, so
+    requests are serialized on a generation thread per request, which holds
+    the model only while it is generating. Every completion records token throughput,
+    which ``stats()`` reports alongside the one-off load time.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        n_ctx: int = 2048,
+        n_threads: int | None = None,
+        max_tokens: int = 150,
+        temperature: float = 0.7,
+        loader: Callable[..., Any] | None = None,
+    ) -> None:
+        self.model_path = os.path.expanduser(model_path)
+        self.n_ctx = n_ctx
+        self.n_threads = n_threads or None
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self._loader = loader or Llama
+        self._model: Any = None
+        self._load_lock = threading.Lock()
+        self._generate_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats: dict[str, float] = {
+            "load_seconds": 0.0,
+            "requests": 0,
+            "completion_tokens": 0,
+            "generation_seconds": 0.0,
+            "last_tokens_per_second": 0.0,
+            "last_first_token_seconds": 0.0,
+        }
+
+    @property
+    def available(self) -> bool:
+        """True when a backend is installed and the model file exists (or is loaded)."""
+        if self._model is not None:
+            return True
+        return self._loader is not None and os.path.isfile(self.model_path)
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def load(self) -> None:
+        """Load the model if it is not loaded yet; safe to call from several threads."""
+        if self._model is not None:
+            return
+        with self._load_lock:
+            if self._model is not None:
+                return
+            if not self.available:
+                raise LocalModelError(f"Local model is not available: {self.model_path}")
+            started = time.monotonic()
+            try:
+                self._model = self._loader(
+                    model_path=self.model_path, n_ctx=self.n_ctx, n_threads=self.n_threads, verbose=False
+                )
+            except Exception as exc:
+                raise LocalModelError(f"Failed to load local model {self.model_path}: {exc}") from exc
+            with self._stats_lock:
+                self._stats["load_seconds"] = time.monotonic() - started
+            logger.info("Loaded local model %s in %.2fs", self.model_path, self._stats["load_seconds"])
+
+    def stream(self, messages: list[dict[str, str]], timeout: float | None = None) -> Iterator[str]:
+        """Yield completion tokens for chat ``messages`` as they are generated.
+
+        Generation stops early once ``timeout`` seconds have passed; whatever
+        was produced by then has already been yielded. Tokens are handed over
+        through a queue, so a consumer that stops iterating never keeps the
+        model from serving the next request; closing the iterator also stops
+        the generation. The first request loads the model on that thread too,
+        so ``timeout`` also bounds the wait for the load, which carries on in
+        the background if the caller gives up.
+        """
+        expires_at = None if timeout is None else time.monotonic() + timeout
+        tokens: queue.Queue = queue.Queue()
+        stop = threading.Event()
+        threading.Thread(
+            target=self._generate_into, args=(messages, expires_at, tokens, stop), name="local-llm", daemon=True
+        ).start()
+        try:
+            while True:
+                try:
+                    item = tokens.get(timeout=None if expires_at is None else max(0.0, expires_at - time.monotonic()))
+                except queue.Empty:
+                    logger.info("Local generation missed its deadline")
+                    return
+                if item is _DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+
+    def _generate_into(
+        self, messages: list[dict[str, str]], expires_at: float | None, tokens: queue.Queue, stop: threading.Event
+    ) -> None:
+        """Generate on this thread, putting tokens (then ``_DONE``) on ``tokens`` until done or ``stop``."""
+        try:
+            self.load()
+            with self._generate_lock:
+                if stop.is_set():
+                    return
+                started = time.monotonic()
+                first_token_at = None
+                count = 0
+                try:
+                    chunks = self._model.create_chat_completion(
+                        messages=messages, max_tokens=self.max_tokens, temperature=self.temperature, stream=True
+                    )
+                    for chunk in chunks:
+                        if stop.is_set():
+                            break
+                        content = chunk["choices"][0].get("delta", {}).get("content")
+                        if content:
+                            count += 1
+                            if first_token_at is None:
+                                first_token_at = time.monotonic()
+                            tokens.put(content)
+                        if expires_at is not None and time.monotonic() >= expires_at:
+                            logger.info("Local generation stopped at deadline after %d tokens", count)
+                            break
+                finally:
+                    self._record(count, started, first_token_at)
+        except Exception as exc:  # handed to the consumer
+            tokens.put(exc)
+        finally:
+            tokens.put(_DONE)
+
+    def generate(self, messages: list[dict[str, str]], timeout: float | None = None) -> str:
+        """Return the full completion for chat ``messages``."""
+        answer = "".join(self.stream(messages, timeout=timeout)).strip()
+        if not answer:
+            raise LocalModelError("Local model produced no output")
+        return answer
+
+    def _record(self, tokens: int, started: float, first_token_at: float | None) -> None:
+        elapsed = time.monotonic() - started
+        with self._stats_lock:
+            self._stats["requests"] += 1
+            self._stats["completion_tokens"] += tokens
+            self._stats["generation_seconds"] += elapsed
+            self._stats["last_tokens_per_second"] = tokens / elapsed if elapsed > 0 else 0.0
+            if first_token_at is not None:
+                self._stats["last_first_token_seconds"] = first_token_at - started
+
+    def stats(self) -> dict[str, float]:
+        """Return load time, request and token counts and tokens-per-second rates."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["loaded"] = self.loaded
+        generation = stats["generation_seconds"]
+        stats["tokens_per_second"] = stats["completion_tokens"] / generation if generation > 0 else 0.0
+        return stats
@@ -4,20 +4,25 @@ from __future__ import annotations
 
 import random
 
+from modules.intent_classifier import default_classifier
+
+RESPONSES = {
+    "greeting": ["Hello, genius!", "Greetings, prodigy!", "Hi there, future Stark!"],
+    "thanks": ["Anytime, sir.", "My pleasure!", "Happy to help!"],
+    "default": ["I'm on it!", "Right away!", "Consider it done!"],
+}
+IDLE_RESPONSE = "I'm here whenever you need me, sir."
+
 
 class PersonalityModule:
     def __init__(self, tone: str = "witty") -> None:
         self.tone = tone
 
     def get_response(self, input_text: str) -> str:
-        responses = {
-            "greeting": ["Hello, genius!", "Greetings, prodigy!", "Hi there, future Stark!"],
-            "default": ["I'm on it!", "Right away!", "Consider it done!"],
-        }
-        key = "greeting" if any(word in input_text.lower() for word in ("hi", "hello", "hey")) else "default"
-        return random.choice(responses[key])
+        intent = default_classifier().classify(input_text).label
+        return random.choice(RESPONSES.get(intent, RESPONSES["default"]))
 
     def process_interaction(self, input_text: str) -> str:
         if not input_text:
-            return "I'm here whenever you need me, sir."
+            return IDLE_RESPONSE
         return self.get_response(input_text)
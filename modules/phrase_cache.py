@@ -0,0 +1,187 @@
+"""Pre-rendered audio for phrases JARVIS says over and over.
+
+Greetings, acknowledgements, security replies and fallback messages come from
+fixed lists. ``PhraseCache`` renders each of them to a WAV file once, keyed by
+text, voice and speech rate, so later uses play the file instead of running
+the synthesizer again. The files persist across runs; anything without a
+rendered file is synthesized live as before. Files play through ``winsound``
+on Windows and the stock command-line player (``afplay``, ``paplay`` or
+``aplay``) elsewhere.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import wave
+from collections import deque
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from typing import Any, Protocol
+
+try:
+    import winsound
+except ImportError:  # Windows only
+    winsound = None
+
+logger = logging.getLogger(__name__)
+
+# A WAV header with no samples is 44 bytes; anything that small failed to render.
+_MIN_WAV_BYTES = 45
+# Command-line WAV players tried, in order, where winsound is unavailable.
+PLAYER_COMMANDS = (("afplay",), ("paplay",), ("aplay", "-q"))
+
+
+def phrase_key(text: str, voice: str, rate: int) -> str:
+    """Stable file stem for ``text`` spoken with ``voice`` at ``rate``."""
+    material = json.dumps([" ".join(text.split()), voice, rate])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()[:32]
+
+
+class AudioPlayer(Protocol):
+    def play(self, path: Path, interrupted: threading.Event) -> None:
+        """Play ``path`` to the end, or until ``interrupted`` is set."""
+        ...
+
+
+class WinsoundPlayer:
+    """Plays WAV files through the Windows ``winsound`` module."""
+
+    def play(self, path: Path, interrupted: threading.Event) -> None:
+        with wave.open(str(path), "rb") as wav:
+            duration = wav.getnframes() / float(wav.getframerate())
+        winsound.PlaySound(str(path), winsound.SND_FILENAME | winsound.SND_ASYNC | winsound.SND_NODEFAULT)
+        if interrupted.wait(duration):
+            winsound.PlaySound(None, 0)
+
+
+class CommandPlayer:
+    """Plays WAV files with a command-line player such as ``afplay`` or ``aplay``."""
+
+    def __init__(self, command: Sequence[str], poll_seconds: float = 0.02) -> None:
+        self.command = list(command)
+        self.poll_seconds = poll_seconds
+
+    def play(self, path: Path, interrupted: threading.Event) -> None:
+        process = subprocess.Popen([*self.command, str(path)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            while process.poll() is None:
+                if interrupted.wait(self.poll_seconds):
+                    process.terminate()
+                    break
+        finally:
+            returncode = process.wait()
+        if returncode != 0 and not interrupted.is_set():
+            raise OSError(f"{self.command[0]} exited with status {returncode}")
+
+
+def default_player() -> AudioPlayer | None:
+    """``winsound`` on Windows, else the first command-line player on ``PATH``."""
+    if winsound is not None:
+        return WinsoundPlayer()
+    for command in PLAYER_COMMANDS:
+        if shutil.which(command[0]):
+            return CommandPlayer(command)
+    logger.warning(
+        "No audio player found (winsound, %s); cached phrases are synthesized live",
+        ", ".join(command[0] for command in PLAYER_COMMANDS),
+    )
+    return None
+
+
+class PhraseCache:
+    """Directory of rendered phrase audio plus a queue of phrases to render.
+
+    ``add()`` registers phrases; ``next_pending()`` hands out those without a
+    file for the current voice and rate, which the TTS worker renders with
+    ``render()`` while it has nothing to say. Without a ``player`` every
+    lookup misses, so speech falls back to live synthesis.
+    """
+
+    def __init__(self, directory: str | Path, player: AudioPlayer | None = None) -> None:
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.player = player if player is not None else default_player()
+        self.voice = "default"
+        self.rate = 0
+        self._pending: deque[str] = deque()
+        self._queued: set[str] = set()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "rendered": 0, "render_failures": 0}
+
+    def bind(self, engine: Any) -> None:
+        """Key files by the engine's current voice and rate."""
+        try:
+            self.voice = str(engine.getProperty("voice"))
+            self.rate = int(engine.getProperty("rate"))
+        except Exception as exc:
+            logger.debug("Could not read TTS voice settings: %s", exc)
+
+    def path_for(self, text: str) -> Path:
+        return self.directory / f"{phrase_key(text, self.voice, self.rate)}.wav"
+
+    def add(self, phrases: Iterable[str]) -> None:
+        """Register phrases to be rendered ahead of time."""
+        with self._lock:
+            for phrase in phrases:
+                if phrase and phrase not in self._queued:
+                    self._queued.add(phrase)
+                    self._pending.append(phrase)
+
+    def next_pending(self) -> str | None:
+        """Pop the next registered phrase that has no rendered file yet."""
+        if self.player is None:
+            return None
+        with self._lock:
+            while self._pending:
+                phrase = self._pending.popleft()
+                if not self.path_for(phrase).exists():
+                    return phrase
+        return None
+
+    def lookup(self, text: str) -> Path | None:
+        """Return the rendered file for ``text``, or None to synthesize it live."""
+        path = self.path_for(text) if self.player is not None else None
+        hit = path is not None and path.exists()
+        with self._lock:
+            self._counters["hits" if hit else "misses"] += 1
+        return path if hit else None
+
+    def render(self, engine: Any, text: str) -> bool:
+        """Synthesize ``text`` to its cache file with ``engine`` (pyttsx3 ``save_to_file``)."""
+        path = self.path_for(text)
+        partial = path.with_name(f"{path.stem}.part.wav")
+        try:
+            engine.save_to_file(text, str(partial))
+            engine.runAndWait()
+            if partial.stat().st_size < _MIN_WAV_BYTES:
+                raise OSError("empty audio")
+            os.replace(partial, path)
+        except Exception as exc:
+            logger.warning("Could not pre-render %r: %s", text, exc)
+            partial.unlink(missing_ok=True)
+            with self._lock:
+                self._counters["render_failures"] += 1
+            return False
+        with self._lock:
+            self._counters["rendered"] += 1
+        return True
+
+    def play(self, path: Path, interrupted: threading.Event) -> bool:
+        """Play a cached file; returns False if playback failed and live synthesis should run."""
+        try:
+            self.player.play(path, interrupted)
+        except Exception as exc:
+            logger.warning("Cached phrase playback failed: %s", exc)
+            return False
+        return True
+
+    def stats(self) -> dict[str, int]:
+        """Return hit, miss, render and failure counts plus the render backlog."""
+        with self._lock:
+            return {**self._counters, "pending": len(self._pending)}
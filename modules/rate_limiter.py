@@ -0,0 +1,119 @@
+"""Client-side token-bucket rate limiting with a fair waiting queue."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+
+
+class RateLimitExceeded(RuntimeError):
+    """Raised when a caller cannot be admitted within its maximum wait."""
+
+
+class TokenBucket:
+    """Bucket of ``capacity`` units refilled continuously at ``refill_per_second``.
+
+    Not thread-safe on its own; ``ProviderRateLimiter`` serializes access.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._clock = clock
+        self._level = capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.refill_per_second)
+        self._updated = now
+
+    def available(self) -> float:
+        self._refill()
+        return self._level
+
+    def time_until(self, amount: float) -> float:
+        """Seconds until ``amount`` units are available (0 if they already are)."""
+        missing = min(amount, self.capacity) - self.available()
+        if missing <= 0:
+            return 0.0
+        return missing / self.refill_per_second if self.refill_per_second > 0 else float("inf")
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self._level -= min(amount, self.capacity)
+
+
+class ProviderRateLimiter:
+    """Requests-per-minute and tokens-per-minute limits for one provider.
+
+    Callers are admitted strictly in arrival order: only the caller at the
+    head of the queue may draw from the buckets, so a large request cannot be
+    overtaken indefinitely by small ones. A caller that cannot be admitted
+    within its maximum wait is rejected with ``RateLimitExceeded`` instead of
+    being sent and refused by the provider.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        max_wait_seconds: float = 5.0,
+        burst_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_wait_seconds = max_wait_seconds
+        self._clock = clock
+        self._requests = TokenBucket(requests_per_minute * burst_seconds / 60.0, requests_per_minute / 60.0, clock)
+        self._tokens = TokenBucket(tokens_per_minute * burst_seconds / 60.0, tokens_per_minute / 60.0, clock)
+        self._cond = threading.Condition()
+        self._waiters: deque[object] = deque()
+        self._counters = {"granted": 0, "rejected": 0}
+
+    def acquire(self, tokens: int, timeout: float | None = None) -> float:
+        """Block until one request and ``tokens`` tokens are admitted.
+
+        Waits at most ``min(timeout, max_wait_seconds)`` and returns the time
+        spent waiting; raises ``RateLimitExceeded`` if admission would take longer.
+        """
+        max_wait = self.max_wait_seconds if timeout is None else min(timeout, self.max_wait_seconds)
+        started = self._clock()
+        ticket = object()
+        with self._cond:
+            self._waiters.append(ticket)
+            try:
+                while True:
+                    remaining = started + max_wait - self._clock()
+                    if self._waiters[0] is ticket:
+                        wait_for = max(self._requests.time_until(1), self._tokens.time_until(tokens))
+                        if wait_for <= 0:
+                            self._requests.consume(1)
+                            self._tokens.consume(tokens)
+                            self._counters["granted"] += 1
+                            return self._clock() - started
+                        if wait_for > remaining:
+                            break
+                        self._cond.wait(wait_for)
+                    else:
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+            finally:
+                self._waiters.remove(ticket)
+                self._cond.notify_all()
+            self._counters["rejected"] += 1
+        raise RateLimitExceeded(f"Rate limit wait would exceed {max_wait:.2f}s")
+
+    def levels(self) -> dict[str, float]:
+        """Return current bucket levels, queue depth and admission counters."""
+        with self._cond:
+            return {
+                "requests_available": self._requests.available(),
+                "requests_capacity": self._requests.capacity,
+                "tokens_available": self._tokens.available(),
+                "tokens_capacity": self._tokens.capacity,
+                "queued": len(self._waiters),
+                **self._counters,
+            }
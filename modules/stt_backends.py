@@ -0,0 +1,155 @@
+"""Pluggable speech-to-text backends: Google Web Speech and offline Vosk.
+
+Every backend can transcribe a finished ``Utterance``. Backends with
+``streaming = True`` also decode incrementally: ``open_stream()`` returns a
+``RecognitionStream`` that accepts PCM frames while the user is speaking and
+reports partial hypotheses, so the final text is ready as soon as the
+utterance ends.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+
+from modules.audio_capture import SAMPLE_RATE, Utterance
+
+try:
+    import speech_recognition as sr
+except ImportError:  # optional in constrained environments
+    sr = None
+
+try:
+    import vosk
+except ImportError:  # optional in constrained environments
+    vosk = None
+
+logger = logging.getLogger(__name__)
+
+# PCM bytes fed to a streaming decoder per call when transcribing a whole utterance.
+TRANSCRIBE_CHUNK_BYTES = 8000
+
+
+class STTError(RuntimeError):
+    """Raised when a backend cannot be reached or set up."""
+
+
+class RecognitionStream:
+    """Incremental decoding session for one utterance."""
+
+    def accept(self, pcm: bytes) -> str | None:
+        """Feed 16-bit mono PCM; returns the current partial hypothesis, if any."""
+        raise NotImplementedError
+
+    def finish(self) -> str:
+        """Flush the decoder and return the final transcript ("" if nothing was heard)."""
+        raise NotImplementedError
+
+
+class STTBackend:
+    name = "base"
+    streaming = False
+
+    def transcribe(self, utterance: Utterance) -> str:
+        """Return the transcript of a complete utterance ("" if nothing was understood)."""
+        raise NotImplementedError
+
+    def open_stream(self, sample_rate: int = SAMPLE_RATE) -> RecognitionStream:
+        """Start a decoding session; non-streaming backends transcribe once at the end."""
+        return _BufferedStream(self, sample_rate)
+
+
+class _BufferedStream(RecognitionStream):
+    def __init__(self, backend: STTBackend, sample_rate: int) -> None:
+        self._backend = backend
+        self._sample_rate = sample_rate
+        self._chunks: list[bytes] = []
+
+    def accept(self, pcm: bytes) -> str | None:
+        self._chunks.append(pcm)
+        return None
+
+    def finish(self) -> str:
+        return self._backend.transcribe(Utterance(b"".join(self._chunks), self._sample_rate))
+
+
+class GoogleBackend(STTBackend):
+    """Google Web Speech API via SpeechRecognition (network, whole-phrase upload)."""
+
+    name = "google"
+
+    def __init__(self, language: str = "en-US", recognizer=None) -> None:
+        if recognizer is None and sr is None:
+            raise STTError("SpeechRecognition is not installed")
+        self.language = language
+        self.recognizer = recognizer or sr.Recognizer()
+
+    def transcribe(self, utterance: Utterance) -> str:
+        try:
+            return self.recognizer.recognize_google(utterance.to_audio_data(), language=self.language)
+        except sr.UnknownValueError:
+            return ""
+        except sr.RequestError as exc:
+            raise STTError(f"Google speech recognition failed: {exc}") from exc
+
+
+class _VoskStream(RecognitionStream):
+    def __init__(self, recognizer) -> None:
+        self._recognizer = recognizer
+        self._segments: list[str] = []
+
+    def accept(self, pcm: bytes) -> str | None:
+        if self._recognizer.AcceptWaveform(pcm):
+            # Vosk closed a segment at an internal pause; keep it and carry on.
+            text = json.loads(self._recognizer.Result()).get("text", "")
+            if text:
+                self._segments.append(text)
+            return " ".join(self._segments) or None
+        partial = json.loads(self._recognizer.PartialResult()).get("partial", "")
+        return " ".join([*self._segments, partial]).strip() or None
+
+    def finish(self) -> str:
+        text = json.loads(self._recognizer.FinalResult()).get("text", "")
+        return " ".join([*self._segments, text]).strip()
+
+
+class VoskBackend(STTBackend):
+    """Offline Kaldi decoding on CPU with partial hypotheses (``vosk`` package).
+
+    The acoustic model is loaded once; each utterance gets a fresh recognizer.
+    """
+
+    name = "vosk"
+    streaming = True
+
+    def __init__(self, model_path: str, sample_rate: int = SAMPLE_RATE) -> None:
+        if vosk is None:
+            raise STTError("vosk is not installed")
+        model_path = os.path.expanduser(model_path)
+        if not os.path.isdir(model_path):
+            raise STTError(f"Vosk model directory not found: {model_path}")
+        vosk.SetLogLevel(-1)
+        self.sample_rate = sample_rate
+        self.model = vosk.Model(model_path)
+
+    def open_stream(self, sample_rate: int = SAMPLE_RATE) -> RecognitionStream:
+        return _VoskStream(vosk.KaldiRecognizer(self.model, sample_rate))
+
+    def transcribe(self, utterance: Utterance) -> str:
+        stream = self.open_stream(utterance.sample_rate)
+        for offset in range(0, len(utterance.pcm), TRANSCRIBE_CHUNK_BYTES):
+            stream.accept(utterance.pcm[offset:offset + TRANSCRIBE_CHUNK_BYTES])
+        return stream.finish()
+
+
+def create_backend(name: str = "google", model_path: str = "") -> STTBackend:
+    """Build the backend called ``name``, falling back to Google if it cannot be set up."""
+    if name == VoskBackend.name:
+        try:
+            return VoskBackend(model_path)
+        except STTError as exc:
+            logger.warning("Offline STT unavailable, using Google: %s", exc)
+    elif name != GoogleBackend.name:
+        logger.warning("Unknown STT backend %r, using Google", name)
+    return GoogleBackend()
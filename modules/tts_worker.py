@@ -0,0 +1,245 @@
+"""Single-owner text-to-speech worker with a priority queue and barge-in.
+
+pyttsx3 engines are not safe to drive from several threads, and
+``runAndWait()`` blocks its caller for as long as the speech lasts. A
+``TTSWorker`` creates the engine on its own thread and speaks queued
+utterances one sentence at a time, most urgent first. Callers get a
+``SpeechHandle`` back immediately and may wait on it. With a ``PhraseCache``
+the worker plays pre-rendered audio for known phrases and renders the
+registered ones while it is idle.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import re
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from modules.phrase_cache import PhraseCache
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_ALERT = 0
+PRIORITY_RESPONSE = 10
+PRIORITY_CHATTER = 20
+
+# A sentence ends at terminal punctuation followed by whitespace.
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+# Speak a run-on chunk early once it grows past this many characters.
+MAX_CHUNK_CHARS = 200
+
+
+def iter_sentences(chunks: Iterable[str]) -> Iterator[str]:
+    """Regroup streamed text chunks into whole sentences as they complete."""
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        parts = _SENTENCE_END.split(buffer)
+        for sentence in parts[:-1]:
+            if sentence.strip():
+                yield sentence.strip()
+        buffer = parts[-1]
+        if len(buffer) > MAX_CHUNK_CHARS and " " in buffer:
+            head, buffer = buffer.rsplit(" ", 1)
+            yield head.strip()
+    if buffer.strip():
+        yield buffer.strip()
+
+
+class SpeechHandle:
+    """Tracks one queued utterance: ``queued`` -> ``speaking`` -> a final status.
+
+    Final statuses are ``done``, ``interrupted`` (cut off mid-speech) and
+    ``cancelled`` (dropped before it started).
+    """
+
+    def __init__(self, text: str, priority: int) -> None:
+        self.text = text
+        self.priority = priority
+        self.status = "queued"
+        self._finished = threading.Event()
+        self._interrupted = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._finished.is_set()
+
+    @property
+    def cut_off(self) -> bool:
+        """True once the utterance was interrupted or cancelled (possibly still winding down)."""
+        return self._interrupted.is_set() or self.status == "cancelled"
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until the utterance is finished, interrupted or cancelled."""
+        return self._finished.wait(timeout)
+
+    def _finish(self, status: str) -> None:
+        self.status = status
+        self._finished.set()
+
+
+class TTSWorker:
+    """Speak queued utterances on one thread that owns the engine.
+
+    Lower ``priority`` values are more urgent. An utterance that is more
+    urgent than the one being spoken interrupts it; ``interrupt()`` stops the
+    current utterance and drops queued ones for barge-in.
+    """
+
+    def __init__(
+        self, engine_factory: Callable[[], Any] | None = None, phrase_cache: PhraseCache | None = None
+    ) -> None:
+        self._engine_factory = engine_factory
+        self.phrase_cache = phrase_cache
+        self._engine: Any = None
+        self._queue: list[tuple[int, int, SpeechHandle]] = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._current: SpeechHandle | None = None
+        self._thread: threading.Thread | None = None
+        self._closing = False
+        # Bumped by every interrupt() so producers of streamed replies can tell they were cut off.
+        self._generation = 0
+        self._counters = {"spoken": 0, "interrupted": 0, "preempted": 0, "cancelled": 0}
+
+    def say(self, text: str, priority: int = PRIORITY_RESPONSE) -> SpeechHandle:
+        """Queue ``text`` and return immediately."""
+        handle = SpeechHandle(text, priority)
+        with self._cond:
+            if self._closing:
+                handle._finish("cancelled")
+                return handle
+            self._ensure_thread()
+            heapq.heappush(self._queue, (priority, next(self._sequence), handle))
+            current = self._current
+            if current is not None and priority < current.priority:
+                self._counters["preempted"] += 1
+                self._stop_current(current)
+            self._cond.notify()
+        return handle
+
+    def prerender(self, phrases: Iterable[str]) -> None:
+        """Register phrases for the phrase cache; they are rendered whenever the worker is idle."""
+        if self.phrase_cache is None:
+            return
+        self.phrase_cache.add(phrases)
+        with self._cond:
+            if not self._closing:
+                self._ensure_thread()
+                self._cond.notify()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="tts-worker", daemon=True)
+            self._thread.start()
+
+    def interrupt(self, include_alerts: bool = False) -> bool:
+        """Stop the current utterance and drop queued ones (alerts are kept by default).
+
+        Returns True if something was being spoken or was waiting.
+        """
+        with self._cond:
+            self._generation += 1
+            keep = [entry for entry in self._queue if entry[0] <= PRIORITY_ALERT and not include_alerts]
+            dropped = [entry[2] for entry in self._queue if entry not in keep]
+            self._queue = keep
+            heapq.heapify(self._queue)
+            current = self._current
+            stopped = current is not None and (include_alerts or current.priority > PRIORITY_ALERT)
+            if stopped:
+                self._stop_current(current)
+            self._counters["cancelled"] += len(dropped)
+        for handle in dropped:
+            handle._finish("cancelled")
+        return stopped or bool(dropped)
+
+    @property
+    def generation(self) -> int:
+        """Number of ``interrupt()`` calls so far; a change means queued speech was dropped."""
+        return self._generation
+
+    @property
+    def is_speaking(self) -> bool:
+        return self._current is not None
+
+    def _stop_current(self, handle: SpeechHandle) -> None:
+        handle._interrupted.set()
+        if self._engine is not None:
+            try:
+                self._engine.stop()
+            except Exception as exc:  # best effort; the worker also checks between sentences
+                logger.debug("TTS engine stop failed: %s", exc)
+
+    def _run(self) -> None:
+        if self._engine_factory is not None:
+            try:
+                self._engine = self._engine_factory()
+            except Exception as exc:
+                logger.warning("TTS engine unavailable: %s", exc)
+        if self._engine is not None and self.phrase_cache is not None:
+            self.phrase_cache.bind(self._engine)
+        while True:
+            phrase = None
+            with self._cond:
+                while not self._queue and not self._closing:
+                    # Idle: render one registered phrase, then look at the queue again.
+                    phrase = self._next_phrase()
+                    if phrase is not None:
+                        break
+                    self._cond.wait()
+                if self._closing:
+                    return
+                if phrase is None:
+                    _, _, handle = heapq.heappop(self._queue)
+                    self._current = handle
+                    handle.status = "speaking"
+            if phrase is not None:
+                self.phrase_cache.render(self._engine, phrase)
+                continue
+            self._speak(handle)
+            with self._cond:
+                self._current = None
+                interrupted = handle._interrupted.is_set()
+                self._counters["interrupted" if interrupted else "spoken"] += 1
+            handle._finish("interrupted" if interrupted else "done")
+
+    def _next_phrase(self) -> str | None:
+        if self._engine is None or self.phrase_cache is None:
+            return None
+        return self.phrase_cache.next_pending()
+
+    def _speak(self, handle: SpeechHandle) -> None:
+        if self.phrase_cache is not None and self._engine is not None:
+            path = self.phrase_cache.lookup(handle.text)
+            if path is not None and self.phrase_cache.play(path, handle._interrupted):
+                return
+        if self._engine is None:
+            return
+        for sentence in iter_sentences([handle.text]):
+            if handle._interrupted.is_set():
+                return
+            try:
+                self._engine.say(sentence)
+                self._engine.runAndWait()
+            except Exception as exc:
+                logger.warning("Speech failed: %s", exc)
+                return
+
+    def stats(self) -> dict[str, int]:
+        """Return spoken, interrupted, preempted and cancelled counts plus queue depth."""
+        with self._cond:
+            return {**self._counters, "queued": len(self._queue), "speaking": int(self._current is not None)}
+
+    def close(self, timeout: float = 1.0) -> None:
+        """Stop speaking, cancel everything queued and end the worker thread."""
+        self.interrupt(include_alerts=True)
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -1,46 +1,106 @@
-import speech_recognition as sr
-import pyttsx3
+import re
 import time
+from collections import deque
+
+try:
+    import pyttsx3
+except ImportError:  # optional in constrained environments
+    pyttsx3 = None
+
+from modules.audio_capture import AudioCapture
+from modules.audio_preprocess import AudioPreprocessor
+from modules.stt_backends import STTError, create_backend
+from modules.tts_worker import PRIORITY_RESPONSE, TTSWorker, iter_sentences
+
+# The microphone stays open while JARVIS talks, so it also hears JARVIS. A
+# partial transcript only barges in once it holds this many words that are not
+# part of what JARVIS has just said.
+BARGE_IN_MIN_WORDS = 2
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+def _create_engine():
+    """Build the text-to-speech engine (called on the TTS worker thread)."""
+    engine = pyttsx3.init()
+    engine.setProperty('rate', 150)  # Speed of speech
+    return engine
+
 
 class VoiceInterface:
-    def __init__(self):
-        # Initialize text-to-speech engine
-        self.engine = pyttsx3.init()
-        self.engine.setProperty('rate', 150)  # Speed of speech
-        self.recognizer = sr.Recognizer()
+    def __init__(self, stt_backend=None, on_partial=None, tts_engine_factory=None, phrase_cache=None,
+                 preprocess=True):
+        # One worker thread owns the text-to-speech engine and speaks queued
+        # utterances, most urgent first. Phrases in the phrase cache play from
+        # pre-rendered audio instead of being synthesized again.
+        self.tts = TTSWorker(tts_engine_factory or (_create_engine if pyttsx3 else None), phrase_cache)
         self.use_microphone = False
         self.enabled = True
-        
-        # Try to initialize microphone, but don't fail if it's not available
+        # Called with partial transcripts while the user is still speaking
+        self.on_partial = on_partial
+        # Sentences recently queued for speech, to tell JARVIS's echo from the user
+        self._recent_speech = deque(maxlen=4)
+        # Resample, denoise and trim utterances before they are transcribed
+        self.preprocessor = AudioPreprocessor() if preprocess else None
+        # PreprocessReport of the most recent batch-transcribed utterance
+        self.last_preprocess_report = None
+
+        # Speech-to-text backend (Google by default; streaming ones decode during capture)
+        try:
+            self.stt = stt_backend or create_backend()
+        except STTError as e:
+            print(f"[Voice] Speech recognition unavailable: {e}")
+            self.stt = None
+
+        # Open the microphone once; a capture thread keeps it streaming and
+        # cuts utterances as they end. Don't fail if it's not available.
+        streaming = self.stt is not None and self.stt.streaming
+        self.capture = AudioCapture(
+            open_stream=self.stt.open_stream if streaming else None,
+            on_partial=self._handle_partial,
+        )
         try:
-            self.microphone = sr.Microphone()
+            if self.stt is None:
+                raise RuntimeError("no speech-to-text backend")
+            self.capture.start()
             self.use_microphone = True
             print("[Voice] Microphone initialized successfully")
         except Exception as e:
             print(f"[Voice] Could not initialize microphone: {e}")
             print("[Voice] Using simulated voice input instead")
 
-    def listen(self):
-        """Listen to user input via microphone or simulate input."""
+    def listen(self, timeout=None):
+        """Listen to user input via microphone or simulate input.
+
+        Returns "" if no utterance completes within ``timeout`` seconds.
+        """
         if not self.enabled:
             return ""
 
         if self.use_microphone:
             try:
-                with self.microphone as source:
-                    print("[Voice] Listening...")
-                    audio = self.recognizer.listen(source)
-                try:
-                    # Recognize speech using Google's API
-                    command = self.recognizer.recognize_google(audio)
-                    print(f"[Voice] Recognized: {command}")
-                    return command.lower()
-                except sr.UnknownValueError:
-                    print("[Voice] Could not understand audio.")
+                utterance = self.capture.next_utterance(timeout=timeout)
+                if utterance is None:
                     return ""
-                except sr.RequestError as e:
+                try:
+                    # Streaming backends already decoded it during capture
+                    if utterance.text is not None:
+                        command = utterance.text
+                    else:
+                        if self.preprocessor is not None:
+                            utterance, report = self.preprocessor.process(utterance)
+                            self.last_preprocess_report = report
+                            print(f"[Voice] Audio preprocessed: {report.bytes_saved} bytes saved in "
+                                  f"{report.total_ms:.0f} ms")
+                        # Nothing left after trimming silence: no need to ask the recognizer
+                        command = self.stt.transcribe(utterance) if utterance.pcm else ""
+                except STTError as e:
                     print(f"[Voice] Recognition error; {e}")
                     return ""
+                if not command:
+                    print("[Voice] Could not understand audio.")
+                    return ""
+                print(f"[Voice] Recognized: {command}")
+                return command.lower()
             except Exception as e:
                 print(f"[Voice] Error during listening: {e}")
                 return ""
@@ -50,13 +110,60 @@ class VoiceInterface:
             command = input("> ")
             return command.lower()
 
-    def speak(self, text):
-        """Speak the given text using text-to-speech engine."""
-        print(f"[Jarvis Says] {text}")
+    def _handle_partial(self, text):
+        # Barge-in: the user talking over JARVIS cuts the reply short (alerts keep playing)
+        if self.tts.is_speaking and self._is_barge_in(text):
+            self.tts.interrupt()
+        if self.on_partial:
+            self.on_partial(text)
+
+    def _is_barge_in(self, text):
+        """True if a partial has enough words of its own to be the user, not JARVIS's echo."""
+        own_words = set(_WORD.findall(" ".join(list(self._recent_speech)).lower()))
+        new_words = [word for word in _WORD.findall(text.lower()) if word not in own_words]
+        return len(new_words) >= BARGE_IN_MIN_WORDS
+
+    def close(self):
+        """Release the microphone stream and stop the speech worker."""
+        if self.use_microphone:
+            self.capture.stop()
+            self.use_microphone = False
+        self.tts.close()
+
+    def speak(self, text, priority=PRIORITY_RESPONSE, wait=True):
+        """Speak text, or an iterable of streamed text chunks.
+
+        Streamed chunks are queued one sentence at a time as soon as each
+        sentence is complete. Once the reply is interrupted (barge-in or a
+        more urgent utterance) the rest of the stream is not read, and the
+        stream is closed. With ``wait`` the call returns once everything has
+        been spoken (or interrupted); otherwise it returns immediately.
+        Returns the text that was queued.
+        """
+        sentences = [text] if isinstance(text, str) else iter_sentences(text)
+        generation = self.tts.generation
+        spoken = []
+        handle = None
         try:
-            self.engine.say(text)
-            self.engine.runAndWait()
-        except Exception as e:
-            print(f"[Voice] Error during speech: {e}")
-            # Fallback to just printing
-            print(f"[Voice] Could not speak: {text}") 
\ No newline at end of file
+            for sentence in sentences:
+                if self.tts.generation != generation or (handle is not None and handle.cut_off):
+                    break
+                print(f"[Jarvis Says] {sentence}")
+                self._recent_speech.append(sentence)
+                handle = self.tts.say(sentence, priority)
+                spoken.append(sentence)
+        finally:
+            if not isinstance(text, str) and hasattr(text, "close"):
+                # Stop the upstream stream (and its provider request) as well
+                text.close()
+        if wait and handle is not None:
+            handle.wait()
+        return " ".join(spoken)
+
+    def prerender(self, phrases):
+        """Render frequently spoken phrases ahead of time (needs a phrase cache)."""
+        self.tts.prerender(phrases)
+
+    def interrupt(self):
+        """Stop speaking and drop queued replies; returns True if anything was cut."""
+        return self.tts.interrupt()
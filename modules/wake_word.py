@@ -0,0 +1,327 @@
+"""On-device wake-word spotting with NumPy MFCCs and template matching.
+
+A handful of enrolled recordings of the wake word ("jarvis", "wake up
+jarvis") are turned into MFCC templates. Each captured utterance has its
+first couple of seconds compared against every template with subsequence
+dynamic time warping, so the keyword may start anywhere in that window and be
+spoken up to twice as slowly. Only utterances that match, plus follow-ups
+within a short conversation window, are passed on to full speech
+recognition, with only the wake word itself cut out
+(``transcribe_around_wake_word``) since the spotter has already recognized it.
+
+Enrol templates by recording 16 kHz mono WAV files into a directory, one
+sub-directory per wake phrase, e.g. ``python -m modules.wake_word ~/.jarvis/wake jarvis``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import threading
+import time
+import wave
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from modules.audio_capture import SAMPLE_RATE, Utterance
+
+logger = logging.getLogger(__name__)
+
+N_MFCC = 13
+N_MELS = 26
+N_FFT = 512
+WINDOW_MS = 25
+HOP_MS = 10
+# Used when a phrase has a single template, so no spread can be measured.
+DEFAULT_THRESHOLD = 4.0
+# Accept distances up to this multiple of the worst template-to-template distance.
+CALIBRATION_MARGIN = 1.3
+
+
+@lru_cache(maxsize=8)
+def _mel_filterbank(sample_rate: int, n_fft: int, n_mels: int) -> np.ndarray:
+    def to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def to_hz(mel):
+        return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+    edges = to_hz(np.linspace(to_mel(0.0), to_mel(sample_rate / 2), n_mels + 2))
+    bins = np.floor((n_fft + 1) * edges / sample_rate).astype(int)
+    filters = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+    for index in range(n_mels):
+        left, centre, right = bins[index], bins[index + 1], bins[index + 2]
+        if centre > left:
+            filters[index, left:centre] = (np.arange(left, centre) - left) / (centre - left)
+        if right > centre:
+            filters[index, centre:right] = (right - np.arange(centre, right)) / (right - centre)
+    return filters
+
+
+@lru_cache(maxsize=8)
+def _dct_matrix(n_mfcc: int, n_mels: int) -> np.ndarray:
+    """Orthonormal DCT-II rows 1..n_mfcc (c0, the loudness term, is dropped)."""
+    k = np.arange(1, n_mfcc + 1)[:, None]
+    n = np.arange(n_mels)[None, :]
+    return (np.sqrt(2.0 / n_mels) * np.cos(np.pi * k * (2 * n + 1) / (2 * n_mels))).astype(np.float32)
+
+
+def mfcc(samples: np.ndarray, sample_rate: int = SAMPLE_RATE, n_mfcc: int = N_MFCC) -> np.ndarray:
+    """Return a ``(frames, n_mfcc)`` MFCC matrix for int16 or float samples."""
+    window = sample_rate * WINDOW_MS // 1000
+    hop = sample_rate * HOP_MS // 1000
+    signal = samples.astype(np.float32)
+    signal = np.append(signal[:1], signal[1:] - 0.97 * signal[:-1])
+    if len(signal) < window:
+        signal = np.pad(signal, (0, window - len(signal)))
+    frames = np.lib.stride_tricks.sliding_window_view(signal, window)[::hop] * np.hamming(window).astype(np.float32)
+    power = np.abs(np.fft.rfft(frames, N_FFT)) ** 2 / N_FFT
+    energies = np.log(power @ _mel_filterbank(sample_rate, N_FFT, N_MELS).T + 1e-6)
+    features = energies @ _dct_matrix(n_mfcc, N_MELS).T
+    return features
+
+
+def subsequence_dtw(template: np.ndarray, features: np.ndarray) -> tuple[float, int, int]:
+    """Best alignment of ``template`` anywhere inside ``features``.
+
+    Each template frame advances the utterance by 0, 1 or 2 frames, so every
+    row of the cost table is computed in one vectorized step. Returns the
+    per-frame distance and the utterance frames where the match starts and ends.
+    """
+    cost = np.sqrt(
+        np.maximum(
+            (template ** 2).sum(axis=1)[:, None] + (features ** 2).sum(axis=1)[None, :] - 2.0 * template @ features.T,
+            0.0,
+        )
+    )
+    row = cost[0].copy()
+    start = np.arange(len(features))
+    for index in range(1, len(template)):
+        previous, previous_start = row, start
+        row, start = previous.copy(), previous_start.copy()
+        for step in (1, 2):
+            better = previous[:-step] < row[step:]
+            row[step:] = np.where(better, previous[:-step], row[step:])
+            start[step:] = np.where(better, previous_start[:-step], start[step:])
+        row += cost[index]
+    end = int(np.argmin(row))
+    return float(row[end]) / len(template), int(start[end]), end
+
+
+@dataclass(frozen=True)
+class WakeWordMatch:
+    label: str
+    distance: float
+    start_sample: int
+    end_sample: int
+
+
+def split_at_wake_word(utterance: Utterance, match: WakeWordMatch) -> tuple[Utterance, Utterance]:
+    """Return the audio before and after the spotted wake word, without the wake word itself."""
+    frame = utterance.sample_width * utterance.channels
+    return (
+        replace(utterance, pcm=utterance.pcm[:match.start_sample * frame]),
+        replace(utterance, pcm=utterance.pcm[match.end_sample * frame:]),
+    )
+
+
+def transcribe_around_wake_word(
+    utterance: Utterance, match: WakeWordMatch, transcribe: Callable[[Utterance], str]
+) -> str:
+    """Transcribe the speech either side of the wake word, with its label in between.
+
+    Only the spotted span is skipped, so "wake up jarvis" or "hey jarvis"
+    keep the words said before the wake word. Empty sides are not sent.
+    """
+    before, after = split_at_wake_word(utterance, match)
+    parts = [transcribe(before) if before.pcm else "", match.label, transcribe(after) if after.pcm else ""]
+    return " ".join(part.strip() for part in parts if part.strip())
+
+
+class WakeWordDetector:
+    """Nearest-template keyword spotter over the start of each utterance.
+
+    Per-phrase thresholds default to ``CALIBRATION_MARGIN`` times the largest
+    distance between that phrase's own templates.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = SAMPLE_RATE,
+        search_seconds: float = 2.5,
+        threshold: float | None = None,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.search_seconds = search_seconds
+        self.threshold = threshold
+        self.templates: dict[str, list[np.ndarray]] = {}
+        self.thresholds: dict[str, float] = {}
+
+    @classmethod
+    def from_directory(cls, directory: str | Path, **kwargs) -> "WakeWordDetector":
+        """Load ``<directory>/<phrase>/*.wav`` templates (16-bit mono)."""
+        detector = cls(**kwargs)
+        root = Path(directory).expanduser()
+        for path in sorted(root.glob("*/*.wav")):
+            try:
+                detector.enroll(path.parent.name.replace("_", " "), [_read_wav(path, detector.sample_rate)])
+            except (OSError, ValueError, wave.Error) as exc:
+                logger.warning("Skipping wake-word template %s: %s", path, exc)
+        return detector
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.templates)
+
+    def enroll(self, label: str, recordings: Iterable[np.ndarray]) -> None:
+        """Add recordings of ``label`` and recalibrate its threshold."""
+        templates = self.templates.setdefault(label, [])
+        templates.extend(mfcc(_trim_silence(recording), self.sample_rate) for recording in recordings)
+        spread = [
+            subsequence_dtw(first, second)[0]
+            for i, first in enumerate(templates)
+            for second in templates[i + 1:]
+        ]
+        self.thresholds[label] = max(spread) * CALIBRATION_MARGIN if spread else DEFAULT_THRESHOLD
+
+    def detect(self, samples: np.ndarray) -> WakeWordMatch | None:
+        """Return the best match within the search window, or None if nothing is close enough."""
+        window = samples[: int(self.search_seconds * self.sample_rate)]
+        features = mfcc(window, self.sample_rate)
+        best: WakeWordMatch | None = None
+        for label, templates in self.templates.items():
+            threshold = self.threshold or self.thresholds[label]
+            for template in templates:
+                distance, start, end = subsequence_dtw(template, features)
+                if distance <= threshold and (best is None or distance < best.distance):
+                    hop = self.sample_rate * HOP_MS // 1000
+                    best = WakeWordMatch(label, distance, start * hop, min(len(samples), (end + 1) * hop))
+        return best
+
+
+class WakeWordGate:
+    """Decide which utterances are worth full speech recognition.
+
+    An utterance passes if it contains a wake word, or if it arrives within
+    ``follow_up_seconds`` of the last one that passed (or of ``hold_open()``),
+    so a conversation does not need the wake word on every turn. Without
+    enrolled templates every utterance passes. ``last_match`` holds the
+    wake word spotted in the most recent utterance, if any.
+    """
+
+    def __init__(
+        self,
+        detector: WakeWordDetector,
+        follow_up_seconds: float = 8.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.detector = detector
+        self.follow_up_seconds = follow_up_seconds
+        self._clock = clock
+        self._open_until = 0.0
+        self.last_match: WakeWordMatch | None = None
+        self._lock = threading.Lock()
+        self._counters = {"utterances": 0, "admitted": 0, "detected": 0, "rejected": 0, "spot_seconds": 0.0}
+
+    def admit(self, utterance: Utterance) -> bool:
+        with self._lock:
+            self._counters["utterances"] += 1
+            self.last_match = None
+            if not self.detector.ready or self._clock() < self._open_until:
+                self._counters["admitted"] += 1
+                self._open_until = self._clock() + self.follow_up_seconds
+                return True
+        started = time.perf_counter()
+        match = self.detector.detect(np.frombuffer(utterance.pcm, dtype=np.int16))
+        with self._lock:
+            self._counters["spot_seconds"] += time.perf_counter() - started
+            if match is None:
+                self._counters["rejected"] += 1
+                return False
+            logger.debug("Wake word %r spotted (distance %.2f)", match.label, match.distance)
+            self.last_match = match
+            self._counters["detected"] += 1
+            self._counters["admitted"] += 1
+            self._open_until = self._clock() + self.follow_up_seconds
+            return True
+
+    @property
+    def is_open(self) -> bool:
+        """True while follow-ups pass without the wake word."""
+        return not self.detector.ready or self._clock() < self._open_until
+
+    def hold_open(self) -> None:
+        """Restart the follow-up window, e.g. after JARVIS answers."""
+        with self._lock:
+            self._open_until = self._clock() + self.follow_up_seconds
+
+    def close(self) -> None:
+        """Require the wake word again for the next utterance."""
+        with self._lock:
+            self._open_until = 0.0
+
+    def stats(self) -> dict[str, float]:
+        """Return utterance, admitted, detected and rejected counts plus time spent spotting."""
+        with self._lock:
+            return dict(self._counters)
+
+
+def _trim_silence(samples: np.ndarray, frame: int = 160, ratio: float = 0.1) -> np.ndarray:
+    """Drop leading and trailing frames quieter than ``ratio`` of the loudest one."""
+    usable = len(samples) // frame * frame
+    if not usable:
+        return samples
+    energy = np.sqrt(np.mean(samples[:usable].astype(np.float32).reshape(-1, frame) ** 2, axis=1))
+    loud = np.flatnonzero(energy >= energy.max() * ratio)
+    return samples[loud[0] * frame:(loud[-1] + 1) * frame]
+
+
+def _read_wav(path: Path, sample_rate: int) -> np.ndarray:
+    with wave.open(str(path), "rb") as wav:
+        if (wav.getnchannels(), wav.getsampwidth(), wav.getframerate()) != (1, 2, sample_rate):
+            raise ValueError(f"expected 16-bit mono PCM at {sample_rate} Hz")
+        return np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+
+
+def _write_wav(path: Path, pcm: bytes, sample_rate: int) -> None:
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Record wake-word templates from the microphone."""
+    from modules.audio_capture import AudioCapture
+
+    parser = argparse.ArgumentParser(description="Record wake-word templates.")
+    parser.add_argument("directory", help="template directory (JARVIS_WAKE_WORD_DIR)")
+    parser.add_argument("phrase", nargs="?", default="jarvis")
+    parser.add_argument("--count", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    target = Path(args.directory).expanduser() / args.phrase.lower().replace(" ", "_")
+    target.mkdir(parents=True, exist_ok=True)
+    capture = AudioCapture()
+    capture.start()
+    try:
+        saved = 0
+        while saved < args.count:
+            print(f"Say '{args.phrase}' ({saved + 1}/{args.count})...")
+            utterance = capture.next_utterance(timeout=10)
+            if utterance is None:
+                continue
+            saved += 1
+            _write_wav(target / f"{int(time.time() * 1000)}.wav", utterance.pcm, utterance.sample_rate)
+    finally:
+        capture.stop()
+    print(f"Saved {saved} templates to {target}")
+
+
+if __name__ == "__main__":
+    main()
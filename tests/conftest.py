@@ -0,0 +1,39 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+@pytest.fixture
+def http_stub():
+    """Start local HTTP/1.1 stub servers; ``respond(request)`` handles each POST/GET."""
+    servers = []
+
+    def start(respond):
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; without this, Nagle
+            # plus delayed ACKs add ~40 ms to every keep-alive response.
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                respond(self)
+
+            do_GET = do_POST
+
+            def log_message(self, *_args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            daemon_threads = True
+            request_queue_size = 128
+
+        server = Server(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
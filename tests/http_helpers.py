@@ -0,0 +1,17 @@
+"""Request/response helpers for handlers passed to the ``http_stub`` fixture."""
+
+import json
+
+
+def send_json(request, payload, status=200):
+    body = json.dumps(payload).encode("utf-8")
+    request.send_response(status)
+    request.send_header("Content-Type", "application/json")
+    request.send_header("Content-Length", str(len(body)))
+    request.end_headers()
+    request.wfile.write(body)
+
+
+def read_json(request):
+    length = int(request.headers.get("Content-Length", "0"))
+    return json.loads(request.rfile.read(length) or b"{}")
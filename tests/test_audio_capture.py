@@ -0,0 +1,138 @@
+import time
+
+import numpy as np
+
+from modules.audio_capture import AudioCapture, NoiseFloor, RingBuffer, UtteranceSegmenter
+
+RATE = 16000
+FRAME = 480  # 30 ms
+
+
+def _noise(frames, amplitude, rng):
+    return [rng.normal(0, amplitude, FRAME).astype(np.int16) for _ in range(frames)]
+
+
+def _tone(frames, amplitude=4000):
+    t = np.arange(frames * FRAME) / RATE
+    samples = (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+    return list(samples.reshape(frames, FRAME))
+
+
+class ScriptedSource:
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.closed = False
+
+    def read(self, frames):
+        return self.frames.pop(0).tobytes() if self.frames else b""
+
+    def close(self):
+        self.closed = True
+
+
+def _wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def test_ring_buffer_wraps_and_clamps_to_retained_samples():
+    ring = RingBuffer(10)
+    ring.write(np.arange(8, dtype=np.int16))
+    ring.write(np.arange(8, 14, dtype=np.int16))
+    assert ring.written == 14
+    assert ring.read(0, 14).tolist() == list(range(4, 14))
+    assert ring.read(10, 12).tolist() == [10, 11]
+
+
+def test_segmenter_cuts_one_utterance_with_pre_roll():
+    rng = np.random.default_rng(0)
+    segmenter = UtteranceSegmenter(sample_rate=RATE, frame_ms=30, hangover_ms=300, pre_roll_ms=150)
+    frames = _noise(20, 50, rng) + _tone(30) + _noise(20, 50, rng)
+    spans = []
+    for index, frame in enumerate(frames, start=1):
+        span = segmenter.push(frame, index * FRAME)
+        if span:
+            spans.append(span)
+
+    assert len(spans) == 1
+    start, end = spans[0]
+    assert start == 20 * FRAME - segmenter.pre_roll_samples
+    # Ends after the hangover of silence, not at the end of the input.
+    assert end == (50 + segmenter.hangover_frames) * FRAME
+
+
+def test_noise_floor_tracks_a_louder_room_without_recalibration():
+    rng = np.random.default_rng(1)
+    segmenter = UtteranceSegmenter(sample_rate=RATE, frame_ms=30, max_utterance_seconds=2)
+    spans = []
+    for index, frame in enumerate(_noise(40, 30, rng) + _noise(300, 300, rng), start=1):
+        span = segmenter.push(frame, index * FRAME)
+        if span:
+            spans.append(span)
+
+    # At most one bogus max-length cut, after which the floor has caught up.
+    assert len(spans) <= 1
+    assert segmenter.noise_floor.level > 200
+    assert not segmenter.in_speech
+
+    # Real speech over the louder background is still detected.
+    loud_speech = _tone(20, amplitude=8000) + _noise(30, 300, rng)
+    found = [segmenter.push(frame, (400 + index) * FRAME) for index, frame in enumerate(loud_speech, start=1)]
+    assert any(found)
+
+
+def test_capture_streams_utterances_from_one_open_source():
+    rng = np.random.default_rng(2)
+    frames = []
+    for _ in range(3):
+        frames += _noise(15, 50, rng) + _tone(20) + _noise(25, 50, rng)
+    source = ScriptedSource(frames)
+    capture = AudioCapture(source=source)
+    capture.start()
+    utterances = [capture.next_utterance(timeout=2) for _ in range(3)]
+    capture.stop()
+
+    assert all(utterance is not None for utterance in utterances)
+    assert all(0.6 < utterance.duration < 1.6 for utterance in utterances)
+    # Each carries the background heard before it: quiet frames only, none of the tone.
+    for utterance in utterances:
+        ambient = np.frombuffer(utterance.ambient, dtype=np.int16)
+        assert len(ambient) >= 10 * FRAME and np.abs(ambient).max() < 1000
+    assert capture.stats()["utterances"] == 3
+    assert source.closed
+
+
+def test_capture_backs_off_and_stops_when_the_device_keeps_failing():
+    class UnpluggedSource(ScriptedSource):
+        def __init__(self, recover_after=None):
+            super().__init__(_noise(5, 50, np.random.default_rng(3)))
+            self.reads = []
+            self.recover_after = recover_after
+
+        def read(self, frames):
+            self.reads.append(time.monotonic())
+            if self.recover_after is None or len(self.reads) <= self.recover_after:
+                raise OSError("device unavailable")
+            return super().read(frames)
+
+    source = UnpluggedSource()
+    capture = AudioCapture(source=source, max_read_errors=5, read_backoff_seconds=0.01)
+    capture.start()
+    assert _wait_until(lambda: not capture.running)
+    capture.stop()
+
+    assert capture.stats()["read_errors"] == 5 and len(source.reads) == 5
+    gaps = np.diff(source.reads)
+    assert all(later > earlier for earlier, later in zip(gaps, gaps[1:]))  # backing off
+
+    # A transient failure resets the count; the stream keeps going.
+    flaky = UnpluggedSource(recover_after=3)
+    capture = AudioCapture(source=flaky, max_read_errors=5, read_backoff_seconds=0.01)
+    capture.start()
+    assert _wait_until(lambda: not capture.running)
+    capture.stop()
+    assert capture.stats()["read_errors"] == 3 and capture.stats()["frames"] == 5
@@ -0,0 +1,145 @@
+import numpy as np
+
+from modules.audio_capture import FRAME_MS, SAMPLE_RATE, Utterance, frame_energy
+from modules.audio_preprocess import STEPS, AudioPreprocessor, resample
+from modules.stt_backends import STTBackend
+from modules.voice_interface import VoiceInterface
+
+
+def tone(rate, seconds=1.0, silence=0.8, amplitude=8000.0):
+    t = np.arange(int(seconds * rate)) / rate
+    voiced = amplitude * np.sin(np.pi * t / seconds) * (np.sin(2 * np.pi * 300 * t) + 0.4 * np.sin(2 * np.pi * 900 * t))
+    gap = np.zeros(int(silence * rate))
+    return np.concatenate([gap, voiced, gap])
+
+
+def rms(samples):
+    return float(np.sqrt(np.mean(np.square(samples.astype(np.float64)))))
+
+
+def test_converts_to_16khz_mono_and_reports_savings():
+    rate = 48000
+    noisy = tone(rate) + np.random.default_rng(0).normal(0, 300, int(2.6 * rate))
+    stereo = np.repeat(noisy[:, None], 2, axis=1).astype(np.int16)
+    utterance = Utterance(stereo.tobytes(), rate, channels=2)
+    assert abs(utterance.duration - 2.6) < 1e-6
+
+    cleaned, report = AudioPreprocessor().process(utterance)
+
+    assert (cleaned.sample_rate, cleaned.channels) == (SAMPLE_RATE, 1)
+    # Silence is trimmed down to the voiced second plus padding.
+    assert 1.0 <= cleaned.duration < 1.4
+    assert report.input_bytes == len(utterance.pcm)
+    assert report.output_bytes == len(cleaned.pcm)
+    assert report.bytes_saved > 0.9 * report.input_bytes
+    assert set(report.step_ms) == set(STEPS) and report.total_ms > 0
+
+
+def test_quiet_speech_the_vad_accepted_survives_trimming():
+    rng = np.random.default_rng(2)
+    quiet = (tone(SAMPLE_RATE, amplitude=180.0) + rng.normal(0, 20, int(2.6 * SAMPLE_RATE))).astype(np.int16)
+    # Loud enough for the capture VAD (frame RMS above NoiseFloor.min_threshold) but well below 150.
+    frame = SAMPLE_RATE * FRAME_MS // 1000
+    assert 100 < max(frame_energy(quiet[i:i + frame]) for i in range(0, len(quiet), frame)) < 150
+    preprocessor = AudioPreprocessor()
+
+    cleaned, _ = preprocessor.process(Utterance(quiet.tobytes()))
+    assert 1.0 <= cleaned.duration < 1.4
+
+    # Background noise alone is still trimmed to nothing.
+    noise_only, _ = preprocessor.process(Utterance(rng.normal(0, 20, SAMPLE_RATE).astype(np.int16).tobytes()))
+    assert noise_only.pcm == b""
+
+
+def test_spectral_gate_suppresses_noise_but_keeps_speech():
+    rng = np.random.default_rng(1)
+    clean = tone(SAMPLE_RATE)
+    noise = rng.normal(0, 400, len(clean))
+    utterance = Utterance((clean + noise).astype(np.int16).tobytes())
+    preprocessor = AudioPreprocessor(trim_ratio=0.0, trim_noise_ratio=0.0)
+
+    cleaned, _ = preprocessor.process(utterance)
+    output = np.frombuffer(cleaned.pcm, dtype=np.int16)
+
+    assert len(output) == len(clean)
+    silent = slice(0, int(0.7 * SAMPLE_RATE))
+    assert rms(output[silent]) < rms(noise[silent]) / 4
+    voiced = slice(int(1.0 * SAMPLE_RATE), int(1.6 * SAMPLE_RATE))
+    assert np.corrcoef(output[voiced], clean[voiced])[0, 1] > 0.99
+    assert preprocessor.noise_profile is not None
+
+
+def test_noise_is_learned_from_ambient_audio_when_the_utterance_is_all_speech():
+    rng = np.random.default_rng(3)
+    t = np.arange(int(0.6 * SAMPLE_RATE)) / SAMPLE_RATE
+    envelope = 0.6 + 0.4 * np.sin(6 * np.pi * t)
+    clean = 3000 * envelope * (np.sin(2 * np.pi * 300 * t) + 0.4 * np.sin(2 * np.pi * 900 * t))
+    noise = rng.normal(0, 300, len(clean))
+    pcm = (clean + noise).astype(np.int16).tobytes()
+    ambient = rng.normal(0, 300, SAMPLE_RATE).astype(np.int16).tobytes()
+
+    def residual(utterance):
+        cleaned, _ = AudioPreprocessor(trim_ratio=0.0, trim_noise_ratio=0.0).process(utterance)
+        return rms(np.frombuffer(cleaned.pcm, dtype=np.int16) - clean) / rms(noise)
+
+    # With no silence in the utterance its quietest frames are speech, so the gate over-subtracts.
+    assert residual(Utterance(pcm)) > 0.8
+    assert residual(Utterance(pcm, ambient=ambient)) < 0.5
+
+
+def test_ungated_pass_reconstructs_the_input_and_reuses_buffers():
+    samples = (np.sin(2 * np.pi * 440 * np.arange(SAMPLE_RATE) / SAMPLE_RATE) * 5000).astype(np.int16)
+    preprocessor = AudioPreprocessor(attenuation=1.0, trim_ratio=0.0, trim_noise_ratio=0.0)
+
+    cleaned, _ = preprocessor.process(Utterance(samples.tobytes()))
+    buffers = {name: id(buffer) for name, buffer in preprocessor._scratch.items()}
+    preprocessor.process(Utterance(samples[: SAMPLE_RATE // 2].tobytes()))
+
+    assert np.max(np.abs(np.frombuffer(cleaned.pcm, dtype=np.int16).astype(int) - samples)) <= 1
+    assert {name: id(buffer) for name, buffer in preprocessor._scratch.items()} == buffers
+    assert preprocessor.stats()["utterances"] == 2
+
+
+def test_resample_preserves_duration_and_pitch():
+    rate = 44100
+    samples = np.sin(2 * np.pi * 1000 * np.arange(rate) / rate).astype(np.float32)
+    output = resample(samples, rate)
+    assert len(output) == SAMPLE_RATE
+    assert np.argmax(np.abs(np.fft.rfft(output))) == 1000
+
+
+class CountingBackend(STTBackend):
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, utterance):
+        self.calls.append(utterance)
+        return "Hello"
+
+
+class QueuedCapture:
+    def __init__(self, utterances):
+        self.utterances = list(utterances)
+
+    def next_utterance(self, timeout=None):
+        return self.utterances.pop(0) if self.utterances else None
+
+
+def test_voice_interface_transcribes_preprocessed_audio_and_skips_silence():
+    backend = CountingBackend()
+    voice = VoiceInterface(stt_backend=backend, tts_engine_factory=lambda: None)
+    voice.capture = QueuedCapture([
+        Utterance(np.zeros(SAMPLE_RATE, dtype=np.int16).tobytes()),
+        Utterance(tone(SAMPLE_RATE).astype(np.int16).tobytes()),
+    ])
+    voice.use_microphone = True
+
+    assert voice.listen(timeout=0) == ""
+    assert backend.calls == []
+    assert voice.listen(timeout=0) == "hello"
+    assert len(backend.calls) == 1 and backend.calls[0].duration < 1.4
+    report = voice.last_preprocess_report
+    assert report.output_bytes == len(backend.calls[0].pcm) and set(report.step_ms) == set(STEPS)
+    assert voice.preprocessor.stats()["bytes_saved"] > 0
+    voice.use_microphone = False
+    voice.close()
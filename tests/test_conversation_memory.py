@@ -0,0 +1,148 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from http_helpers import read_json, send_json
+from modules.conversation_memory import SUMMARY_PREFIX, ConversationMemory, estimate_tokens, is_follow_up
+from modules.llm_cache import ResponseCache
+from modules.llm_selector import LLMSelector
+
+
+def _context_tokens(messages):
+    return sum(estimate_tokens(message["content"]) for message in messages)
+
+
+def test_recent_and_relevant_exchanges_fit_the_budget():
+    memory = ConversationMemory(token_budget=60, recent_exchanges=1)
+    memory.add_exchange("what is the capital of france", "Paris is the capital of France.")
+    for index in range(5):
+        memory.add_exchange(f"unrelated chatter number {index}", "Noted, sir, I will remember that for later.")
+    memory.add_exchange("play some music", "Playing your playlist.")
+
+    messages = memory.context("and what about the population of france")
+    contents = [message["content"] for message in messages]
+    assert "play some music" in contents
+    assert "what is the capital of france" in contents
+    assert _context_tokens(messages) <= 60
+
+
+def test_old_exchanges_fold_into_cached_summaries():
+    calls = []
+
+    def summarizer(exchanges):
+        calls.append(len(exchanges))
+        return f"{len(exchanges)} exchanges"
+
+    memory = ConversationMemory(max_live_exchanges=4, fold_size=2, summarizer=summarizer)
+    for index in range(7):
+        memory.add_exchange(f"question {index}", f"answer {index}")
+
+    assert calls == [2, 2]
+    for _ in range(3):
+        messages = memory.context("next question")
+    assert calls == [2, 2]
+    assert messages[0] == {"role": "system", "content": SUMMARY_PREFIX + "2 exchanges 2 exchanges"}
+    assert memory.stats()["live_exchanges"] == 3
+
+
+def test_payload_stays_bounded_over_a_long_session(http_stub):
+    sizes = []
+
+    def respond(request):
+        payload = read_json(request)
+        sizes.append(len(json.dumps(payload["messages"])))
+        send_json(request, {"choices": [{"message": {"content": "A fairly long answer " * 10}}]})
+
+    memory = ConversationMemory(token_budget=200, summary_budget=64, max_live_exchanges=8)
+    selector = LLMSelector(openai_api_key="test-key", huggingface_api_key="", memory=memory)
+    selector.models["openai"]["endpoint"] = http_stub(respond)
+    try:
+        for index in range(60):
+            selector.query_llm(f"and what about step {index} of the plan")
+    finally:
+        selector.close()
+
+    assert len(sizes) == 60
+    assert max(sizes[20:]) <= max(sizes[:20]) * 1.5
+    assert max(sizes) < (200 + 64) * 4 + 1000
+
+
+def test_cache_is_keyed_by_conversation_context(http_stub):
+    calls = []
+
+    def respond(request):
+        calls.append(read_json(request)["messages"])
+        send_json(request, {"choices": [{"message": {"content": f"answer {len(calls)}"}}]})
+
+    selector = LLMSelector(
+        openai_api_key="test-key", huggingface_api_key="", cache=ResponseCache(), memory=ConversationMemory()
+    )
+    selector.models["openai"]["endpoint"] = http_stub(respond)
+    try:
+        assert selector.query_llm("what about tomorrow") == "answer 1"
+        assert selector.query_llm("what about tomorrow") == "answer 2"
+        selector.reset_conversation()
+        assert selector.query_llm("what about tomorrow") == "answer 1"
+    finally:
+        selector.close()
+
+    assert len(calls) == 2
+    assert [message["role"] for message in calls[1]] == ["system", "user", "assistant", "user"]
+
+
+def test_follow_ups_are_told_apart_from_standalone_questions():
+    assert is_follow_up("what about tomorrow")
+    assert is_follow_up("why is that")
+    assert is_follow_up("and the day after")
+    assert is_follow_up("next one")
+    assert not is_follow_up("what is the capital of france")
+    assert not is_follow_up("how far away is the moon")
+
+
+def test_repeated_standalone_question_hits_the_cache_mid_conversation(http_stub):
+    calls = []
+
+    def respond(request):
+        calls.append(read_json(request)["messages"])
+        send_json(request, {"choices": [{"message": {"content": f"answer {len(calls)}"}}]})
+
+    cache = ResponseCache()
+    selector = LLMSelector(openai_api_key="test-key", huggingface_api_key="", cache=cache, memory=ConversationMemory())
+    selector.models["openai"]["endpoint"] = http_stub(respond)
+    try:
+        selector.query_llm("what is the capital of france")
+        for _ in range(5):
+            assert selector.query_llm("how far away is the moon") == "answer 2"
+    finally:
+        selector.close()
+
+    assert len(calls) == 2
+    # Standalone questions go out without the earlier turns.
+    assert [message["role"] for message in calls[1]] == ["system", "user"]
+    assert cache.stats()["hit_rate"] > 0.5
+
+
+def test_coalesced_callers_record_one_exchange(http_stub):
+    def slow(request):
+        read_json(request)
+        time.sleep(0.3)
+        send_json(request, {"choices": [{"message": {"content": "Shared answer."}}]})
+
+    memory = ConversationMemory()
+    selector = LLMSelector(openai_api_key="test-key", huggingface_api_key="", cache=ResponseCache(), memory=memory)
+    selector.models["openai"]["endpoint"] = http_stub(slow)
+    barrier = threading.Barrier(3)
+
+    def ask(_):
+        barrier.wait()
+        return selector.query_llm("system status report")
+
+    try:
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            assert list(pool.map(ask, range(3))) == ["Shared answer."] * 3
+    finally:
+        selector.close()
+
+    assert selector.coalescing_stats() == {"leaders": 1, "coalesced": 2}
+    assert memory.stats()["exchanges"] == 1
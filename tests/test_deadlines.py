@@ -0,0 +1,104 @@
+import threading
+import time
+
+from deadline import Deadline
+from http_helpers import read_json, send_json
+from jarvis_commands import get_weather
+from jarvis_core import DEGRADED_RESPONSES, JarvisCore
+from modules.llm_selector import LLMSelector
+
+
+class RecordingLLM:
+    def __init__(self):
+        self.calls = []
+
+    def query_llm(self, payload, timeout=None):
+        self.calls.append((payload, timeout))
+        return f"LLM:{payload}"
+
+
+def test_expired_deadline_cancels_handler_with_degraded_answer():
+    core = JarvisCore()
+    core.llm = RecordingLLM()
+
+    response = core.process_command("llm:hello", deadline=Deadline.after(-1))
+
+    assert response == DEGRADED_RESPONSES["llm"]
+    assert core.llm.calls == []
+
+
+def test_deadline_bounds_llm_handler_timeout():
+    core = JarvisCore()
+    core.llm = RecordingLLM()
+
+    assert core.process_command("llm:hello", deadline=Deadline.after(2.0)) == "LLM:hello"
+    (_, timeout), = core.llm.calls
+    assert 0 < timeout <= 2.0
+
+
+def test_handler_still_running_at_the_deadline_is_abandoned():
+    class SlowDevices:
+        def process_command(self, payload):
+            time.sleep(1.0)
+            return f"done: {payload}"
+
+    core = JarvisCore()
+    core.device_controller = SlowDevices()
+
+    started = time.monotonic()
+    response = core.process_command("device:lights on", deadline=Deadline.after(0.2))
+
+    assert time.monotonic() - started < 0.6
+    assert response == DEGRADED_RESPONSES["device"]
+    core.shutdown()
+
+
+def test_stuck_background_handlers_do_not_delay_critical_commands():
+    release = threading.Event()
+
+    class StuckLLM:
+        def query_llm(self, payload, timeout=None):
+            release.wait(5)
+            return "late"
+
+    class Threats:
+        def analyze_threat(self, payload):
+            return "Threat level normal: 1"
+
+    core = JarvisCore()
+    core.llm = StuckLLM()
+    core.threat_analyzer = Threats()
+    try:
+        # Fill every handler thread the background lane has with abandoned calls.
+        for index in range(core.config.command_workers + 1):
+            response = core.process_command(f"llm:question {index}", deadline=Deadline.after(0.05))
+            assert response == DEGRADED_RESPONSES["llm"]
+
+        started = time.monotonic()
+        response = core.process_command("threat:scan", deadline=Deadline.after(1.0))
+
+        assert response == "Threat level normal: 1"
+        assert time.monotonic() - started < 0.5
+    finally:
+        release.set()
+        core.shutdown()
+
+
+def test_weather_with_exhausted_budget_answers_immediately():
+    assert "in time" in get_weather("Paris", timeout=0)
+
+
+def test_slow_provider_is_abandoned_at_the_timeout(http_stub):
+    def slow(request):
+        read_json(request)
+        time.sleep(1.0)
+        send_json(request, {"choices": [{"message": {"content": "late"}}]})
+
+    selector = LLMSelector(openai_api_key="test-key", huggingface_api_key="")
+    selector.models["openai"]["endpoint"] = http_stub(slow)
+
+    started = time.monotonic()
+    response = selector.query_llm("what is jarvis", timeout=0.2)
+
+    assert time.monotonic() - started < 0.8
+    assert response != "late"
@@ -0,0 +1,135 @@
+import threading
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from modules.frame_sources import ImageDirectorySource, SyntheticSource, VideoFileSource
+from modules.gesture_recognition import STAGES, GestureRecognition, LatestFrameBuffer
+
+
+def test_latest_frame_wins_and_overwritten_frames_count_as_dropped():
+    frames = LatestFrameBuffer()
+    for index in range(5):
+        frames.put(index)
+
+    assert frames.get(timeout=0) == (4, 5)
+    assert frames.dropped == 4
+    # Nothing new since the last take.
+    assert frames.get(timeout=0.01) == (None, 5)
+
+    # Frames nobody took are handed back for reuse; taken ones are not.
+    assert frames.put(5) is None
+    assert frames.put(6) == 5
+    assert frames.get(timeout=0) == (6, 7)
+    assert frames.dropped == 5
+
+
+def test_slow_consumer_never_falls_behind_the_producer():
+    frames = LatestFrameBuffer()
+    produced = 200
+    seen = []
+
+    def produce():
+        for index in range(produced):
+            frames.put(index)
+            time.sleep(0.001)
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    while producer.is_alive() or not seen or seen[-1] != produced - 1:
+        frame, _ = frames.get(timeout=0.1)
+        if frame is not None:
+            seen.append(frame)
+            time.sleep(0.01)  # a slow processing stage
+    producer.join()
+
+    assert seen == sorted(seen)
+    assert seen[-1] == produced - 1
+    assert len(seen) + frames.dropped == produced
+    assert frames.dropped > produced // 2
+
+
+def _run_headless(source):
+    engine = GestureRecognition(source=source, headless=True)
+    assert engine.start()
+    assert engine.done.wait(10)
+    stats = engine.stats()
+    engine.release()
+    return engine, stats
+
+
+def test_headless_engine_drains_a_synthetic_clip_and_reports_stats(capsys):
+    engine, stats = _run_headless(SyntheticSource(width=320, height=240, radius=30, frame_count=60, fps=300))
+
+    assert stats["frames_captured"] == 60
+    assert stats["frames_processed"] + stats["frames_dropped"] == 60
+    assert stats["fps"] > 0 and stats["latency_ms"] > 0
+    assert stats["stage_ms"]["background"] > 0
+    assert stats["stage_ms"]["copy"] == stats["stage_ms"]["display"] == 0.0
+    # No window, overlay or per-frame output when headless.
+    assert "[Gesture Debug]" not in capsys.readouterr().out
+    assert engine.source_finished.is_set()
+
+
+def test_video_and_image_directory_sources_replay_every_frame(tmp_path):
+    synthetic = SyntheticSource(width=160, height=120, radius=15, frame_count=12, fps=None)
+    frames = []
+    while True:
+        success, frame = synthetic.read()
+        if not success:
+            break
+        frames.append(frame)
+
+    writer = cv2.VideoWriter(str(tmp_path / "clip.avi"), cv2.VideoWriter_fourcc(*"MJPG"), 30, (160, 120))
+    images = tmp_path / "frames"
+    images.mkdir()
+    for index, frame in enumerate(frames):
+        writer.write(frame)
+        cv2.imwrite(str(images / f"{index:04d}.png"), frame)
+    writer.release()
+    (images / "notes.txt").write_text("ignored")
+
+    for source in (VideoFileSource(tmp_path / "clip.avi"), ImageDirectorySource(images)):
+        assert source.isOpened()
+        read = 0
+        while source.read()[0]:
+            read += 1
+        assert read == len(frames)
+        assert source.finished
+
+    image_source = ImageDirectorySource(images)
+    assert np.array_equal(image_source.read()[1], frames[0])
+
+    _, stats = _run_headless(ImageDirectorySource(images, fps=60))
+    assert stats["frames_captured"] == len(frames)
+
+
+def test_steady_state_frame_processing_does_not_allocate_frame_buffers():
+    source = SyntheticSource(frame_count=None, fps=None)
+    frames = [source.read()[1] for _ in range(40)]
+    frame_bytes = frames[0].nbytes
+    # Reading into a recycled buffer reuses it.
+    assert source.read(frames[0])[1] is frames[0]
+
+    for options in ({"headless": True}, {"overlay": False}, {}):
+        engine = GestureRecognition(source=SyntheticSource(), **options)
+        timings = dict.fromkeys(STAGES, 0.0)
+        for frame in frames[:20]:  # warm-up: buffers and the background model settle
+            engine._process_frame(frame, timings)
+
+        peaks = []
+        tracemalloc.start()
+        try:
+            for frame in frames[20:]:
+                tracemalloc.reset_peak()
+                before, _ = tracemalloc.get_traced_memory()
+                engine._process_frame(frame, timings)
+                peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        finally:
+            tracemalloc.stop()
+        engine.cap.release()
+
+        # Only small bookkeeping (contour lists, timings) remains; not a single frame-sized buffer.
+        assert max(peaks) < frame_bytes // 16, options
@@ -0,0 +1,52 @@
+import time
+
+import numpy as np
+
+from modules.intent_classifier import IntentClassifier, default_classifier
+from modules.llm_selector import LOCAL_RESPONSES, LLMSelector
+from modules.personality import RESPONSES, PersonalityModule
+
+
+def test_greetings_do_not_match_inside_words():
+    classifier = default_classifier()
+    assert classifier.classify("hi").label == "greeting"
+    assert classifier.classify("hey jarvis").label == "greeting"
+    assert classifier.classify("this is it").label != "greeting"
+    assert classifier.classify("i think this works").label != "greeting"
+
+
+def test_batch_matches_single_classification():
+    classifier = default_classifier()
+    texts = ["who is batman", "how do i boil an egg", "open firefox", "turn on the kitchen lights", "thank you"]
+    batch = classifier.classify_batch(texts)
+    assert [prediction.label for prediction in batch] == ["question", "how_to", "open_app", "device_control", "thanks"]
+    assert batch == [classifier.classify(text) for text in texts]
+    assert np.allclose(classifier.predict_proba(texts).sum(axis=1), 1.0)
+
+
+def test_low_confidence_falls_back(tmp_path):
+    path = tmp_path / "intents.json"
+    path.write_text('{"yes": ["yes", "yep"], "no": ["no", "nope"]}')
+    classifier = IntentClassifier.from_file(path, fallback_label="unknown", min_confidence=0.9)
+    assert classifier.classify("yes").label == "yes"
+    assert classifier.classify("purple elephant").label == "unknown"
+
+
+def test_classification_stays_under_a_millisecond():
+    classifier = default_classifier()
+    queries = [f"what is the population of city number {index}" for index in range(500)]
+    started = time.perf_counter()
+    for query in queries:
+        classifier.classify(query)
+    assert (time.perf_counter() - started) / len(queries) < 1e-3
+
+
+def test_local_processing_and_personality_use_intents():
+    selector = LLMSelector(openai_api_key="", huggingface_api_key="")
+    assert selector._local_processing("who is tony stark") == LOCAL_RESPONSES["question"]
+    assert selector._local_processing("please turn off the lights") == LOCAL_RESPONSES["device_control"]
+    assert selector._local_processing("this is fine") in selector.fallback_responses
+
+    personality = PersonalityModule()
+    assert personality.get_response("hi") in RESPONSES["greeting"]
+    assert personality.get_response("this is fine") in RESPONSES["default"]
@@ -0,0 +1,33 @@
+from intent_matcher import Intent, IntentMatcher
+from jarvis_commands import execute_command
+
+
+def test_triggers_match_on_token_boundaries_only():
+    matcher = IntentMatcher([Intent("time", ("time",))])
+    assert matcher.match("sometimes I wonder") is None
+    assert matcher.match("what time is it").intent == "time"
+
+
+def test_lowest_priority_wins_then_earliest_match():
+    matcher = IntentMatcher(
+        [
+            Intent("weather", ("weather",), priority=70),
+            Intent("search", ("search",), priority=50),
+            Intent("greeting", ("good morning", "morning"), priority=90),
+        ]
+    )
+    assert matcher.match("search the weather").intent == "search"
+    match = matcher.match("good morning")
+    assert (match.trigger, match.start, match.end) == ("good morning", 0, 2)
+
+
+def test_overlapping_multi_token_triggers_are_all_reported():
+    matcher = IntentMatcher([Intent("a", ("open google",)), Intent("b", ("google maps",))])
+    found = {(m.intent, m.start) for m in matcher.match_all("open google maps")}
+    assert found == {("a", 0), ("b", 1)}
+
+
+def test_execute_command_ignores_substrings_inside_words():
+    response = execute_command("sometimes you make me laugh")
+    assert "The current time is" not in response
+    assert execute_command("thank you jarvis") == "You're welcome, sir."
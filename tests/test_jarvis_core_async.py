@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+
+from jarvis_core import JarvisCore
+
+
+class StubLLM:
+    def query_llm(self, payload, timeout=None):
+        return f"LLM:{payload}"
+
+
+class ScriptedVoice:
+    enabled = True
+
+    def __init__(self, commands):
+        self._commands = list(commands)
+        self._idle = threading.Event()
+        self.spoken = []
+
+    def listen(self, timeout=None):
+        if self._commands:
+            return self._commands.pop(0)
+        self._idle.wait(0.05)
+        return ""
+
+    def speak(self, text, priority=None, wait=True):
+        self.spoken.append(text)
+
+
+class RecordingGUI:
+    def __init__(self):
+        self.outputs = []
+
+    def set_listening_mode(self, _is_listening):
+        pass
+
+    def update_task(self, _task, _status):
+        pass
+
+    def display_output(self, msg):
+        self.outputs.append(msg)
+
+    def stop(self):
+        pass
+
+
+class FixedThreat:
+    def __init__(self, level):
+        self.level = level
+
+    def analyze(self):
+        return self.level
+
+
+def test_async_runtime_dispatches_voice_events_and_stops_on_shutdown():
+    core = JarvisCore()
+    core.llm = StubLLM()
+    core.voice = ScriptedVoice(["llm:hello"])
+    core.gui = RecordingGUI()
+
+    async def scenario():
+        runtime = asyncio.create_task(core.run_async())
+        for _ in range(100):
+            if "JARVIS: LLM:hello" in core.gui.outputs:
+                break
+            await asyncio.sleep(0.01)
+        core.voice._commands.append("shutdown")
+        await runtime
+
+    started = time.monotonic()
+    asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+
+    assert "JARVIS: LLM:hello" in core.gui.outputs
+    assert core.running is False
+    # Shutdown is event driven, so the threat poll interval never delays exit.
+    assert time.monotonic() - started < core.config.threat_poll_interval_seconds
+
+
+def test_async_runtime_speaks_threat_alerts():
+    core = JarvisCore()
+    core.voice = ScriptedVoice([])
+    core.gui = RecordingGUI()
+    core.threat_analyzer = FixedThreat(9)
+
+    async def scenario():
+        runtime = asyncio.create_task(core.run_async())
+        for _ in range(100):
+            if core.voice.spoken:
+                break
+            await asyncio.sleep(0.01)
+        core.shutdown()
+        await runtime
+
+    asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+    assert core.voice.spoken == ["High threat detected! Level 9"]
@@ -0,0 +1,69 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import modules.llm_selector as llm_selector
+from http_helpers import read_json, send_json
+from modules.llm_selector import LLMSelector
+
+
+def _echo_stub(http_stub, delay=0.1):
+    state = {"active": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def respond(request):
+        body = read_json(request)
+        query = body["messages"][-1]["content"]
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(delay)
+        with lock:
+            state["active"] -= 1
+        if "fail" in query:
+            send_json(request, {"error": "bad request"}, status=400)
+        else:
+            send_json(request, {"choices": [{"message": {"content": f"answer to {query}"}}]})
+
+    return http_stub(respond), state
+
+
+@pytest.fixture(params=["httpx", "threads"])
+def client_mode(request, monkeypatch):
+    if request.param == "threads":
+        monkeypatch.setattr(llm_selector, "httpx", None)
+    elif llm_selector.httpx is None:
+        pytest.skip("httpx is not installed")
+    return request.param
+
+
+def test_batch_runs_concurrently_and_preserves_order(http_stub, client_mode):
+    url, state = _echo_stub(http_stub)
+    selector = LLMSelector(openai_api_key="test-key", huggingface_api_key="")
+    selector.models["openai"]["endpoint"] = url
+    queries = [f"question {index}" for index in range(20)]
+
+    started = time.monotonic()
+    results = asyncio.run(selector.query_llm_many(queries, concurrency=10))
+    elapsed = time.monotonic() - started
+    selector.close()
+
+    assert [result.response for result in results] == [f"answer to {q}" for q in queries]
+    assert all(result.ok and result.provider == "openai" for result in results)
+    assert state["peak"] <= 10
+    assert elapsed < 20 * 0.1 / 2
+
+
+def test_batch_reports_per_item_errors(http_stub, client_mode):
+    url, _ = _echo_stub(http_stub, delay=0)
+    selector = LLMSelector(openai_api_key="test-key", huggingface_api_key="")
+    selector.models["openai"]["endpoint"] = url
+
+    results = asyncio.run(selector.query_llm_many(["ok one", "please fail", "ok two"], concurrency=3))
+    selector.close()
+
+    assert [result.ok for result in results] == [True, False, True]
+    assert "400" in results[1].error
+    assert results[2].response == "answer to ok two"
@@ -0,0 +1,90 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from http_helpers import read_json, send_json
+from modules.llm_cache import ResponseCache
+from modules.llm_selector import LLMSelector
+
+PARAMS = {"max_tokens": 150, "temperature": 0.7}
+
+
+def test_lru_evicts_and_counts_hits():
+    cache = ResponseCache(max_entries=2)
+    cache.put("What is JARVIS?", "gpt", PARAMS, "An assistant.")
+    cache.put("b", "gpt", PARAMS, "B")
+    cache.put("c", "gpt", PARAMS, "C")
+
+    assert cache.get("  what is   jarvis ", "gpt", PARAMS) is None  # evicted
+    assert cache.get("c", "gpt", PARAMS) == "C"
+    assert cache.get("c", "gpt", {"max_tokens": 10}) is None
+    stats = cache.stats()
+    assert (stats["evictions"], stats["memory_hits"], stats["misses"]) == (1, 1, 2)
+
+
+def test_expired_entries_are_misses():
+    cache = ResponseCache(ttl_seconds=0)
+    cache.put("q", "gpt", PARAMS, "A")
+    assert cache.get("q", "gpt", PARAMS) is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_sqlite_tier_survives_restart_and_invalidates_by_model(tmp_path):
+    db_path = tmp_path / "llm.sqlite3"
+    first = ResponseCache(db_path=str(db_path))
+    first.put("What is JARVIS?", "gpt", PARAMS, "An assistant.")
+    first.put("What is JARVIS?", "gpt2", PARAMS, "A robot.")
+    first.close()
+
+    second = ResponseCache(db_path=str(db_path))
+    assert second.get("what is jarvis", "gpt", PARAMS) == "An assistant."
+    assert second.stats()["disk_hits"] == 1
+    assert second.invalidate_model("gpt") == 1
+    assert second.get("what is jarvis", "gpt", PARAMS) is None
+    assert second.get("what is jarvis", "gpt2", PARAMS) == "A robot."
+    second.close()
+
+
+def test_selector_serves_repeat_queries_from_cache(http_stub):
+    calls = []
+
+    def respond(request):
+        calls.append(read_json(request))
+        send_json(request, {"choices": [{"message": {"content": "Cached answer."}}]})
+
+    selector = LLMSelector(openai_api_key="test-key", huggingface_api_key="", cache=ResponseCache())
+    selector.models["openai"]["endpoint"] = http_stub(respond)
+
+    assert selector.query_llm("Who is Tony Stark?") == "Cached answer."
+    assert selector.query_llm("who is tony stark") == "Cached answer."
+    assert len(calls) == 1
+    assert selector.invalidate_cache("openai") == 1
+    assert selector.query_llm("who is tony stark") == "Cached answer."
+    assert len(calls) == 2
+
+
+def test_concurrent_identical_queries_share_one_upstream_call(http_stub):
+    calls = []
+
+    def slow(request):
+        calls.append(read_json(request))
+        time.sleep(0.3)
+        send_json(request, {"choices": [{"message": {"content": "Shared answer."}}]})
+
+    selector = LLMSelector(openai_api_key="test-key", huggingface_api_key="")
+    selector.models["openai"]["endpoint"] = http_stub(slow)
+    barrier = threading.Barrier(5)
+
+    def ask(text):
+        barrier.wait()
+        return selector.query_llm(text)
+
+    try:
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            answers = list(pool.map(ask, ["Status?", "status", "STATUS", "status ?", " status"]))
+    finally:
+        selector.close()
+
+    assert answers == ["Shared answer."] * 5
+    assert len(calls) == 1
+    assert selector.coalescing_stats() == {"leaders": 1, "coalesced": 4}
@@ -0,0 +1,137 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from http_helpers import read_json, send_json
+from modules.llm_routing import CLOSED, HALF_OPEN, OPEN, ProviderRouter
+from modules.llm_selector import LLMSelector
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_rank_prefers_lower_latency_and_measures_unknown_first():
+    router = ProviderRouter(["openai", "huggingface", "local"])
+    router.record_success("openai", 0.9)
+    router.record_success("huggingface", 0.2)
+    assert router.rank(["openai", "huggingface", "local"]) == ["local", "huggingface", "openai"]
+
+
+def test_breaker_opens_then_half_opens_after_cooldown():
+    clock = FakeClock()
+    router = ProviderRouter(["openai", "huggingface"], failure_threshold=2, cooldown_seconds=10, clock=clock)
+    router.record_failure("openai")
+    assert router.snapshot()["openai"]["state"] == CLOSED
+    router.record_failure("openai")
+    assert router.snapshot()["openai"]["state"] == OPEN
+    assert router.rank(["openai", "huggingface"]) == ["huggingface"]
+
+    clock.now = 10
+    assert router.snapshot()["openai"]["state"] == HALF_OPEN
+    router.record_failure("openai")
+    assert router.snapshot()["openai"]["state"] == OPEN
+    clock.now = 20
+    router.record_success("openai", 0.1)
+    assert router.snapshot()["openai"]["state"] == CLOSED
+
+
+def test_half_open_breaker_admits_exactly_one_trial():
+    clock = FakeClock()
+    router = ProviderRouter(["openai", "huggingface"], failure_threshold=1, cooldown_seconds=10, clock=clock)
+    router.record_failure("openai")
+    clock.now = 10
+
+    start = threading.Barrier(16)
+
+    def try_acquire(_):
+        start.wait()
+        return router.acquire("openai")
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        admitted = list(pool.map(try_acquire, range(16)))
+
+    assert admitted.count(True) == 1
+    # Everyone else is routed around the provider until the trial reports back.
+    assert router.rank(["openai", "huggingface"]) == ["huggingface"]
+    router.record_success("openai", 0.1)
+    assert router.acquire("openai") and "openai" in router.rank(["openai", "huggingface"])
+
+
+def test_released_or_abandoned_trial_frees_the_slot():
+    clock = FakeClock()
+    router = ProviderRouter(["openai"], failure_threshold=1, cooldown_seconds=10, clock=clock)
+    router.record_failure("openai")
+    clock.now = 10
+    assert router.acquire("openai")
+    router.release("openai")
+    assert router.acquire("openai")
+    assert not router.acquire("openai")
+    clock.now = 20  # the trial never reported back
+    assert router.acquire("openai")
+
+
+def test_concurrent_queries_send_one_trial_to_a_half_open_provider(http_stub):
+    openai_calls = []
+
+    def still_down(request):
+        openai_calls.append(read_json(request))
+        time.sleep(0.3)
+        send_json(request, {"error": "overloaded"}, status=500)
+
+    def healthy(request):
+        read_json(request)
+        send_json(request, [{"generated_text": "from hf"}])
+
+    clock = FakeClock()
+    router = ProviderRouter(["openai", "huggingface"], failure_threshold=1, cooldown_seconds=10, clock=clock)
+    selector = LLMSelector(openai_api_key="test-key", huggingface_api_key="test-key", router=router)
+    selector.models["openai"]["endpoint"] = http_stub(still_down)
+    selector.models["huggingface"]["endpoint"] = http_stub(healthy)
+    router.record_failure("openai")
+    clock.now = 10
+
+    try:
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            answers = list(pool.map(lambda index: selector.query_llm(f"status report {index}"), range(6)))
+    finally:
+        selector.close()
+
+    assert answers == ["from hf"] * 6
+    assert len(openai_calls) == 1
+    assert selector.router_state()["openai"]["state"] == OPEN
+
+
+def test_selector_stops_calling_failing_provider(http_stub):
+    openai_calls = []
+
+    def failing(request):
+        openai_calls.append(read_json(request))
+        send_json(request, {"error": "overloaded"}, status=500)
+
+    def healthy(request):
+        read_json(request)
+        send_json(request, [{"generated_text": "from hf"}])
+
+    selector = LLMSelector(
+        openai_api_key="test-key",
+        huggingface_api_key="test-key",
+        router=ProviderRouter(["openai", "huggingface"], failure_threshold=2),
+    )
+    selector.models["openai"]["endpoint"] = http_stub(failing)
+    selector.models["huggingface"]["endpoint"] = http_stub(healthy)
+
+    try:
+        for _ in range(4):
+            assert selector.query_llm("status report") == "from hf"
+    finally:
+        selector.close()
+
+    assert len(openai_calls) == 2
+    state = selector.router_state()
+    assert state["openai"]["state"] == OPEN
+    assert state["huggingface"]["successes"] == 4
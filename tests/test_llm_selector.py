@@ -0,0 +1,149 @@
+import threading
+import time
+
+from http_helpers import read_json, send_json
+import modules.llm_selector
+from modules.llm_selector import FALLBACK_RESPONSES, LOCAL_RESPONSES, LLMSelector
+
+
+def _openai_stub(http_stub, answer="Hello, sir."):
+    def respond(request):
+        read_json(request)
+        send_json(request, {"choices": [{"message": {"content": answer}}]})
+
+    return http_stub(respond)
+
+
+def test_pooled_session_reuses_connections(http_stub):
+    selector = LLMSelector(openai_api_key="test-key", huggingface_api_key="")
+    selector.models["openai"]["endpoint"] = f"{_openai_stub(http_stub)}/v1/chat/completions"
+
+    try:
+        for _ in range(3):
+            assert selector.query_llm("hello there") == "Hello, sir."
+        stats = selector.connection_stats()["openai"]
+    finally:
+        selector.close()
+
+    assert stats == {"requests": 3, "connections": 1, "reused": 2}
+
+
+def test_gateway_errors_are_not_retried_past_the_deadline(http_stub):
+    hits = []
+
+    def unavailable(request):
+        read_json(request)
+        hits.append(time.monotonic())
+        time.sleep(0.15)
+        send_json(request, {"error": "overloaded"}, status=503)
+
+    selector = LLMSelector(openai_api_key="test-key", huggingface_api_key="")
+    selector.models["openai"]["endpoint"] = http_stub(unavailable)
+    try:
+        started = time.monotonic()
+        answer = selector.query_llm("status report", timeout=0.3)
+        assert time.monotonic() - started < 0.3
+        assert answer in [*LOCAL_RESPONSES.values(), *FALLBACK_RESPONSES]
+        assert len(hits) == 1
+    finally:
+        selector.close()
+
+
+def _delayed(delay, payload):
+    def respond(request):
+        read_json(request)
+        time.sleep(delay)
+        send_json(request, payload)
+
+    return respond
+
+
+def _hedged_selector(http_stub, openai_delay, hf_delay):
+    selector = LLMSelector(openai_api_key="test-key", huggingface_api_key="test-key", hedge_after_seconds=0.1)
+    selector.models["openai"]["endpoint"] = http_stub(
+        _delayed(openai_delay, {"choices": [{"message": {"content": "from openai"}}]})
+    )
+    selector.models["huggingface"]["endpoint"] = http_stub(_delayed(hf_delay, [{"generated_text": "from hf"}]))
+    return selector
+
+
+def test_hedged_request_returns_faster_secondary(http_stub):
+    selector = _hedged_selector(http_stub, openai_delay=1.0, hf_delay=0.0)
+    try:
+        started = time.monotonic()
+        assert selector.query_llm("status report") == "from hf"
+        assert time.monotonic() - started < 0.6
+        assert selector.hedge_stats() == {"hedged": 1, "primary_wins": 0, "secondary_wins": 1, "cancelled": 1}
+    finally:
+        selector.close()
+
+
+def test_losing_request_is_aborted_in_flight(http_stub):
+    selector = _hedged_selector(http_stub, openai_delay=2.0, hf_delay=0.0)
+    finished = {}
+    query_http = selector._query_http
+
+    def timed(model_name, *args):
+        try:
+            return query_http(model_name, *args)
+        finally:
+            finished[model_name] = time.monotonic()
+
+    selector._query_http = timed
+    try:
+        started = time.monotonic()
+        assert selector.query_llm("status report") == "from hf"
+        for _ in range(50):
+            if "openai" in finished:
+                break
+            time.sleep(0.01)
+        # The slow primary's HTTP call ends when it loses, not after the stub's 2 s.
+        assert finished["openai"] - started < 1.0
+        # Losing a race is not a provider failure.
+        assert selector.router_state()["openai"]["failures"] == 0
+    finally:
+        selector.close()
+
+
+def test_hedge_delay_follows_observed_p95_latency():
+    selector = LLMSelector(openai_api_key="test-key", huggingface_api_key="test-key", hedge_after_seconds=0.5)
+    assert selector.hedge_delay("openai") == 0.5
+
+    for latency in [0.1] * 18 + [0.3, 0.9]:
+        selector.router.record_success("openai", latency)
+
+    assert selector.hedge_delay("openai") == 0.3
+    assert selector.router_state()["openai"]["latency_p95"] == 0.3
+
+
+def test_fast_primary_is_not_hedged(http_stub):
+    selector = _hedged_selector(http_stub, openai_delay=0.0, hf_delay=0.0)
+    try:
+        assert selector.query_llm("status report") == "from openai"
+        assert selector.hedge_stats()["hedged"] == 0
+    finally:
+        selector.close()
+
+
+def test_concurrent_hedged_queries_share_one_executor(http_stub, monkeypatch):
+    created = []
+
+    class SlowToStartExecutor(modules.llm_selector.ThreadPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            created.append(self)
+            time.sleep(0.05)  # widen the window for a racing second creation
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(modules.llm_selector, "ThreadPoolExecutor", SlowToStartExecutor)
+    selector = _hedged_selector(http_stub, openai_delay=0.0, hf_delay=0.0)
+    try:
+        workers = [
+            threading.Thread(target=selector.query_llm, args=(f"question {index}",), daemon=True) for index in range(8)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=5)
+        assert len(created) == 1
+    finally:
+        selector.close()
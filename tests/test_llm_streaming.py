@@ -0,0 +1,96 @@
+import json
+import threading
+import time
+
+from http_helpers import read_json, send_json
+from modules.llm_selector import LLMSelector
+from modules.voice_interface import VoiceInterface, iter_sentences
+
+TOKENS = ["Hello", ", sir.", " The reactor", " is stable", ".", " Anything", " else?"]
+
+
+def _write_chunk(request, data):
+    request.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+    request.wfile.flush()
+
+
+def _sse_stub(http_stub, final_sent, delay=0.1):
+    """Serve TOKENS as an OpenAI-style chunked server-sent event stream."""
+
+    def respond(request):
+        request.rfile.read(int(request.headers["Content-Length"]))
+        request.send_response(200)
+        request.send_header("Content-Type", "text/event-stream")
+        request.send_header("Transfer-Encoding", "chunked")
+        request.end_headers()
+        for index, token in enumerate(TOKENS):
+            if index == len(TOKENS) - 1:
+                final_sent.set()
+            event = {"choices": [{"delta": {"content": token}}]}
+            _write_chunk(request, f"data: {json.dumps(event)}\n\n".encode())
+            time.sleep(delay)
+        _write_chunk(request, b"data: [DONE]\n\n")
+        request.wfile.write(b"0\r\n\r\n")
+
+    return http_stub(respond)
+
+
+class RecordingEngine:
+    def __init__(self, final_sent):
+        self.final_sent = final_sent
+        self.spoken = []
+
+    def say(self, text):
+        self.spoken.append((text, self.final_sent.is_set()))
+
+    def runAndWait(self):
+        pass
+
+
+def test_iter_sentences_regroups_chunks():
+    assert list(iter_sentences(TOKENS)) == ["Hello, sir.", "The reactor is stable.", "Anything else?"]
+
+
+def test_stream_yields_tokens_from_sse(http_stub):
+    selector = LLMSelector(openai_api_key="test-key", huggingface_api_key="")
+    selector.models["openai"]["endpoint"] = _sse_stub(http_stub, threading.Event(), delay=0)
+
+    assert list(selector.query_llm_stream("status report")) == TOKENS
+
+
+def test_failed_stream_counts_against_the_provider_and_falls_through(http_stub):
+    def broken(request):
+        read_json(request)
+        send_json(request, {"error": "server error"}, status=500)
+
+    def huggingface(request):
+        read_json(request)
+        send_json(request, [{"generated_text": "from hf"}])
+
+    selector = LLMSelector(openai_api_key="test-key", huggingface_api_key="test-key")
+    selector.models["openai"]["endpoint"] = http_stub(broken)
+    selector.models["huggingface"]["endpoint"] = http_stub(huggingface)
+    try:
+        assert selector._candidates(None)[0] == "openai"
+        assert list(selector.query_llm_stream("status report")) == ["from hf"]
+        state = selector.router_state()
+        assert state["openai"]["failures"] == 1
+        assert state["huggingface"]["successes"] == 1
+    finally:
+        selector.close()
+
+
+def test_speech_starts_before_stream_finishes(http_stub):
+    final_sent = threading.Event()
+    selector = LLMSelector(openai_api_key="test-key", huggingface_api_key="")
+    selector.models["openai"]["endpoint"] = _sse_stub(http_stub, final_sent)
+    engine = RecordingEngine(final_sent)
+    voice = VoiceInterface(tts_engine_factory=lambda: engine)
+
+    text = voice.speak(selector.query_llm_stream("status report"))
+    voice.close()
+
+    assert text == "Hello, sir. The reactor is stable. Anything else?"
+    first_sentence, stream_finished = engine.spoken[0]
+    assert first_sentence == "Hello, sir."
+    assert stream_finished is False
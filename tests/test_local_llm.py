@@ -0,0 +1,153 @@
+import threading
+import time
+
+import pytest
+
+from http_helpers import read_json, send_json
+from modules.llm_routing import ProviderRouter
+from modules.llm_selector import LLMSelector
+from modules.local_llm import LocalModel, LocalModelError
+
+
+class FakeLlama:
+    loads = 0
+
+    def __init__(self, **kwargs):
+        FakeLlama.loads += 1
+        self.kwargs = kwargs
+        self.calls = []
+
+    def create_chat_completion(self, messages, max_tokens, temperature, stream):
+        self.calls.append(messages)
+        for word in ["Local ", "answer ", "here."]:
+            yield {"choices": [{"delta": {"content": word}}]}
+
+
+class SlowLlama(FakeLlama):
+    def create_chat_completion(self, messages, max_tokens, temperature, stream):
+        self.calls.append(messages)
+        for index in range(40):
+            time.sleep(0.01)
+            yield {"choices": [{"delta": {"content": f"t{index} "}}]}
+
+
+class SlowLoadingLlama(FakeLlama):
+    def __init__(self, **kwargs):
+        time.sleep(0.5)
+        super().__init__(**kwargs)
+
+
+def _local_model(tmp_path, loader=FakeLlama):
+    path = tmp_path / "tiny.gguf"
+    path.write_bytes(b"GGUF")
+    return LocalModel(str(path), loader=loader)
+
+
+def test_model_loads_once_and_reports_throughput(tmp_path):
+    FakeLlama.loads = 0
+    model = _local_model(tmp_path)
+    assert model.available and not model.loaded
+
+    messages = [{"role": "user", "content": "hi"}]
+    assert model.generate(messages) == "Local answer here."
+    assert list(model.stream(messages)) == ["Local ", "answer ", "here."]
+
+    stats = model.stats()
+    assert FakeLlama.loads == 1
+    assert stats["loaded"] is True
+    assert stats["requests"] == 2
+    assert stats["completion_tokens"] == 6
+    assert stats["tokens_per_second"] > 0
+
+
+def test_first_request_gives_up_at_its_timeout_while_the_model_loads(tmp_path):
+    model = _local_model(tmp_path, loader=SlowLoadingLlama)
+
+    started = time.monotonic()
+    with pytest.raises(LocalModelError):
+        model.generate([{"role": "user", "content": "hi"}], timeout=0.1)
+    assert time.monotonic() - started < 0.4
+
+    # The load finishes in the background and the next request is served.
+    assert model.generate([{"role": "user", "content": "hi"}], timeout=2) == "Local answer here."
+    assert model.loaded
+
+
+def _generate_in_background(model):
+    answers = []
+    worker = threading.Thread(
+        target=lambda: answers.append(model.generate([{"role": "user", "content": "next"}])), daemon=True
+    )
+    worker.start()
+    return worker, answers
+
+
+def test_abandoned_stream_does_not_block_the_next_generation(tmp_path):
+    model = _local_model(tmp_path, loader=SlowLlama)
+    abandoned = model.stream([{"role": "user", "content": "hi"}])
+    assert next(abandoned) == "t0 "
+
+    # The consumer keeps the iterator but stops reading (e.g. barge-in).
+    worker, answers = _generate_in_background(model)
+    worker.join(timeout=3)
+    assert not worker.is_alive()
+    assert answers and answers[0].startswith("t0")
+
+
+def test_closing_a_stream_stops_its_generation(tmp_path):
+    model = _local_model(tmp_path, loader=SlowLlama)
+    stream = model.stream([{"role": "user", "content": "hi"}])
+    next(stream)
+    stream.close()
+
+    worker, answers = _generate_in_background(model)
+    worker.join(timeout=3)
+    assert len(answers[0].split()) == 40
+    # The closed stream generated only a token or two beyond the one read, not all 40.
+    stats = model.stats()
+    assert stats["requests"] == 2
+    assert stats["completion_tokens"] < 40 + 5
+
+
+def test_missing_model_file_is_not_configured(tmp_path):
+    missing = LocalModel(str(tmp_path / "none.gguf"), loader=FakeLlama)
+    selector = LLMSelector(openai_api_key="", huggingface_api_key="", local_model=missing)
+    assert selector._candidates(None) == []
+
+
+def test_offline_queries_use_local_model(tmp_path):
+    selector = LLMSelector(openai_api_key="", huggingface_api_key="", local_model=_local_model(tmp_path))
+    assert selector.query_llm("what is the weather") == "Local answer here."
+    assert "".join(selector.query_llm_stream("tell me a joke")) == "Local answer here."
+    assert selector.local_stats()["requests"] == 2
+
+
+def test_local_model_takes_over_when_remote_breaker_opens(tmp_path):
+    router = ProviderRouter(["openai", "huggingface", "local"], failure_threshold=1)
+    selector = LLMSelector(
+        openai_api_key="test-key", huggingface_api_key="", router=router, local_model=_local_model(tmp_path)
+    )
+    assert selector._candidates(None) == ["openai", "local"]
+
+    router.record_failure("openai")
+    assert selector._candidates(None) == ["local"]
+    assert selector.query_llm("status report") == "Local answer here."
+
+
+def test_local_model_answers_when_both_hedged_providers_fail(tmp_path, http_stub):
+    def broken(request):
+        read_json(request)
+        send_json(request, {"error": "bad request"}, status=400)
+
+    selector = LLMSelector(
+        openai_api_key="test-key", huggingface_api_key="test-key", hedge_after_seconds=0.1,
+        local_model=_local_model(tmp_path),
+    )
+    selector.models["openai"]["endpoint"] = http_stub(broken)
+    selector.models["huggingface"]["endpoint"] = http_stub(broken)
+    try:
+        assert selector._candidates(None)[-1] == "local"
+        assert selector.query_llm("status report") == "Local answer here."
+        assert selector.local_stats()["requests"] == 1
+    finally:
+        selector.close()
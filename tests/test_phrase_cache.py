@@ -0,0 +1,168 @@
+import sys
+import threading
+import time
+import wave
+
+import pytest
+
+from modules import phrase_cache
+from modules.phrase_cache import CommandPlayer, PhraseCache, phrase_key
+from modules.tts_worker import TTSWorker
+
+
+class RenderingEngine:
+    """pyttsx3 stand-in that writes short WAV files from save_to_file()."""
+
+    def __init__(self, voice="david", rate=150, silent=False):
+        self.properties = {"voice": voice, "rate": rate}
+        self.silent = silent
+        self.spoken = []
+        self.saved = []
+        self._pending = []
+
+    def getProperty(self, name):
+        return self.properties[name]
+
+    def say(self, text):
+        self._pending.append(("say", text, None))
+
+    def save_to_file(self, text, path):
+        self._pending.append(("save", text, path))
+
+    def runAndWait(self):
+        for action, text, path in self._pending:
+            if action == "say":
+                self.spoken.append(text)
+                continue
+            self.saved.append(text)
+            with wave.open(path, "wb") as wav:
+                wav.setnchannels(1)
+                wav.setsampwidth(2)
+                wav.setframerate(16000)
+                wav.writeframes(b"" if self.silent else b"\x01\x00" * 1600)
+        self._pending.clear()
+
+    def stop(self):
+        pass
+
+
+class RecordingPlayer:
+    def __init__(self, duration=0.0):
+        self.duration = duration
+        self.played = []
+
+    def play(self, path, interrupted):
+        self.played.append(path)
+        interrupted.wait(self.duration)
+
+
+def _wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def test_prerendered_phrases_play_from_disk_and_others_are_synthesized(tmp_path):
+    engine = RenderingEngine()
+    player = RecordingPlayer()
+    cache = PhraseCache(tmp_path, player=player)
+    worker = TTSWorker(lambda: engine, cache)
+    worker.prerender(["At your service, sir.", "Yes, sir?", "Yes, sir?"])
+    assert _wait_until(lambda: cache.stats()["rendered"] == 2)
+
+    assert worker.say("At your service, sir.").wait(2)
+    assert worker.say("The weather is sunny.").wait(2)
+
+    assert engine.saved == ["At your service, sir.", "Yes, sir?"]
+    assert player.played == [cache.path_for("At your service, sir.")]
+    assert engine.spoken == ["The weather is sunny."]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    worker.close()
+
+    # A second run finds the files already on disk and renders nothing.
+    engine = RenderingEngine()
+    cache = PhraseCache(tmp_path, player=RecordingPlayer())
+    worker = TTSWorker(lambda: engine, cache)
+    worker.prerender(["At your service, sir.", "Yes, sir?"])
+    assert worker.say("Yes, sir?").wait(2)
+    assert engine.saved == [] and engine.spoken == []
+    worker.close()
+
+
+def test_key_covers_voice_and_rate(tmp_path):
+    assert phrase_key("Yes, sir?", "david", 150) != phrase_key("Yes, sir?", "david", 180)
+    assert phrase_key("Yes, sir?", "david", 150) != phrase_key("Yes, sir?", "zira", 150)
+    assert phrase_key("Yes,  sir?", "david", 150) == phrase_key("Yes, sir?", "david", 150)
+
+    cache = PhraseCache(tmp_path, player=RecordingPlayer())
+    cache.bind(RenderingEngine(rate=150))
+    assert cache.render(RenderingEngine(), "Yes, sir?")
+    assert cache.lookup("Yes, sir?") is not None
+    cache.bind(RenderingEngine(rate=180))
+    assert cache.lookup("Yes, sir?") is None
+
+
+def test_failed_render_falls_back_to_live_speech(tmp_path):
+    engine = RenderingEngine(silent=True)
+    cache = PhraseCache(tmp_path, player=RecordingPlayer())
+    worker = TTSWorker(lambda: engine, cache)
+    worker.prerender(["Access denied."])
+    assert _wait_until(lambda: cache.stats()["render_failures"] == 1)
+
+    assert worker.say("Access denied.").wait(2)
+    assert engine.spoken == ["Access denied."]
+    assert list(tmp_path.iterdir()) == []
+    worker.close()
+
+
+def test_cached_playback_is_interruptible(tmp_path):
+    engine = RenderingEngine()
+    player = RecordingPlayer(duration=5.0)
+    cache = PhraseCache(tmp_path, player=player)
+    cache.bind(engine)
+    cache.render(engine, "Security clearance granted. Welcome, sir.")
+    worker = TTSWorker(lambda: engine, cache)
+
+    handle = worker.say("Security clearance granted. Welcome, sir.")
+    assert _wait_until(lambda: player.played)
+    worker.interrupt()
+    assert handle.wait(1) and handle.status == "interrupted"
+    worker.close()
+
+
+def test_without_a_player_nothing_is_rendered(tmp_path):
+    cache = PhraseCache(tmp_path)
+    cache.player = None  # e.g. no winsound and no command-line player
+    cache.add(["Yes, sir?"])
+    assert cache.next_pending() is None
+    assert cache.lookup("Yes, sir?") is None
+
+
+def test_command_player_plays_to_the_end_or_until_interrupted(tmp_path):
+    path = tmp_path / "phrase.wav"
+    path.write_bytes(b"RIFF")
+    finished = CommandPlayer([sys.executable, "-c", "import sys; open(sys.argv[1] + '.done', 'w')"])
+    finished.play(path, threading.Event())
+    assert (tmp_path / "phrase.wav.done").exists()
+
+    interrupted = threading.Event()
+    threading.Timer(0.1, interrupted.set).start()
+    started = time.monotonic()
+    CommandPlayer([sys.executable, "-c", "import time; time.sleep(5)"]).play(path, interrupted)
+    assert time.monotonic() - started < 2
+
+    with pytest.raises(OSError):
+        CommandPlayer([sys.executable, "-c", "raise SystemExit(3)"]).play(path, threading.Event())
+
+
+def test_default_player_falls_back_to_a_command_line_player(monkeypatch):
+    monkeypatch.setattr(phrase_cache, "winsound", None)
+    monkeypatch.setattr(phrase_cache.shutil, "which", lambda name: "/usr/bin/aplay" if name == "aplay" else None)
+    player = phrase_cache.default_player()
+    assert isinstance(player, CommandPlayer) and player.command == ["aplay", "-q"]
+
+    monkeypatch.setattr(phrase_cache.shutil, "which", lambda name: None)
+    assert phrase_cache.default_player() is None
@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+
+from http_helpers import read_json, send_json
+from modules.llm_selector import LLMSelector
+from modules.rate_limiter import ProviderRateLimiter, RateLimitExceeded, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_refills_up_to_capacity():
+    clock = FakeClock()
+    bucket = TokenBucket(10, 2, clock)
+    bucket.consume(10)
+    assert bucket.time_until(4) == pytest.approx(2.0)
+    clock.now = 100
+    assert bucket.available() == 10
+
+
+def test_rejects_when_wait_would_exceed_limit():
+    limiter = ProviderRateLimiter(requests_per_minute=60, tokens_per_minute=60_000, max_wait_seconds=0.5, burst_seconds=2)
+    assert limiter.acquire(10) == pytest.approx(0.0, abs=0.01)
+    assert limiter.acquire(10) == pytest.approx(0.0, abs=0.01)
+    # Bucket is empty and refills one request per second, beyond the 0.5s wait cap.
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire(10)
+    levels = limiter.levels()
+    assert levels["granted"] == 2
+    assert levels["rejected"] == 1
+    assert levels["queued"] == 0
+
+
+def test_waiters_are_admitted_in_arrival_order():
+    limiter = ProviderRateLimiter(requests_per_minute=1200, tokens_per_minute=1_000_000, max_wait_seconds=2, burst_seconds=0.05)
+    limiter.acquire(1)
+    order = []
+
+    def worker(index):
+        limiter.acquire(1)
+        order.append(index)
+
+    threads = []
+    for index in range(4):
+        thread = threading.Thread(target=worker, args=(index,))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.01)
+    for thread in threads:
+        thread.join(timeout=2)
+
+    assert order == [0, 1, 2, 3]
+
+
+def test_selector_rejects_over_limit_without_tripping_breaker(http_stub):
+    calls = []
+
+    def respond(request):
+        calls.append(read_json(request))
+        send_json(request, {"choices": [{"message": {"content": "ok"}}]})
+
+    selector = LLMSelector(openai_api_key="test-key", rate_limit_wait_seconds=0.1)
+    selector.models["openai"]["endpoint"] = http_stub(respond)
+    selector.rate_limiters["openai"] = ProviderRateLimiter(
+        requests_per_minute=60, tokens_per_minute=60_000, max_wait_seconds=0.1, burst_seconds=1
+    )
+
+    try:
+        assert selector.query_llm("first question") == "ok"
+        fallback = selector.query_llm("second question")
+    finally:
+        selector.close()
+
+    assert len(calls) == 1
+    assert fallback != "ok"
+    assert selector.rate_limit_levels()["openai"]["rejected"] == 1
+    assert selector.router_state()["openai"]["failures"] == 0
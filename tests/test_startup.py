@@ -0,0 +1,64 @@
+import threading
+
+from jarvis_core import JarvisCore
+from modules.intent_classifier import default_classifier
+
+
+class StubVoice:
+    enabled = True
+
+
+def test_text_commands_ready_before_hardware_modules_finish():
+    release = threading.Event()
+
+    def slow_voice():
+        release.wait(5)
+        return StubVoice()
+
+    core = JarvisCore()
+    core.module_factories["voice"] = slow_voice
+    core.module_factories["gesture"] = lambda: None
+    core.module_factories["gui"] = lambda: None
+
+    core.initialize()
+    try:
+        report = core.startup_report
+        assert report.text_ready_seconds < 0.3
+        assert report.modules["llm"].status == "ready"
+        assert report.modules["voice"].status == "pending"
+        assert core.process_command("device:lights on") == "Command 'on' sent to lights."
+    finally:
+        release.set()
+
+    assert isinstance(core.wait_for_module("voice", timeout=5), StubVoice)
+    assert core.startup_report.modules["voice"].status == "ready"
+    assert core.startup_report.as_dict()["modules"]["voice"]["background"] is True
+
+
+def test_failed_module_is_reported_without_blocking_startup():
+    def broken():
+        raise RuntimeError("no camera")
+
+    core = JarvisCore()
+    core.module_factories["voice"] = lambda: None
+    core.module_factories["gesture"] = broken
+    core.module_factories["gui"] = lambda: None
+
+    core.initialize()
+    assert core.wait_for_module("gesture", timeout=5) is None
+    timing = core.startup_report.modules["gesture"]
+    assert timing.status == "failed"
+    assert timing.error == "no camera"
+    assert timing.seconds is not None
+
+
+def test_intent_classifier_is_trained_during_startup():
+    core = JarvisCore()
+    for name in ("voice", "gesture", "gui"):
+        core.module_factories[name] = lambda: None
+
+    core.initialize()
+
+    assert core.startup_report.modules["intent_classifier"].background is True
+    assert core.wait_for_module("intent_classifier", timeout=10) is default_classifier()
+    assert core.startup_report.modules["intent_classifier"].status == "ready"
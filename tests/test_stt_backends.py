@@ -0,0 +1,137 @@
+import json
+import wave
+
+import numpy as np
+import pytest
+
+from modules import stt_backends
+from modules.audio_capture import AudioCapture, Utterance, WavFileSource
+from modules.stt_backends import RecognitionStream, STTBackend, VoskBackend
+
+RATE = 16000
+
+
+def _write_wav(path, samples, channels=1):
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes(samples.astype(np.int16).tobytes())
+    return str(path)
+
+
+def _speech_fixture(tmp_path):
+    """Half a second of room noise, one second of 'speech', one second of noise."""
+    rng = np.random.default_rng(0)
+    t = np.arange(RATE) / RATE
+    speech = 5000 * np.sin(2 * np.pi * 200 * t) * (1 + 0.3 * np.sin(2 * np.pi * 3 * t))
+    samples = np.concatenate([rng.normal(0, 40, RATE // 2), speech, rng.normal(0, 40, RATE)])
+    return _write_wav(tmp_path / "hello.wav", samples)
+
+
+class CountingStream(RecognitionStream):
+    """Pretends every 0.25 s of audio is one more recognized word."""
+
+    WORDS = ["hello", "jarvis", "what", "time", "is", "it"]
+
+    def __init__(self):
+        self.received = 0
+
+    def accept(self, pcm):
+        self.received += len(pcm)
+        words = self.received // (RATE // 2)
+        return " ".join(self.WORDS[:words]) or None
+
+    def finish(self):
+        return "hello jarvis"
+
+
+class StreamingBackend(STTBackend):
+    streaming = True
+
+    def open_stream(self, sample_rate=RATE):
+        return CountingStream()
+
+
+def test_wav_source_requires_mono_pcm(tmp_path):
+    path = _write_wav(tmp_path / "stereo.wav", np.zeros(RATE * 2), channels=2)
+    with pytest.raises(ValueError):
+        WavFileSource(path)
+
+
+def test_partials_arrive_before_the_utterance_ends(tmp_path):
+    partials = []
+    capture = AudioCapture(
+        source=WavFileSource(_speech_fixture(tmp_path)),
+        open_stream=StreamingBackend().open_stream,
+        on_partial=lambda text: partials.append((text, capture.ring.written)),
+    )
+    capture.start()
+    utterance = capture.next_utterance(timeout=2)
+    capture.stop()
+
+    assert utterance.text == "hello jarvis"
+    assert [text for text, _ in partials][:2] == ["hello", "hello jarvis"]
+    speech_end = int(1.5 * RATE)
+    assert partials[0][1] < speech_end
+
+
+def test_non_streaming_backend_transcribes_the_buffered_utterance():
+    class RecordingBackend(STTBackend):
+        def transcribe(self, utterance):
+            self.pcm = utterance.pcm
+            return "lights on"
+
+    backend = RecordingBackend()
+    stream = backend.open_stream()
+    assert stream.accept(b"\x01\x00" * 10) is None
+    stream.accept(b"\x02\x00" * 10)
+    assert stream.finish() == "lights on"
+    assert backend.pcm == b"\x01\x00" * 10 + b"\x02\x00" * 10
+
+
+class FakeKaldiRecognizer:
+    def __init__(self, model, sample_rate):
+        self.received = 0
+        self.segments = iter(["what time"])
+
+    def AcceptWaveform(self, pcm):
+        self.received += len(pcm)
+        # Close one segment once a second of audio has arrived.
+        return self.received >= RATE * 2 and self.received - len(pcm) < RATE * 2
+
+    def Result(self):
+        return json.dumps({"text": next(self.segments)})
+
+    def PartialResult(self):
+        return json.dumps({"partial": "is it" if self.received > RATE * 2 else "what"})
+
+    def FinalResult(self):
+        return json.dumps({"text": "is it"})
+
+
+class FakeVosk:
+    Model = staticmethod(lambda path: object())
+    KaldiRecognizer = FakeKaldiRecognizer
+    SetLogLevel = staticmethod(lambda level: None)
+
+
+def test_vosk_backend_joins_segments_and_reports_partials(tmp_path, monkeypatch):
+    monkeypatch.setattr(stt_backends, "vosk", FakeVosk)
+    backend = VoskBackend(str(tmp_path))
+
+    stream = backend.open_stream()
+    assert stream.accept(b"\x00" * RATE) == "what"
+    assert stream.accept(b"\x00" * RATE) == "what time"
+    assert stream.accept(b"\x00" * RATE) == "what time is it"
+    assert stream.finish() == "what time is it"
+
+    with wave.open(_speech_fixture(tmp_path), "rb") as wav:
+        utterance = Utterance(wav.readframes(wav.getnframes()))
+    assert backend.transcribe(utterance) == "what time is it"
+
+
+def test_vosk_backend_requires_a_model_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(stt_backends, "vosk", FakeVosk)
+    with pytest.raises(stt_backends.STTError):
+        VoskBackend(str(tmp_path / "missing"))
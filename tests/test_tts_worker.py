@@ -0,0 +1,149 @@
+import threading
+import time
+
+from modules.tts_worker import PRIORITY_ALERT, PRIORITY_CHATTER, TTSWorker
+from modules.voice_interface import VoiceInterface
+
+
+class SlowEngine:
+    """Each sentence takes ``duration`` seconds unless stop() cuts it short."""
+
+    def __init__(self, duration=0.2):
+        self.duration = duration
+        self.spoken = []
+        self.threads = set()
+        self._pending = None
+        self._stopped = threading.Event()
+
+    def say(self, text):
+        self.threads.add(threading.get_ident())
+        self._pending = text
+
+    def runAndWait(self):
+        self._stopped.clear()
+        self.spoken.append(self._pending)
+        self._stopped.wait(self.duration)
+
+    def stop(self):
+        self._stopped.set()
+
+
+def _wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def test_say_returns_immediately_and_engine_stays_on_one_thread():
+    engine = SlowEngine()
+    worker = TTSWorker(lambda: engine)
+    started = time.monotonic()
+    first = worker.say("One.")
+    second = worker.say("Two.")
+    assert time.monotonic() - started < 0.05
+
+    assert second.wait(2)
+    assert engine.spoken == ["One.", "Two."]
+    assert first.status == second.status == "done"
+    assert len(engine.threads) == 1 and threading.get_ident() not in engine.threads
+    worker.close()
+
+
+def test_alert_preempts_chatter_and_jumps_the_queue():
+    engine = SlowEngine(duration=1.0)
+    worker = TTSWorker(lambda: engine)
+    chatter = worker.say("Let me tell you a long story.", PRIORITY_CHATTER)
+    queued = worker.say("And another one.", PRIORITY_CHATTER)
+    assert _wait_until(lambda: engine.spoken == ["Let me tell you a long story."])
+
+    started = time.monotonic()
+    alert = worker.say("Intruder detected!", PRIORITY_ALERT)
+    assert _wait_until(lambda: len(engine.spoken) == 2)
+    assert time.monotonic() - started < 0.5
+    assert alert.wait(2)
+    assert chatter.status == "interrupted"
+    assert engine.spoken[:2] == ["Let me tell you a long story.", "Intruder detected!"]
+    assert queued.wait(2) and queued.status == "done"
+    assert worker.stats()["preempted"] == 1
+    worker.close()
+
+
+def test_interrupt_drops_replies_but_keeps_alerts():
+    engine = SlowEngine(duration=1.0)
+    worker = TTSWorker(lambda: engine)
+    reply = worker.say("Here is a very long answer.")
+    assert _wait_until(lambda: engine.spoken == ["Here is a very long answer."])
+    later = worker.say("More of the answer.")
+    alert = worker.say("Smoke detected!", PRIORITY_ALERT)
+
+    # The alert already preempted the reply; barge-in must not cut the alert.
+    assert _wait_until(lambda: engine.spoken[-1:] == ["Smoke detected!"])
+    assert worker.interrupt() is True
+    assert later.status == "cancelled"
+    assert alert.status == "speaking"
+    worker.interrupt(include_alerts=True)
+    assert alert.wait(1) and alert.status == "interrupted"
+    worker.close()
+
+
+def test_voice_interface_speaks_alerts_without_blocking():
+    engine = SlowEngine(duration=1.0)
+    voice = VoiceInterface(tts_engine_factory=lambda: engine)
+    started = time.monotonic()
+    voice.speak("High threat detected! Level 9", priority=PRIORITY_ALERT, wait=False)
+    assert time.monotonic() - started < 0.05
+    assert _wait_until(lambda: engine.spoken == ["High threat detected!", "Level 9"] or voice.tts.is_speaking)
+    assert voice.interrupt() is False
+    voice.close()
+
+
+def test_interrupted_streamed_reply_stops_reading_the_stream():
+    engine = SlowEngine(duration=1.0)
+    voice = VoiceInterface(tts_engine_factory=lambda: engine)
+    pulled = []
+    closed = threading.Event()
+
+    def reply():
+        try:
+            for index in range(1, 5):
+                pulled.append(index)
+                time.sleep(0.1)
+                yield f"Sentence {index}. "
+        finally:
+            closed.set()
+
+    result = []
+    speaker = threading.Thread(target=lambda: result.append(voice.speak(reply())))
+    speaker.start()
+    assert _wait_until(lambda: engine.spoken == ["Sentence 1."])
+    assert voice.interrupt() is True
+    speaker.join(timeout=2)
+
+    assert not speaker.is_alive()
+    assert result == ["Sentence 1."]
+    assert closed.is_set() and len(pulled) <= 2
+    time.sleep(0.3)
+    assert engine.spoken == ["Sentence 1."]
+    voice.close()
+
+
+def test_own_voice_echo_does_not_interrupt_playback():
+    engine = SlowEngine(duration=1.0)
+    voice = VoiceInterface(tts_engine_factory=lambda: engine)
+    reply = "The reactor is stable and all systems are green."
+    voice.speak(reply, wait=False)
+    assert _wait_until(lambda: engine.spoken == [reply])
+
+    # The microphone picks up JARVIS itself, sometimes with a misheard word.
+    for echo in ["the", "the reactor is", "the reactor is stable and all", "reactor his stable"]:
+        voice._handle_partial(echo)
+    assert not _wait_until(lambda: not voice.tts.is_speaking, timeout=0.3)
+    assert voice.tts.stats()["interrupted"] == 0
+
+    voice._handle_partial("jarvis stop")
+    assert _wait_until(lambda: not voice.tts.is_speaking)
+    assert voice.tts.stats()["interrupted"] == 1
+    voice.close()
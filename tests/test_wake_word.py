@@ -0,0 +1,152 @@
+import numpy as np
+
+from modules.audio_capture import SAMPLE_RATE, Utterance
+from modules.wake_word import (
+    WakeWordDetector,
+    WakeWordGate,
+    _write_wav,
+    mfcc,
+    split_at_wake_word,
+    transcribe_around_wake_word,
+)
+
+# Synthetic "words": sequences of (pitch in Hz, seconds) voiced syllables.
+JARVIS = [(220, 0.12), (660, 0.18), (330, 0.2)]
+HEY = [(500, 0.15)]
+WAKE_UP = [(880, 0.15), (440, 0.2)]
+CHATTER = [
+    [(440, 0.15), (300, 0.15), (880, 0.2)],
+    [(660, 0.2), (220, 0.2), (330, 0.2)],
+    [(330, 0.8)],
+]
+
+
+def word(syllables, speed=1.0, seed=0, noise=200.0, pad=0.2):
+    rng = np.random.default_rng(seed)
+    parts = [np.zeros(int(pad * SAMPLE_RATE))]
+    for pitch, seconds in syllables:
+        t = np.arange(int(seconds * speed * SAMPLE_RATE)) / SAMPLE_RATE
+        pitch *= 1 + rng.normal(0, 0.02)
+        envelope = np.sin(np.pi * t / t[-1])
+        parts.append(envelope * sum(np.sin(2 * np.pi * pitch * k * t) / k for k in (1, 2, 3)) * 6000)
+    parts.append(np.zeros(int(pad * SAMPLE_RATE)))
+    signal = np.concatenate(parts)
+    return (signal + rng.normal(0, noise, len(signal))).astype(np.int16)
+
+
+def enrolled_detector():
+    detector = WakeWordDetector()
+    detector.enroll("jarvis", [word(JARVIS, speed, seed=i) for i, speed in enumerate([0.9, 1.0, 1.1])])
+    return detector
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_mfcc_shape_and_short_input():
+    assert mfcc(np.zeros(SAMPLE_RATE, dtype=np.int16)).shape == (98, 13)
+    assert mfcc(np.zeros(10, dtype=np.int16)).shape == (1, 13)
+
+
+def test_detects_wake_word_at_other_speeds_and_after_a_lead_in():
+    detector = enrolled_detector()
+    assert detector.detect(word(JARVIS, 1.3, seed=9)) is not None
+    assert detector.detect(word(JARVIS, 0.8, seed=8)) is not None
+
+    hey_jarvis = np.concatenate([word(HEY, seed=3), word(JARVIS, seed=4), word(CHATTER[0], seed=5)])
+    match = detector.detect(hey_jarvis)
+    assert match is not None and match.label == "jarvis"
+    # The match ends where "jarvis" does (before its trailing pad), not after the chatter.
+    jarvis_end = len(word(HEY)) + len(word(JARVIS)) - int(0.2 * SAMPLE_RATE)
+    assert abs(match.end_sample - jarvis_end) < 0.05 * SAMPLE_RATE
+    assert abs(match.start_sample - (len(word(HEY)) + int(0.2 * SAMPLE_RATE))) < 0.05 * SAMPLE_RATE
+
+
+def test_rejects_other_words_tones_and_noise():
+    detector = enrolled_detector()
+    for seed, syllables in enumerate(CHATTER):
+        assert detector.detect(word(syllables, seed=seed + 20)) is None
+    noise = np.random.default_rng(1).normal(0, 3000, SAMPLE_RATE).astype(np.int16)
+    assert detector.detect(noise) is None
+
+
+def test_gate_only_admits_wake_word_and_follow_ups():
+    clock = FakeClock()
+    gate = WakeWordGate(enrolled_detector(), follow_up_seconds=5.0, clock=clock)
+    utterance = lambda samples: Utterance(samples.tobytes())  # noqa: E731
+
+    chatter = [utterance(word(CHATTER[i % 3], seed=100 + i)) for i in range(10)]
+    assert not any(gate.admit(item) for item in chatter)
+    assert not gate.is_open
+
+    assert gate.admit(utterance(word(JARVIS, seed=50)))
+    clock.now += 3.0
+    assert gate.admit(chatter[0])  # a follow-up inside the window
+    clock.now += 6.0
+    assert not gate.admit(chatter[1])
+    gate.hold_open()
+    assert gate.is_open
+    gate.close()
+    assert not gate.admit(chatter[2])
+
+    stats = gate.stats()
+    assert (stats["utterances"], stats["admitted"], stats["detected"], stats["rejected"]) == (14, 2, 1, 12)
+
+
+def test_spotted_wake_word_is_cut_off_before_recognition():
+    gate = WakeWordGate(enrolled_detector())
+    jarvis, command = word(JARVIS, seed=60), word(CHATTER[0], seed=61)
+    utterance = Utterance(np.concatenate([jarvis, command]).tobytes())
+
+    assert gate.admit(utterance)
+    match = gate.last_match
+    assert match is not None and match.label == "jarvis"
+    before, after = split_at_wake_word(utterance, match)
+    rest = np.frombuffer(after.pcm, dtype=np.int16)
+    # What remains is the lead-in pause and the command (plus at most the wake word's trailing pause).
+    assert len(before.pcm) < 0.3 * SAMPLE_RATE * 2
+    assert len(command) <= len(rest) < len(command) + 0.3 * SAMPLE_RATE
+
+    assert gate.admit(Utterance(command.tobytes()))  # a follow-up has no wake word to cut
+    assert gate.last_match is None
+
+
+def test_words_before_the_wake_word_survive_so_the_security_keyword_matches():
+    gate = WakeWordGate(enrolled_detector())
+    # Stands in for the recognizer: it only knows "wake up".
+    recognizer = WakeWordDetector()
+    recognizer.enroll("wake up", [word(WAKE_UP, speed, seed=i) for i, speed in enumerate([0.9, 1.0, 1.1])])
+    sent = []
+
+    def transcribe(utterance):
+        sent.append(utterance)
+        heard = recognizer.detect(np.frombuffer(utterance.pcm, dtype=np.int16))
+        return heard.label if heard else ""
+
+    utterance = Utterance(np.concatenate([word(WAKE_UP, seed=70), word(JARVIS, seed=71)]).tobytes())
+    assert gate.admit(utterance)
+    text = transcribe_around_wake_word(utterance, gate.last_match, transcribe)
+
+    # jarvis_main unlocks on SECURITY_KEYWORD = "WAKE UP JARVIS".
+    assert "WAKE UP JARVIS".lower() in text
+    assert text == "wake up jarvis"
+    assert sum(len(part.pcm) for part in sent) < len(utterance.pcm)
+
+
+def test_templates_load_from_directory_and_empty_gate_admits_everything(tmp_path):
+    (tmp_path / "wake_up_jarvis").mkdir()
+    for i in range(2):
+        _write_wav(tmp_path / "wake_up_jarvis" / f"{i}.wav", word(JARVIS, seed=i).tobytes(), SAMPLE_RATE)
+    (tmp_path / "wake_up_jarvis" / "broken.wav").write_bytes(b"not audio")
+
+    detector = WakeWordDetector.from_directory(tmp_path)
+    assert list(detector.templates) == ["wake up jarvis"]
+    assert len(detector.templates["wake up jarvis"]) == 2
+
+    gate = WakeWordGate(WakeWordDetector.from_directory(tmp_path / "missing"))
+    assert gate.admit(Utterance(word(CHATTER[0]).tobytes()))
@@ -0,0 +1,110 @@
+import threading
+
+import pytest
+
+from jarvis_core import JarvisCore
+from worker_pool import SHED_DROP_OLDEST, Lane, LaneFullError, PriorityWorkerPool
+
+
+def _blocker(release):
+    def run():
+        release.wait(5)
+        return "released"
+
+    return run
+
+
+def test_higher_priority_lane_runs_first():
+    release = threading.Event()
+    pool = PriorityWorkerPool([Lane("critical", 8), Lane("background", 8)], workers=1)
+    order = []
+    try:
+        blocked = pool.submit("critical", _blocker(release))
+        pool.submit("background", order.append, "llm")
+        last = pool.submit("critical", order.append, "gesture")
+        release.set()
+        blocked.result(timeout=5)
+        last.result(timeout=5)
+    finally:
+        pool.shutdown()
+    assert order[0] == "gesture"
+
+
+def test_full_lane_rejects_newest():
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocker():
+        started.set()
+        release.wait(5)
+
+    pool = PriorityWorkerPool([Lane("background", 1)], workers=1)
+    try:
+        pool.submit("background", blocker)
+        assert started.wait(5)
+        queued = pool.submit("background", lambda: "queued")
+        rejected = pool.submit("background", lambda: "rejected")
+        with pytest.raises(LaneFullError):
+            rejected.result(timeout=5)
+        release.set()
+        assert queued.result(timeout=5) == "queued"
+        assert pool.stats()["background"]["shed"] == 1
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+def test_drop_oldest_sheds_queued_work():
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocker():
+        started.set()
+        release.wait(5)
+
+    pool = PriorityWorkerPool([Lane("background", 1)], workers=1, shed_policy=SHED_DROP_OLDEST)
+    try:
+        pool.submit("background", blocker)
+        assert started.wait(5)
+        oldest = pool.submit("background", lambda: "oldest")
+        newest = pool.submit("background", lambda: "newest")
+        release.set()
+        with pytest.raises(LaneFullError):
+            oldest.result(timeout=5)
+        assert newest.result(timeout=5) == "newest"
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+def test_background_burst_leaves_worker_for_critical_lane():
+    release = threading.Event()
+    pool = PriorityWorkerPool([Lane("critical", 8), Lane("background", 8, max_concurrency=1)], workers=2)
+    try:
+        for _ in range(4):
+            pool.submit("background", _blocker(release))
+        assert pool.submit("critical", lambda: "gesture").result(timeout=2) == "gesture"
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+def test_core_routes_commands_to_lanes():
+    core = JarvisCore()
+    assert core.lane_for("gesture:wave") == "critical"
+    assert core.lane_for("device:lights on") == "device"
+    assert core.lane_for("llm:hello") == "background"
+    assert core.lane_for("shutdown") == "critical"
+    try:
+        assert core.submit_command("gesture:fist").result(timeout=5) == "Action stopped"
+    finally:
+        core.shutdown()
+
+
+def test_core_rejects_commands_after_shutdown():
+    core = JarvisCore()
+    assert core.submit_command("gesture:fist").result(timeout=5) == "Action stopped"
+    core.shutdown()
+    with pytest.raises(RuntimeError):
+        core.submit_command("gesture:fist")
+    assert core._pool is None and core._handler_executors == {}
@@ -0,0 +1,145 @@
+"""Bounded worker pool with strict-priority lanes and load shedding."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import deque
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+SHED_REJECT_NEWEST = "reject"
+SHED_DROP_OLDEST = "drop_oldest"
+
+
+class LaneFullError(RuntimeError):
+    """Raised on a future whose work item was shed by a full lane."""
+
+
+@dataclass(frozen=True)
+class Lane:
+    """A priority lane; lanes listed first are always served first."""
+
+    name: str
+    max_queue: int
+    max_concurrency: int | None = None
+
+
+@dataclass
+class _LaneState:
+    lane: Lane
+    queue: deque[tuple[Future, Callable[..., Any], tuple[Any, ...]]]
+    active: int = 0
+    submitted: int = 0
+    completed: int = 0
+    shed: int = 0
+
+
+class PriorityWorkerPool:
+    """Fixed set of worker threads draining lanes in strict priority order.
+
+    Each lane has its own queue limit. ``max_concurrency`` caps how many
+    workers a lane may occupy at once, so a burst in a low-priority lane
+    always leaves workers free for the lanes above it.
+    """
+
+    def __init__(self, lanes: Sequence[Lane], workers: int = 4, shed_policy: str = SHED_REJECT_NEWEST) -> None:
+        if shed_policy not in (SHED_REJECT_NEWEST, SHED_DROP_OLDEST):
+            raise ValueError(f"Unknown shed policy: {shed_policy}")
+        self.shed_policy = shed_policy
+        self._lanes = [_LaneState(lane=lane, queue=deque()) for lane in lanes]
+        self._by_name = {state.lane.name: state for state in self._lanes}
+        self._cond = threading.Condition()
+        self._closed = False
+        self._workers = [
+            threading.Thread(target=self._worker, name=f"jarvis-worker-{index}", daemon=True)
+            for index in range(max(1, workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, lane: str, fn: Callable[..., Any], *args: Any) -> Future:
+        """Queue ``fn(*args)`` on ``lane`` and return its future."""
+        future: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Worker pool is shut down")
+            state = self._by_name[lane]
+            state.submitted += 1
+            if len(state.queue) >= state.lane.max_queue:
+                state.shed += 1
+                if self.shed_policy == SHED_REJECT_NEWEST:
+                    logger.warning("Lane '%s' full; rejecting new work", lane)
+                    future.set_exception(LaneFullError(f"Lane '{lane}' is full"))
+                    return future
+                dropped, _, _ = state.queue.popleft()
+                logger.warning("Lane '%s' full; dropping oldest queued work", lane)
+                dropped.set_exception(LaneFullError(f"Lane '{lane}' is full"))
+            state.queue.append((future, fn, args))
+            self._cond.notify()
+        return future
+
+    def _next_item(self) -> tuple[_LaneState, Future, Callable[..., Any], tuple[Any, ...]] | None:
+        for state in self._lanes:
+            limit = state.lane.max_concurrency
+            if state.queue and (limit is None or state.active < limit):
+                future, fn, args = state.queue.popleft()
+                state.active += 1
+                return state, future, fn, args
+        return None
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                item = self._next_item()
+                while item is None:
+                    if self._closed:
+                        return
+                    self._cond.wait()
+                    item = self._next_item()
+            state, future, fn, args = item
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn(*args))
+                    except BaseException as exc:  # surfaced through the future
+                        future.set_exception(exc)
+            finally:
+                with self._cond:
+                    state.active -= 1
+                    state.completed += 1
+                    # A freed concurrency slot may unblock a capped lane.
+                    self._cond.notify_all()
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Return per-lane queue depth, activity and shedding counters."""
+        with self._cond:
+            return {
+                state.lane.name: {
+                    "queued": len(state.queue),
+                    "active": state.active,
+                    "submitted": state.submitted,
+                    "completed": state.completed,
+                    "shed": state.shed,
+                }
+                for state in self._lanes
+            }
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = True) -> None:
+        """Stop accepting work and optionally cancel anything still queued."""
+        with self._cond:
+            self._closed = True
+            if cancel_pending:
+                for state in self._lanes:
+                    while state.queue:
+                        future, _, _ = state.queue.popleft()
+                        future.cancel()
+            self._cond.notify_all()
+        if wait:
+            for worker in self._workers:
+                if worker is not threading.current_thread():
+                    worker.join()